@@ -0,0 +1 @@
+# This file makes Python treat the 'benchmarks' directory as a package.
\ No newline at end of file
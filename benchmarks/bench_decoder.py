@@ -0,0 +1,76 @@
+"""
+Checks that streaming decode keeps memory flat as files get longer: runs the waveform and
+analyzer pipelines over synthetic 44.1 kHz stereo WAV files of increasing length and reports
+the peak Python/NumPy allocation (tracemalloc) and throughput for each.
+
+    python -m benchmarks.bench_decoder --minutes 1 10 30
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_audio import SAMPLE_RATE
+from core.analyzer import analyze_file
+from core.decoder import open_pcm_stream
+from core.waveform import compute_stream_peaks
+
+WRITE_CHUNK_SECONDS = 10
+
+
+def write_long_wav(file_path, minutes):
+    """Writes noise in chunks so that generating a long file does not need it all in memory."""
+    rng = np.random.default_rng(1)
+    remaining = int(minutes * 60 * SAMPLE_RATE)
+    with wave.open(file_path, 'wb') as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        while remaining > 0:
+            frames = min(remaining, WRITE_CHUNK_SECONDS * SAMPLE_RATE)
+            wav_file.writeframes(rng.integers(-20000, 20000, size=frames * 2, dtype=np.int16).tobytes())
+            remaining -= frames
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def waveform_pipeline(file_path):
+    with open_pcm_stream(file_path) as stream:
+        compute_stream_peaks(stream)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 10, 30])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for minutes in args.minutes:
+            file_path = os.path.join(temp_dir, "long.wav")
+            write_long_wav(file_path, minutes)
+            audio_seconds = minutes * 60
+            size_mib = os.path.getsize(file_path) / 2 ** 20
+            for name, function in (("waveform", waveform_pipeline), ("analyzer", analyze_file)):
+                elapsed, peak = measure(function, file_path)
+                print(f"{minutes:5.0f} min ({size_mib:6.0f} MiB) {name:>8}: peak {peak / 2 ** 20:6.1f} MiB allocated, "
+                      f"{audio_seconds / elapsed:7,.0f} s of audio per second")
+            os.remove(file_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Compares the previous library save (build every track dict, re-read and parse the whole config,
+json.dump with indent=4) with the streaming save (unchanged sections copied raw, track records
+encoded in chunks into a temp file renamed over the config) on a synthetic config, plus a
+ConfigStore flush where only a small section changed and one where nothing did.
+Reports wall time, peak Python allocation (tracemalloc, measured in a separate run) and file size.
+
+    python -m benchmarks.bench_library_save --tracks 200000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication
+
+from benchmarks.bench_memory import iter_metadata
+from core.config_store import ConfigStore
+from core.library import MusicLibraryManager
+
+
+def write_config(config_path, track_count):
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "library_folders": ["/home/user/Music"],
+            "tracks_cache": list(iter_metadata(track_count)),
+            "playlists_data": [{"id": f"p{i}", "name": f"Playlist {i}", "track_paths": []} for i in range(20)],
+            "ui_settings": {"volume": 70},
+        }, f, indent=4)
+
+
+def legacy_save(manager, config_path):
+    """save_library_to_disk() as it was before the streaming writer."""
+    library_data_to_save = {
+        "library_folders": list(manager.get_library_folders()),
+        "tracks_cache": [track.to_dict() for track in manager._tracks.values()],
+        "track_analysis": [],
+    }
+    with open(config_path, 'r', encoding='utf-8') as f:
+        all_config_data = json.load(f)
+    all_config_data.update(library_data_to_save)
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(all_config_data, f, indent=4)
+
+
+def streaming_save(manager, config_path):
+    manager._config_store.mark_dirty("tracks_cache") # as after any scan that touched a track
+    manager._config_store.flush()
+
+
+def settings_only_save(manager, config_path):
+    manager._config_store.set("ui_settings", {"volume": 70}) # tracks_cache is copied from the last write
+    manager._config_store.flush()
+
+
+def unchanged_save(manager, config_path):
+    manager._config_store.flush()
+
+
+def measure(function, *args):
+    gc.collect()
+    started_at = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - started_at
+    gc.collect()
+    tracemalloc.start()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=200000)
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_path = os.path.join(temp_dir, "library_config.json")
+        write_config(config_path, args.tracks)
+        manager = MusicLibraryManager(config_store=ConfigStore(config_path, write_delay_ms=None))
+        print(f"{args.tracks:,} tracks loaded from a {os.path.getsize(config_path) / 2 ** 20:.1f} MiB config")
+
+        for name, function in (("legacy", legacy_save), ("streaming", streaming_save),
+                               ("settings", settings_only_save), ("unchanged", unchanged_save)):
+            elapsed, peak = measure(function, manager, config_path)
+            print(f"{name:>10}: {elapsed * 1000:8.0f} ms, peak {peak / 2 ** 20:7.1f} MiB allocated, "
+                  f"file {os.path.getsize(config_path) / 2 ** 20:6.1f} MiB")
+    del app
+
+
+if __name__ == '__main__':
+    main()
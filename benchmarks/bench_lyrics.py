@@ -0,0 +1,92 @@
+"""
+Compares the old linear lyric line lookup with LyricsTimeline on a synthetic 2,000-line LRC,
+for steady playback (a position tick every 50 ms) and for random seeks.
+
+    python -m benchmarks.bench_lyrics --lines 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.lyrics import parse_lrc_content, LyricsTimeline
+
+TICK_MS = 50
+
+
+def make_lrc(line_count, line_ms=1500):
+    lines = []
+    for i in range(line_count):
+        position_ms = i * line_ms
+        minutes, rest = divmod(position_ms, 60000)
+        lines.append(f"[{minutes:02d}:{rest // 1000:02d}.{rest % 1000 // 10:02d}]Synthetic lyric line number {i}")
+    return "\n".join(lines)
+
+
+def linear_lookup(lyrics, position_ms):
+    """The lookup update_lyrics_display used to do on every tick."""
+    new_lyric_index = -1
+    for i, (timestamp, line) in enumerate(lyrics):
+        if position_ms >= timestamp:
+            new_lyric_index = i
+        else:
+            break
+    return new_lyric_index
+
+
+def linear_render(lyrics, index, context_lines=2):
+    display_text = ""
+    for i in range(max(0, index - context_lines), min(len(lyrics), index + context_lines + 1)):
+        line_txt = lyrics[i][1]
+        if i == index:
+            display_text += f"<b>{line_txt}</b>\n"
+        else:
+            display_text += f"<span style='color:grey;'>{line_txt}</span>\n"
+    return display_text.strip()
+
+
+def run_linear(lyrics, positions):
+    current = -1
+    started_at = time.perf_counter()
+    for position_ms in positions:
+        index = linear_lookup(lyrics, position_ms)
+        if index != current:
+            current = index
+            linear_render(lyrics, index)
+    return time.perf_counter() - started_at
+
+
+def run_timeline(lyrics, positions):
+    timeline = LyricsTimeline(lyrics)
+    started_at = time.perf_counter()
+    for position_ms in positions:
+        if timeline.seek(position_ms):
+            timeline.render()
+    return time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--seeks", type=int, default=20000)
+    args = parser.parse_args()
+
+    lyrics = parse_lrc_content(make_lrc(args.lines))
+    song_ms = lyrics[-1][0] + 5000
+    scenarios = {
+        "playback": list(range(0, song_ms, TICK_MS)),
+        "seeks": [random.Random(1).randrange(song_ms) for _ in range(args.seeks)],
+    }
+    print(f"{len(lyrics)} lyric lines, {song_ms / 60000:.0f} min")
+    for name, positions in scenarios.items():
+        linear = run_linear(lyrics, positions)
+        timeline = run_timeline(lyrics, positions)
+        print(f"{name:>8}: {len(positions)} ticks, linear {linear * 1e6 / len(positions):7.2f} us/tick, "
+              f"timeline {timeline * 1e6 / len(positions):5.2f} us/tick (x{linear / timeline:.0f})")
+
+
+if __name__ == '__main__':
+    main()
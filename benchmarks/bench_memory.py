@@ -0,0 +1,75 @@
+"""
+Measures the memory held per track by the library's track store (dict of Track by path)
+against the previous plain-dataclass representation, using tracemalloc.
+
+    python -m benchmarks.bench_memory --sizes 10000,100000,1000000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.library import Track
+
+
+@dataclass
+class PlainTrack:
+    """Track as it was before: no __slots__, every tag string kept as parsed."""
+    file_path: str
+    title: str
+    artist: str
+    album: str
+    duration_ms: int = 0
+    mtime: float = 0.0
+    size: int = 0
+    inode: int = 0
+    genre: str = ""
+
+
+def iter_metadata(count):
+    # Strings are built per track, as they are when each file's tags are parsed, so equal
+    # artist/album names start out as separate objects.
+    for i in range(count):
+        artist_no = i // 120
+        yield {
+            "file_path": f"/home/user/Music/Artist {artist_no}/Album {i // 12}/{i % 12:02d} Track {i}.flac",
+            "title": f"Track {i}",
+            "artist": f"Artist {artist_no}",
+            "album": f"Album {i // 12}",
+            "duration_ms": 180000 + i % 60000,
+            "mtime": 1700000000.0 + i,
+            "size": 20000000 + i,
+            "inode": 1000000 + i,
+            "genre": ("Rock", "Jazz", "Pop", "Electronic")[artist_no % 4],
+        }
+
+
+def measure(track_class, count):
+    gc.collect()
+    tracemalloc.start()
+    tracks = {metadata["file_path"]: track_class(**metadata) for metadata in iter_metadata(count)}
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tracks
+    gc.collect()
+    return current / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    args = parser.parse_args()
+
+    for count in (int(size) for size in args.sizes.split(",")):
+        plain = measure(PlainTrack, count)
+        compact = measure(Track, count)
+        print(f"{count:>8} tracks: plain {plain:6.0f} B/track, compact {compact:6.0f} B/track "
+              f"({(1 - compact / plain) * 100:.0f}% less, {(plain - compact) * count / 2**20:.1f} MiB saved)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the serial scan with the thread and process pools on a synthetic tree.
+
+    python -m benchmarks.bench_scan --artists 20 --albums 10 --tracks 12
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_audio import build_library_tree
+from core.scanner import LibraryScanner, EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS
+
+
+def run_scan(root_dir, executor_kind, max_workers):
+    scanner = LibraryScanner(executor_kind=executor_kind, max_workers=max_workers)
+    parsed = []
+    started_at = time.perf_counter()
+    files_done = scanner.scan([root_dir], on_batch=parsed.extend)
+    elapsed = time.perf_counter() - started_at
+    return files_done, len(parsed), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artists", type=int, default=20)
+    parser.add_argument("--albums", type=int, default=10)
+    parser.add_argument("--tracks", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        created = build_library_tree(root_dir, args.artists, args.albums, args.tracks)
+        print(f"Generated {created} files in {root_dir}")
+
+        serial_elapsed = None
+        for executor_kind in (EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            files_done, parsed, elapsed = run_scan(root_dir, executor_kind, args.workers)
+            if serial_elapsed is None:
+                serial_elapsed = elapsed
+            print(f"{executor_kind:>8}: {files_done} files, {parsed} parsed, {elapsed:.3f}s "
+                  f"({files_done / elapsed:.0f} files/s, x{serial_elapsed / elapsed:.2f} vs serial)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Times TrackSearchIndex builds and queries on a synthetic in-memory library.
+
+    python -m benchmarks.bench_search --tracks 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.library import Track
+from core.search_index import TrackSearchIndex
+
+WORDS = ("love", "night", "blue", "fire", "heart", "rain", "dream", "road", "light", "river", "shadow",
+         "summer", "gold", "stone", "wild", "silver", "dance", "ghost", "ocean", "train", "moon", "city")
+GENRES = ("Rock", "Pop", "Jazz", "Hip-Hop", "Electronic", "Classical", "Folk", "Metal", "Blues", "Soul")
+QUERIES = ("l", "lo", "love", "love night", "artist:band_12", "genre:jazz blue", "album:record_3 fire",
+           "silver river moon", "nothing_matches_this", "hert")
+
+
+def make_tracks(count, seed=1):
+    rng = random.Random(seed)
+    tracks = []
+    for i in range(count):
+        artist_no = rng.randrange(max(count // 100, 1))
+        title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        tracks.append(Track(
+            file_path=f"/music/{artist_no}/{i}.mp3",
+            title=f"{title} {i}",
+            artist=f"Band_{artist_no}",
+            album=f"Record_{rng.randrange(10)} {rng.choice(WORDS)}",
+            duration_ms=rng.randint(60000, 400000),
+            genre=rng.choice(GENRES)
+        ))
+    return tracks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tracks = make_tracks(args.tracks)
+    index = TrackSearchIndex()
+    started_at = time.perf_counter()
+    index.rebuild(tracks)
+    print(f"Indexed {len(index)} tracks in {time.perf_counter() - started_at:.2f}s")
+
+    for fuzzy in (False, True):
+        for query in QUERIES:
+            index.search(query, fuzzy=fuzzy) # warm up (builds the fuzzy tables on first use)
+            started_at = time.perf_counter()
+            for _ in range(args.repeat):
+                matches = index.search(query, fuzzy=fuzzy)
+            elapsed_ms = (time.perf_counter() - started_at) * 1000 / args.repeat
+            print(f"{'fuzzy' if fuzzy else 'exact':>5} {query!r:>26}: {len(matches):>6} matches, {elapsed_ms:.2f} ms")
+
+    started_at = time.perf_counter()
+    for track in tracks[:1000]:
+        index.remove(track.file_path)
+        index.add(track)
+    print(f"Re-indexed 1000 tracks in {(time.perf_counter() - started_at) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures waveform decode-and-reduce throughput (seconds of audio per second of wall time)
+on synthetic 44.1 kHz stereo WAV files, and the cost of opening the cached peaks afterwards.
+
+    python -m benchmarks.bench_waveform --tracks 5 --minutes 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_audio import write_wav, SAMPLE_RATE
+from core.waveform import WaveformCache
+
+
+def make_tracks(folder, track_count, minutes):
+    rng = np.random.default_rng(1)
+    frame_count = int(minutes * 60 * SAMPLE_RATE)
+    paths = []
+    for i in range(track_count):
+        path = os.path.join(folder, f"track_{i:03d}.wav")
+        noise = rng.integers(-20000, 20000, size=frame_count * 2, dtype=np.int16)
+        write_wav(path, duration_s=minutes * 60, channels=2, samples=noise)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=5)
+    parser.add_argument("--minutes", type=float, default=4.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = make_tracks(temp_dir, args.tracks, args.minutes)
+        cache = WaveformCache(os.path.join(temp_dir, "cache"))
+        audio_seconds = args.tracks * args.minutes * 60
+
+        started_at = time.perf_counter()
+        for path in paths:
+            cache.get(path)
+        decode_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for path in paths:
+            cache.get(path).columns(800)
+        cached_time = time.perf_counter() - started_at
+
+        cache_bytes = sum(entry.stat().st_size for entry in os.scandir(cache.cache_dir))
+        print(f"{args.tracks} tracks, {audio_seconds / 60:.0f} min of audio")
+        print(f"decode + reduce: {decode_time:.2f} s, {audio_seconds / decode_time:,.0f} s of audio per second")
+        print(f"cached open + 800 columns: {cached_time * 1000 / args.tracks:.2f} ms per track")
+        print(f"cache size: {cache_bytes / args.tracks / 1024:.1f} KiB per track")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import os
+import struct
+import wave
+
+SAMPLE_RATE = 44100
+
+
+def write_wav(file_path, duration_s=1.0, sample_rate=SAMPLE_RATE, channels=2, samples=None):
+    """Writes a 16-bit PCM WAV file. Uses silence unless a list/array of int16 samples is given."""
+    frame_count = int(duration_s * sample_rate)
+    with wave.open(file_path, 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        if samples is None:
+            wav_file.writeframes(b"\x00\x00" * frame_count * channels)
+        elif hasattr(samples, 'tobytes'):
+            wav_file.writeframes(samples.astype('<i2').tobytes())
+        else:
+            wav_file.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+
+
+def _flac_block(block_type, payload, is_last):
+    header = ((0x80 if is_last else 0) | block_type).to_bytes(1, 'big') + len(payload).to_bytes(3, 'big')
+    return header + payload
+
+
+def write_flac(file_path, title, artist, album, duration_s=180.0, sample_rate=SAMPLE_RATE, channels=2):
+    """
+    Writes a tag-only FLAC file: a STREAMINFO block and a VORBIS_COMMENT block, no audio frames.
+    That is all a tag reader looks at, which keeps generated trees small.
+    """
+    total_samples = int(duration_s * sample_rate)
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | ((16 - 1) << 36) | total_samples
+    stream_info = struct.pack(">HH", 4096, 4096) + b"\x00\x00\x00" * 2 + packed.to_bytes(8, 'big') + b"\x00" * 16
+
+    vendor = b"synthetic"
+    comments = [f"TITLE={title}", f"ARTIST={artist}", f"ALBUM={album}"]
+    vorbis_comment = struct.pack("<I", len(vendor)) + vendor + struct.pack("<I", len(comments))
+    for comment in comments:
+        encoded = comment.encode('utf-8')
+        vorbis_comment += struct.pack("<I", len(encoded)) + encoded
+
+    with open(file_path, 'wb') as flac_file:
+        flac_file.write(b"fLaC")
+        flac_file.write(_flac_block(0, stream_info, is_last=False))
+        flac_file.write(_flac_block(4, vorbis_comment, is_last=True))
+
+
+def build_library_tree(root_dir, artists=10, albums_per_artist=5, tracks_per_album=12, wav_every=4):
+    """Creates root/Artist/Album/NN.flac (every wav_every-th file a short WAV). Returns the file count."""
+    created = 0
+    for artist_no in range(artists):
+        artist = f"Artist {artist_no:03d}"
+        for album_no in range(albums_per_artist):
+            album = f"Album {album_no:02d}"
+            album_dir = os.path.join(root_dir, artist, album)
+            os.makedirs(album_dir, exist_ok=True)
+            for track_no in range(tracks_per_album):
+                if wav_every and created % wav_every == 0:
+                    write_wav(os.path.join(album_dir, f"{track_no:02d}.wav"), duration_s=0.05)
+                else:
+                    write_flac(os.path.join(album_dir, f"{track_no:02d}.flac"),
+                               f"Track {track_no:02d}", artist, album)
+                created += 1
+    return created
@@ -0,0 +1,90 @@
+import threading
+from PyQt6.QtCore import QCoreApplication, QEvent, QObject, QThread, pyqtSignal, pyqtSlot
+
+
+class _AnalysisWorker(QObject):
+    trackAnalysed = pyqtSignal(object)    # TrackAnalysis
+    progress = pyqtSignal(int, int)       # files done, total
+    finished = pyqtSignal(int, bool)      # files analysed, cancelled
+
+    def __init__(self, analyzer, paths, cancel_event):
+        super().__init__()
+        self._analyzer = analyzer
+        self._paths = paths
+        self._cancel_event = cancel_event
+
+    @pyqtSlot()
+    def run(self):
+        files_done = 0
+        try:
+            files_done = self._analyzer.analyze_many(self._paths, on_result=self.trackAnalysed.emit,
+                                                     should_cancel=self._cancel_event.is_set,
+                                                     on_progress=self.progress.emit)
+        except Exception as e:
+            print(f"Error while analysing tracks: {e}")
+        finally:
+            self.finished.emit(files_done, self._cancel_event.is_set())
+            self.thread().quit()
+
+
+class AnalysisService(QObject):
+    """
+    Runs an Analyzer over a list of tracks in a low-priority QThread. Every result is handed to
+    the GUI thread with trackAnalysed, where it is stored right away, so cancelling or a crash
+    only loses the files still being analysed.
+    """
+    trackAnalysed = pyqtSignal(object)
+    analysisProgress = pyqtSignal(int, int) # files done, total
+    analysisFinished = pyqtSignal(int, bool) # files analysed, cancelled
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = None
+        self._worker = None
+        self._cancel_event = threading.Event()
+
+    def is_running(self):
+        return self._thread is not None
+
+    def start(self, analyzer, paths):
+        if self.is_running():
+            print("A track analysis is already running.")
+            return False
+
+        self._cancel_event = threading.Event()
+        self._thread = QThread()
+        self._worker = _AnalysisWorker(analyzer, list(paths), self._cancel_event)
+        self._worker.moveToThread(self._thread)
+
+        self._thread.started.connect(self._worker.run)
+        self._worker.trackAnalysed.connect(self.trackAnalysed)
+        self._worker.progress.connect(self.analysisProgress)
+        self._worker.finished.connect(self._on_worker_finished)
+
+        self._thread.start(QThread.Priority.LowestPriority)
+        return True
+
+    def cancel(self):
+        if self.is_running():
+            self._cancel_event.set()
+
+    def wait(self, timeout_ms=None):
+        """
+        Blocks until the worker thread has stopped, then delivers the results it queued for this
+        thread, so they are stored before the caller goes on (e.g. to the shutdown save).
+        """
+        if self._thread is not None:
+            stopped = self._thread.wait() if timeout_ms is None else self._thread.wait(timeout_ms)
+            if stopped:
+                QCoreApplication.sendPostedEvents(self, QEvent.Type.MetaCall.value)
+
+    @pyqtSlot(int, bool) # a real slot: the queued call is posted to this object, so wait() can deliver it
+    def _on_worker_finished(self, files_done, cancelled):
+        thread, worker = self._thread, self._worker
+        self._thread = None
+        self._worker = None
+        thread.quit()
+        thread.wait()
+        worker.deleteLater()
+        thread.deleteLater()
+        self.analysisFinished.emit(files_done, cancelled)
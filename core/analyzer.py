@@ -0,0 +1,260 @@
+import os
+import multiprocessing
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import numpy as np
+
+from core.scanner import EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS, fingerprint_from_stat
+from core.decoder import open_pcm_stream, AudioDecodeError
+
+BLOCK_SIZE = 4096  # samples per analysis block (one FFT, ~93 ms at 44.1 kHz)
+BLOCKS_PER_READ = 32 # analysis blocks decoded and transformed together (~3 s of audio)
+ONSET_HOP = 512    # samples per onset-envelope step inside a block
+MIN_TEMPO_BPM = 40
+MAX_TEMPO_BPM = 220
+IN_FLIGHT_PER_WORKER = 2  # files queued per pool worker, so a slow file never leaves the others idle
+PREFERRED_TEMPO_BPM = 120 # centre of the log-normal prior that settles half/double tempo ambiguity
+MIN_ONSET_STRENGTH = 1.0  # log-energy jump below which a track is treated as having no beat
+SILENCE_DB = -120.0
+CHROMA_MIN_HZ = 27.5
+CHROMA_MAX_HZ = 4200.0
+
+PITCH_CLASSES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+# Krumhansl-Kessler key profiles, tonic first.
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+
+@dataclass
+class TrackAnalysis:
+    """Audio features of one track. mtime/size/inode are the file fingerprint the features were computed from."""
+    file_path: str
+    mtime: float = 0.0
+    size: int = 0
+    inode: int = 0
+    duration_s: float = 0.0
+    rms_db: float = SILENCE_DB
+    peak_db: float = SILENCE_DB
+    spectral_centroid_hz: float = 0.0
+    tempo_bpm: float = 0.0 # 0 when no beat was found
+    key: str = ""          # e.g. "A minor"; "" for silence
+
+    def fingerprint(self):
+        return self.mtime, self.size, self.inode
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def _to_db(value):
+    return max(SILENCE_DB, 10.0 * np.log10(value)) if value > 0 else SILENCE_DB
+
+
+class FeatureAccumulator:
+    """
+    Collects running sums over consecutive mono chunks of float samples in [-1, 1], so a track is
+    analysed chunk by chunk. Every chunk but the last must hold a whole number of BLOCK_SIZE blocks;
+    per block it gathers energy and peak, the summed magnitude spectrum
+    (centroid and chroma), and a per-hop log-energy envelope for tempo.
+    """
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.sample_count = 0
+        self._sum_squares = 0.0
+        self._peak = 0.0
+        self._window = np.hanning(BLOCK_SIZE).astype(np.float32)
+        self._spectrum_sum = np.zeros(BLOCK_SIZE // 2 + 1)
+        self._hop_energies = []
+
+    def add_samples(self, chunk):
+        if len(chunk) == 0:
+            return
+        chunk = np.asarray(chunk, dtype=np.float32)
+        self.sample_count += len(chunk)
+        self._sum_squares += float(np.dot(chunk, chunk))
+        self._peak = max(self._peak, float(np.abs(chunk).max()))
+
+        # One batched FFT over all blocks of the chunk; a short tail is zero-padded to a full block.
+        block_count = -(-len(chunk) // BLOCK_SIZE)
+        blocks = np.pad(chunk, (0, block_count * BLOCK_SIZE - len(chunk))).reshape(block_count, BLOCK_SIZE)
+        self._spectrum_sum += np.abs(np.fft.rfft(blocks * self._window, axis=1)).sum(axis=0)
+
+        whole_hops = len(chunk) // ONSET_HOP * ONSET_HOP
+        if whole_hops:
+            hops = chunk[:whole_hops].reshape(-1, ONSET_HOP)
+            self._hop_energies.append(np.einsum('ij,ij->i', hops, hops))
+
+    def _spectral_centroid(self):
+        total = self._spectrum_sum.sum()
+        if total <= 0:
+            return 0.0
+        frequencies = np.fft.rfftfreq(BLOCK_SIZE, 1.0 / self.sample_rate)
+        return float(np.dot(frequencies, self._spectrum_sum) / total)
+
+    def _key(self):
+        frequencies = np.fft.rfftfreq(BLOCK_SIZE, 1.0 / self.sample_rate)
+        in_range = (frequencies >= CHROMA_MIN_HZ) & (frequencies <= CHROMA_MAX_HZ)
+        if not self._spectrum_sum[in_range].any():
+            return ""
+        midi_notes = np.rint(69 + 12 * np.log2(frequencies[in_range] / 440.0)).astype(int)
+        chroma = np.bincount(midi_notes % 12, weights=self._spectrum_sum[in_range] ** 2, minlength=12)
+        best_score, best_key = -np.inf, ""
+        for mode, profile in (("major", MAJOR_PROFILE), ("minor", MINOR_PROFILE)):
+            for tonic in range(12):
+                score = np.corrcoef(chroma, np.roll(profile, tonic))[0, 1]
+                if score > best_score:
+                    best_score, best_key = score, f"{PITCH_CLASSES[tonic]} {mode}"
+        return best_key
+
+    def _tempo(self):
+        if not self._hop_energies:
+            return 0.0
+        envelope = np.log(np.concatenate(self._hop_energies) + 1e-10)
+        onsets = np.maximum(np.diff(envelope), 0.0)
+        if len(onsets) < 4 or onsets.max() < MIN_ONSET_STRENGTH:
+            return 0.0
+        onsets -= onsets.mean()
+        spectrum = np.fft.rfft(onsets, 2 * len(onsets))
+        autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum))[:len(onsets)]
+
+        hops_per_second = self.sample_rate / ONSET_HOP
+        min_lag = max(1, int(60 * hops_per_second / MAX_TEMPO_BPM))
+        max_lag = min(len(autocorrelation) - 2, int(np.ceil(60 * hops_per_second / MIN_TEMPO_BPM)))
+        if max_lag <= min_lag:
+            return 0.0
+        lags = np.arange(min_lag, max_lag + 1)
+        prior = np.exp(-0.5 * np.log2(60 * hops_per_second / lags / PREFERRED_TEMPO_BPM) ** 2)
+        best_lag = lags[np.argmax(autocorrelation[lags] * prior)]
+
+        # Parabolic interpolation around the peak for a sub-hop lag.
+        left, centre, right = autocorrelation[best_lag - 1:best_lag + 2]
+        denominator = left - 2 * centre + right
+        offset = 0.5 * (left - right) / denominator if denominator < 0 else 0.0
+        return float(60 * hops_per_second / (best_lag + offset))
+
+    def features(self):
+        mean_square = self._sum_squares / self.sample_count if self.sample_count else 0.0
+        return {
+            'duration_s': self.sample_count / self.sample_rate if self.sample_rate else 0.0,
+            'rms_db': float(_to_db(mean_square)),
+            'peak_db': float(_to_db(self._peak ** 2)),
+            'spectral_centroid_hz': self._spectral_centroid(),
+            'tempo_bpm': self._tempo(),
+            'key': self._key(),
+        }
+
+
+def analyze_blocks(blocks, sample_rate, full_scale):
+    """
+    Computes the feature dict of TrackAnalysis from consecutive (frames, channels) blocks whose
+    length is a multiple of BLOCK_SIZE (the last may be shorter), e.g. PcmStream.frames(BLOCK_SIZE).
+    Each block is down-mixed on its own, so a float copy of the whole track is never made.
+    """
+    accumulator = FeatureAccumulator(sample_rate)
+    for block in blocks:
+        block = np.asarray(block)
+        if block.ndim == 1:
+            block = block.reshape(-1, 1)
+        accumulator.add_samples(block.sum(axis=1, dtype=np.float32) * np.float32(1.0 / (full_scale * block.shape[1])))
+    return accumulator.features()
+
+
+def analyze_samples(samples, sample_rate, full_scale):
+    """analyze_blocks() for samples that are already in memory as one (frames, channels) array."""
+    read_size = BLOCK_SIZE * BLOCKS_PER_READ
+    return analyze_blocks((samples[start:start + read_size] for start in range(0, len(samples), read_size)),
+                          sample_rate, full_scale)
+
+
+def analyze_file(file_path):
+    """
+    Analyses one file. Runs inside pool workers, so it only returns plain picklable data:
+    a TrackAnalysis, or None if the file could not be read or decoded.
+    """
+    try:
+        mtime, size, inode = fingerprint_from_stat(os.stat(file_path))
+        with open_pcm_stream(file_path) as stream:
+            features = analyze_blocks(stream.frames(BLOCK_SIZE * BLOCKS_PER_READ), stream.sample_rate, stream.full_scale)
+    except (OSError, AudioDecodeError) as e:
+        print(f"Warning: Could not analyse {file_path}: {e}")
+        return None
+    return TrackAnalysis(file_path, mtime, size, inode, **features)
+
+
+class Analyzer:
+    """
+    Extracts loudness, peak level, spectral centroid, tempo and key from tracks.
+    analyze() handles one track on the calling thread; analyze_many() spreads a library
+    over a pool (processes by default, since the work is CPU-bound NumPy and FFTs).
+    """
+
+    def __init__(self, executor_kind=EXECUTOR_PROCESS, max_workers=None):
+        if executor_kind not in (EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"Unknown executor kind: {executor_kind}")
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers if max_workers else (os.cpu_count() or 1)
+
+    def analyze(self, track):
+        """Analyses a Track (or a file path); returns a TrackAnalysis, or None without a readable track."""
+        if track is None:
+            return None
+        return analyze_file(getattr(track, "file_path", track))
+
+    def _create_executor(self):
+        if self.executor_kind == EXECUTOR_PROCESS:
+            # Spawned, not forked: the pool is started from a QThread of a multithreaded GUI process.
+            return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        if self.executor_kind == EXECUTOR_THREAD:
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analyzer")
+        return None
+
+    def analyze_many(self, tracks, on_result=None, should_cancel=None, on_progress=None):
+        """
+        Analyses an iterable of Tracks or paths and returns the number of files analysed.
+        on_result(TrackAnalysis) is called for every success as soon as it is ready (in completion
+        order with a pool); should_cancel() is polled and on_progress(files_done, total) called
+        after every file. A pool is kept IN_FLIGHT_PER_WORKER files per worker ahead.
+        """
+        paths = [getattr(track, "file_path", track) for track in tracks]
+        files_done = 0
+        executor = self._create_executor()
+        if executor is None:
+            for file_path in paths:
+                if should_cancel and should_cancel():
+                    print("Track analysis cancelled.")
+                    break
+                analysis = analyze_file(file_path)
+                if analysis is not None and on_result:
+                    on_result(analysis)
+                files_done += 1
+                if on_progress:
+                    on_progress(files_done, len(paths))
+            return files_done
+
+        pending_paths = iter(paths)
+        in_flight = set()
+        try:
+            while True:
+                if should_cancel and should_cancel():
+                    print("Track analysis cancelled.")
+                    break
+                while len(in_flight) < self.max_workers * IN_FLIGHT_PER_WORKER:
+                    file_path = next(pending_paths, None)
+                    if file_path is None:
+                        break
+                    in_flight.add(executor.submit(analyze_file, file_path))
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    analysis = future.result()
+                    if analysis is not None and on_result:
+                        on_result(analysis)
+                    files_done += 1
+                    if on_progress:
+                        on_progress(files_done, len(paths))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return files_done
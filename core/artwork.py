@@ -0,0 +1,249 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+
+from core.json_sections import write_json_sections
+from core.tags import read_tags, locate_artwork
+
+THUMBNAIL_SIZE = 64                           # cover thumbnails fit in a square of this many pixels
+DEFAULT_ARTWORK_CACHE_BYTES = 64 * 1024 * 1024
+ALBUM_INDEX_FILE_NAME = "albums.json"
+FOLDER_ARTWORK_NAMES = ("folder.jpg", "cover.jpg", "front.jpg", "folder.png", "cover.png", "front.png", "albumart.jpg")
+
+
+def album_key(file_path, album):
+    """Tracks of one album share their artwork: keyed by folder and album name, so compilations count as one album."""
+    return f"{os.path.dirname(file_path)}\x1f{(album or '').casefold()}"
+
+
+def _file_signature(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def read_embedded_artwork(file_path):
+    """
+    Returns the bytes of the first embedded picture (APIC frame, FLAC picture block, MP4 cover)
+    or None. The tags come from the shared tag cache and the picture is read at its located offset.
+    """
+    info = read_tags(file_path)
+    if info is None:
+        return None
+    for ref in locate_artwork(file_path, info.artwork):
+        if ref.offset is None:
+            continue
+        try:
+            with open(file_path, 'rb') as f:
+                f.seek(ref.offset)
+                data = f.read(ref.length)
+        except OSError as e:
+            print(f"Warning: Could not read cover art of {file_path}: {e}")
+            return None
+        if len(data) == ref.length:
+            return data
+    return None
+
+
+def find_folder_artwork(directory):
+    """Returns the path of folder.jpg, cover.jpg, ... (case-insensitive) in directory, or None."""
+    try:
+        names = {name.lower(): name for name in os.listdir(directory)}
+    except OSError:
+        return None
+    for candidate in FOLDER_ARTWORK_NAMES:
+        if candidate in names:
+            return os.path.join(directory, names[candidate])
+    return None
+
+
+def extract_album_artwork(file_path):
+    """Returns (source_path, image_bytes) of the artwork for file_path's album, or (None, None)."""
+    data = read_embedded_artwork(file_path)
+    if data is not None:
+        return file_path, data
+    image_path = find_folder_artwork(os.path.dirname(file_path))
+    if image_path is not None:
+        try:
+            with open(image_path, 'rb') as f:
+                return image_path, f.read()
+        except OSError as e:
+            print(f"Warning: Could not read cover art {image_path}: {e}")
+    return None, None
+
+
+def make_thumbnail(image_bytes, size=THUMBNAIL_SIZE):
+    """Decodes an image and scales it to fit size x size. Returns a QImage, or None if it cannot be decoded."""
+    image = QImage.fromData(image_bytes)
+    if image.isNull():
+        return None
+    return image.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
+class ThumbnailCache:
+    """
+    Content-addressed on-disk store of thumbnails: one PNG per distinct cover image, named after the
+    SHA-1 of the image bytes and the thumbnail size, so albums with identical covers share a file.
+    A read bumps the file's mtime; once the files exceed max_bytes the least recently used are deleted.
+    Safe to use from several worker threads.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_ARTWORK_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries = None # file name -> size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def cache_file_path(self, digest, size):
+        return os.path.join(self.cache_dir, f"{digest}-{size}.png")
+
+    def _load_entries(self):
+        # Called with the lock held.
+        if self._entries is not None:
+            return
+        found = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".png") and entry.is_file():
+                        st = entry.stat()
+                        found.append((st.st_mtime_ns, entry.name, st.st_size))
+        except OSError:
+            pass
+        self._entries = OrderedDict((name, file_size) for _, name, file_size in sorted(found))
+        self._total_bytes = sum(self._entries.values())
+
+    def total_bytes(self):
+        with self._lock:
+            self._load_entries()
+            return self._total_bytes
+
+    def load(self, digest, size):
+        """Returns the cached thumbnail as a QImage, or None if it is not cached."""
+        cache_path = self.cache_file_path(digest, size)
+        image = QImage(cache_path)
+        if image.isNull():
+            return None
+        with self._lock:
+            self._load_entries()
+            name = os.path.basename(cache_path)
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return image
+
+    def store(self, digest, size, image):
+        cache_path = self.cache_file_path(digest, size)
+        temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if not image.save(temp_path, "PNG"):
+                raise OSError("could not encode PNG")
+            os.replace(temp_path, cache_path) # readers never see a half-written file
+            file_size = os.path.getsize(cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write artwork cache file {cache_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        with self._lock:
+            self._load_entries()
+            name = os.path.basename(cache_path)
+            self._total_bytes += file_size - self._entries.pop(name, 0)
+            self._entries[name] = file_size
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held.
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, file_size = self._entries.popitem(last=False)
+            self._total_bytes -= file_size
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError as e:
+                print(f"Warning: Could not evict artwork cache file {name}: {e}")
+
+
+class ArtworkCache:
+    """
+    Album artwork lookup: extracts the cover once per album (embedded picture first, then
+    folder.jpg and friends), stores its thumbnail in a ThumbnailCache and remembers which image
+    each album uses in albums.json, so later sessions load the thumbnail without parsing tags
+    as long as the source file is unchanged. Safe to use from several worker threads.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_ARTWORK_CACHE_BYTES, thumbnail_size=THUMBNAIL_SIZE):
+        self.cache_dir = cache_dir
+        self.thumbnail_size = thumbnail_size
+        self.thumbnails = ThumbnailCache(cache_dir, max_bytes)
+        self._index_path = os.path.join(cache_dir, ALBUM_INDEX_FILE_NAME)
+        self._albums = None             # album key -> [digest, source_path, source mtime_ns, source size]
+        self._without_artwork = set()   # album keys found to have no artwork this session
+        self._index_dirty = False
+        self._lock = threading.Lock()
+
+    def _album_index(self):
+        # Called with the lock held.
+        if self._albums is None:
+            self._albums = {}
+            try:
+                with open(self._index_path, 'r', encoding='utf-8') as f:
+                    albums = json.load(f)
+                if isinstance(albums, dict):
+                    self._albums = albums
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"Warning: Discarding unreadable artwork index {self._index_path}: {e}")
+        return self._albums
+
+    def get(self, file_path, album):
+        """Returns the thumbnail QImage for the album of file_path, or None if it has no artwork."""
+        key = album_key(file_path, album)
+        with self._lock:
+            if key in self._without_artwork:
+                return None
+            entry = self._album_index().get(key)
+        if entry is not None and _file_signature(entry[1]) == entry[2:]:
+            image = self.thumbnails.load(entry[0], self.thumbnail_size)
+            if image is not None:
+                return image
+
+        source_path, data = extract_album_artwork(file_path)
+        image = make_thumbnail(data, self.thumbnail_size) if data is not None else None
+        if image is None:
+            with self._lock:
+                self._without_artwork.add(key)
+                if self._album_index().pop(key, None) is not None:
+                    self._index_dirty = True
+            return None
+
+        digest = hashlib.sha1(data).hexdigest()
+        if not os.path.exists(self.thumbnails.cache_file_path(digest, self.thumbnail_size)):
+            self.thumbnails.store(digest, self.thumbnail_size, image)
+        with self._lock:
+            self._album_index()[key] = [digest, source_path] + (_file_signature(source_path) or [0, 0])
+            self._index_dirty = True
+        return image
+
+    def save_index(self):
+        """Writes albums.json if it changed; cheap to call when nothing did."""
+        with self._lock:
+            if not self._index_dirty:
+                return
+            albums = dict(self._album_index())
+            self._index_dirty = False
+        try:
+            write_json_sections(self._index_path, albums)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not write artwork index {self._index_path}: {e}")
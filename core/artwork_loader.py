@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.artwork import ArtworkCache, DEFAULT_ARTWORK_CACHE_BYTES, album_key
+
+DEFAULT_ARTWORK_WORKERS = 4
+
+
+class ArtworkLoader(QObject):
+    """
+    Fetches album thumbnails from an ArtworkCache on a small worker pool. Each album is requested
+    at most once at a time however many of its rows ask; artworkReady is emitted on the GUI thread
+    with (album key, QImage or None). cancel_pending() drops requests that have not started yet,
+    e.g. for rows that were scrolled away.
+    """
+    artworkReady = pyqtSignal(str, object) # album key, QImage or None
+    _jobDone = pyqtSignal(object)          # Future; emitted from a worker thread, delivered queued
+
+    def __init__(self, cache_dir, parent=None, max_workers=DEFAULT_ARTWORK_WORKERS,
+                 max_cache_bytes=DEFAULT_ARTWORK_CACHE_BYTES):
+        super().__init__(parent)
+        self._cache = ArtworkCache(cache_dir, max_cache_bytes)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artwork")
+        self._pending = {} # album key -> Future
+        self._jobDone.connect(self._on_job_done)
+
+    def request(self, file_path, album):
+        """Queues the artwork of file_path's album unless it is already on its way. Returns the album key."""
+        key = album_key(file_path, album)
+        if key not in self._pending:
+            future = self._executor.submit(self._load, key, file_path, album)
+            self._pending[key] = future
+            future.add_done_callback(self._jobDone.emit)
+        return key
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def _load(self, key, file_path, album):
+        try:
+            return key, self._cache.get(file_path, album)
+        except Exception as e:
+            print(f"Error loading artwork for {file_path}: {e}")
+            return key, None
+
+    def cancel_pending(self):
+        for key, future in list(self._pending.items()):
+            if future.cancel():
+                del self._pending[key]
+
+    def shutdown(self):
+        self.cancel_pending()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._cache.save_index()
+
+    def _on_job_done(self, future):
+        if future.cancelled():
+            return
+        key, image = future.result()
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        self.artworkReady.emit(key, image)
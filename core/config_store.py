@@ -0,0 +1,212 @@
+import os
+import json
+from PyQt6.QtCore import QObject, QTimer, QStandardPaths, QDir
+
+from core.json_sections import RawJson, StreamedArray, read_raw_sections, write_json_sections
+
+CONFIG_DIR_NAME = "MusicPlayerApp"
+CONFIG_FILE_NAME = "library_config.json"
+DEFAULT_WRITE_DELAY_MS = 2000 # changes made within this window reach the disk in one write
+DEFERRED_WRITE_DELAY_MS = 5 * 60 * 1000 # large sections (the track list) are re-encoded at most this often
+
+
+def default_config_path():
+    """Returns <AppConfigLocation>/MusicPlayerApp/library_config.json, creating the directory if needed."""
+    config_dir_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppConfigLocation)
+    if not config_dir_path:
+        config_dir_path = os.path.join(os.path.expanduser("~"), ".MusicPlayerApp")
+
+    app_config_dir = QDir(os.path.join(config_dir_path, CONFIG_DIR_NAME))
+    if not app_config_dir.exists():
+        app_config_dir.mkpath(".")
+    return os.path.join(app_config_dir.absolutePath(), CONFIG_FILE_NAME)
+
+
+class _SectionWriter:
+    """A section whose value is produced by its owner only when the file is written."""
+
+    def __init__(self, produce):
+        self.produce = produce
+
+    def materialize(self):
+        value = self.produce()
+        return list(value.items) if isinstance(value, StreamedArray) else value
+
+
+class ConfigStore(QObject):
+    """
+    The one reader and writer of library_config.json. The document is parsed once and kept in
+    memory; components read their top-level section with get(), replace it with set() or register
+    a writer for it, and mark_dirty() when it changed. Changes are coalesced by a write-behind timer
+    and flush() writes the whole file once, atomically (see core.json_sections). Clean sections
+    that only a writer can produce are copied from the current file instead of being re-encoded.
+
+    Sections that are expensive to encode are marked dirty with deferred=True: they do not arm the
+    write-behind timer and its writes keep copying their previous value from the file. They are
+    re-encoded by an explicit flush() (e.g. on shutdown) or by the much slower deferred timer
+    armed with schedule_deferred_write(). Timer writes wait while any flush guard returns True.
+    """
+
+    def __init__(self, config_path=None, write_delay_ms=DEFAULT_WRITE_DELAY_MS, parent=None,
+                 deferred_write_delay_ms=DEFERRED_WRITE_DELAY_MS):
+        super().__init__(parent)
+        self.config_path = config_path or default_config_path()
+        self._document = {}
+        self._dirty = set()
+        self._deferred = set() # dirty sections only an explicit or deferred flush re-encodes
+        self._flush_guards = []
+        self._file_spans = None # {key: (start, end)} of the file as flush() last wrote it
+        self._file_state = None # (st_mtime_ns, st_size) right after that write
+        self._write_timer = QTimer(self)
+        self._write_timer.setSingleShot(True)
+        self._write_timer.timeout.connect(self._on_write_timer)
+        self.write_delay_ms = write_delay_ms # None disables the timer; only flush() writes
+        self._deferred_timer = QTimer(self)
+        self._deferred_timer.setSingleShot(True)
+        self._deferred_timer.timeout.connect(self._on_deferred_timer)
+        self.deferred_write_delay_ms = deferred_write_delay_ms
+        self.load()
+
+    def exists(self):
+        return os.path.exists(self.config_path)
+
+    def load(self):
+        """(Re)reads the file, dropping unsaved changes. A missing or corrupted file gives an empty document."""
+        self._write_timer.stop()
+        self._deferred_timer.stop()
+        self._document = {}
+        self._dirty = set()
+        self._deferred = set()
+        self._file_spans = None
+        if not self.exists():
+            return
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not read config file {self.config_path}: {e}. Starting with an empty config.")
+            return
+        if isinstance(document, dict):
+            self._document = document
+        else:
+            print(f"Warning: Config file {self.config_path} does not hold a JSON object. Starting with an empty config.")
+
+    def get(self, key, default=None):
+        value = self._document.get(key, default)
+        if isinstance(value, _SectionWriter):
+            return value.materialize()
+        return value
+
+    def set(self, key, value):
+        self._document[key] = value
+        self.mark_dirty(key)
+
+    def set_writer(self, key, produce):
+        """
+        Lets the owner of a large section (e.g. tracks_cache) hand its parsed value back: from now on
+        produce() is called at write time and may return a StreamedArray. Does not mark the section dirty.
+        """
+        self._document[key] = _SectionWriter(produce)
+
+    def remove(self, key):
+        if self._document.pop(key, None) is not None:
+            self.mark_dirty(key)
+
+    def mark_dirty(self, key, deferred=False):
+        if deferred:
+            if key not in self._dirty:
+                self._deferred.add(key)
+        else:
+            self._deferred.discard(key)
+            self._dirty.add(key)
+            self.schedule_write()
+
+    def schedule_write(self):
+        """Starts the write-behind timer unless it is already running or disabled."""
+        if self.write_delay_ms is not None and not self._write_timer.isActive():
+            # Not restarted by later changes, so a steady stream of edits still gets written.
+            self._write_timer.start(self.write_delay_ms)
+
+    def schedule_deferred_write(self):
+        """Starts the slow timer that also re-encodes deferred sections, unless it is running or disabled."""
+        if self._deferred and self.deferred_write_delay_ms is not None and not self._deferred_timer.isActive():
+            self._deferred_timer.start(self.deferred_write_delay_ms)
+
+    def add_flush_guard(self, is_busy):
+        """Timer writes are postponed while is_busy() returns True (e.g. during a library scan)."""
+        self._flush_guards.append(is_busy)
+
+    def _is_guarded(self):
+        return any(is_busy() for is_busy in self._flush_guards)
+
+    def _on_write_timer(self):
+        if self._is_guarded():
+            self._write_timer.start(self.write_delay_ms)
+        else:
+            self.flush(include_deferred=False)
+
+    def _on_deferred_timer(self):
+        if self._is_guarded():
+            self._deferred_timer.start(self.deferred_write_delay_ms)
+        else:
+            self.flush()
+
+    def is_dirty(self, key=None):
+        if key is None:
+            return bool(self._dirty or self._deferred)
+        return key in self._dirty or key in self._deferred
+
+    def _current_raw_sections(self):
+        if self._file_spans is not None and self._file_state is not None:
+            try:
+                stat_result = os.stat(self.config_path)
+                if (stat_result.st_mtime_ns, stat_result.st_size) == self._file_state:
+                    with open(self.config_path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                    return {key: RawJson(text, start, end) for key, (start, end) in self._file_spans.items()}
+            except OSError:
+                pass
+        try:
+            return read_raw_sections(self.config_path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not reuse sections of {self.config_path}: {e}")
+            return {}
+
+    def flush(self, include_deferred=True):
+        """
+        Writes the document if anything changed since the last write. Returns True if the file was written.
+        With include_deferred=False (timer writes) deferred sections keep their value from the file.
+        """
+        self._write_timer.stop()
+        if include_deferred:
+            self._deferred_timer.stop()
+        to_encode = self._dirty | self._deferred if include_deferred else self._dirty
+        if not to_encode and self.exists():
+            return False
+
+        copied_writers = [key for key, value in self._document.items()
+                          if isinstance(value, _SectionWriter) and key not in to_encode]
+        raw_sections = self._current_raw_sections() if copied_writers and self.exists() else {}
+        sections = {}
+        encoded = set()
+        for key, value in self._document.items():
+            if isinstance(value, _SectionWriter) and key in copied_writers and key in raw_sections:
+                sections[key] = raw_sections[key]
+            elif isinstance(value, _SectionWriter):
+                sections[key] = value.produce()
+                encoded.add(key)
+            else:
+                sections[key] = value
+                encoded.add(key)
+
+        try:
+            self._file_spans = write_json_sections(self.config_path, sections)
+            stat_result = os.stat(self.config_path)
+            self._file_state = (stat_result.st_mtime_ns, stat_result.st_size)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving config to {self.config_path}: {e}")
+            return False
+        print(f"Config saved to {self.config_path} (changed: {', '.join(sorted(to_encode & encoded)) or 'none'})")
+        self._dirty = set()
+        self._deferred -= encoded
+        return True
@@ -0,0 +1,233 @@
+import os
+import mmap
+import shutil
+import struct
+import subprocess
+
+import numpy as np
+
+try:
+    import soundfile # optional: streams FLAC/OGG (and MP3 with libsndfile >= 1.1) in blocks
+except ImportError:
+    soundfile = None
+
+DEFAULT_FRAME_SIZE = 65536 # frames per yielded block (~1.5 s of 44.1 kHz audio)
+
+WAV_EXTENSIONS = (".wav", ".wave")
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+WAV_SAMPLE_TYPES = {8: np.uint8, 16: np.dtype('<i2'), 32: np.dtype('<i4')}
+
+FFMPEG_SAMPLE_RATE = 44100 # the ffmpeg backend resamples everything to 44.1 kHz stereo 16-bit
+FFMPEG_CHANNELS = 2
+
+
+class AudioDecodeError(Exception):
+    pass
+
+
+class PcmStream:
+    """
+    A decoded audio source read in fixed-size blocks. frames() yields arrays of shape
+    (frame_size, channels) (the last one may be shorter); samples are integers with
+    magnitude up to full_scale, or floats in [-1, 1] with full_scale 1.0.
+    Only one block is held at a time, so memory does not grow with the length of the file.
+    """
+
+    def __init__(self, file_path, sample_rate, channels, full_scale, frame_count=None):
+        self.file_path = file_path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.full_scale = full_scale
+        self.frame_count = frame_count # None when the backend cannot tell in advance
+
+    def frames(self, frame_size=DEFAULT_FRAME_SIZE):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class WavStream(PcmStream):
+    """Reads a PCM or float WAV file through a read-only mmap, with a NumPy view of its data chunk."""
+
+    def __init__(self, file_path):
+        audio_format, channels, sample_rate, bits, data_offset, data_size = _read_wav_header(file_path)
+        bytes_per_sample = (bits + 7) // 8
+        frame_count = data_size // (bytes_per_sample * channels)
+        if audio_format == WAVE_FORMAT_IEEE_FLOAT:
+            if bits not in (32, 64):
+                raise AudioDecodeError(f"Unsupported float WAV sample size: {bits} bits")
+            dtype, full_scale = np.dtype('<f4') if bits == 32 else np.dtype('<f8'), 1.0
+        elif bits == 24:
+            dtype, full_scale = np.uint8, 2 ** 31 # triplets are widened to int32 block by block
+        elif bits in WAV_SAMPLE_TYPES:
+            dtype, full_scale = WAV_SAMPLE_TYPES[bits], 2 ** (bits - 1)
+        else:
+            raise AudioDecodeError(f"Unsupported WAV sample size: {bits} bits")
+        super().__init__(file_path, sample_rate, channels, full_scale, frame_count)
+        self._bits = bits
+        self._map = None
+        self._data = None
+        self._data_offset = data_offset
+        if frame_count:
+            shape = (frame_count, channels * 3) if bits == 24 else (frame_count, channels)
+            try:
+                with open(file_path, 'rb') as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) # the map keeps its own handle
+            except (OSError, ValueError) as e:
+                raise AudioDecodeError(f"Could not map {file_path}: {e}") from e
+            count = shape[0] * shape[1]
+            self._data = np.frombuffer(self._map, dtype=dtype, count=count, offset=data_offset).reshape(shape)
+
+    def _release_pages(self, end_frame):
+        # Drop the already processed part of the map from the page cache so a long file does
+        # not stay resident; the pages are clean, so anything touched again is simply re-read.
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        end_byte = self._data_offset + end_frame * self._data.strides[0]
+        release = end_byte // mmap.PAGESIZE * mmap.PAGESIZE
+        if release > 0:
+            self._map.madvise(mmap.MADV_DONTNEED, 0, release)
+
+    def frames(self, frame_size=DEFAULT_FRAME_SIZE):
+        if self._data is None:
+            return
+        for start in range(0, self.frame_count, frame_size):
+            if start:
+                self._release_pages(start)
+            block = self._data[start:start + frame_size]
+            if self._bits == 24:
+                widened = np.zeros((len(block), self.channels, 4), dtype=np.uint8)
+                widened[:, :, 1:] = block.reshape(len(block), self.channels, 3)
+                block = widened.view('<i4').reshape(len(block), self.channels)
+            elif self._bits == 8:
+                block = block.astype(np.int16) - 128 # 8-bit WAV is unsigned
+            yield block
+
+    def close(self):
+        self._data = None
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass # blocks handed out earlier still view the map; it is unmapped once the last of them is gone
+            self._map = None
+
+
+class SoundFileStream(PcmStream):
+    def __init__(self, file_path):
+        try:
+            info = soundfile.info(file_path)
+        except RuntimeError as e:
+            raise AudioDecodeError(f"Could not decode {file_path}: {e}") from e
+        super().__init__(file_path, info.samplerate, info.channels, 2 ** 15, info.frames or None)
+
+    def frames(self, frame_size=DEFAULT_FRAME_SIZE):
+        try:
+            yield from soundfile.blocks(self.file_path, blocksize=frame_size, dtype='int16', always_2d=True)
+        except RuntimeError as e:
+            raise AudioDecodeError(f"Could not decode {self.file_path}: {e}") from e
+
+
+class FfmpegStream(PcmStream):
+    """Pipes raw 16-bit PCM out of an ffmpeg process and reads it one block at a time."""
+
+    def __init__(self, file_path, ffmpeg_path):
+        super().__init__(file_path, FFMPEG_SAMPLE_RATE, FFMPEG_CHANNELS, 2 ** 15)
+        self._ffmpeg_path = ffmpeg_path
+        self._process = None
+
+    def frames(self, frame_size=DEFAULT_FRAME_SIZE):
+        command = [self._ffmpeg_path, "-v", "error", "-nostdin", "-i", self.file_path, "-f", "s16le",
+                   "-acodec", "pcm_s16le", "-ac", str(self.channels), "-ar", str(self.sample_rate), "-"]
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        block_bytes = frame_size * self.channels * 2
+        try:
+            while True:
+                raw = self._process.stdout.read(block_bytes)
+                usable = len(raw) - len(raw) % (self.channels * 2)
+                if usable <= 0:
+                    break
+                yield np.frombuffer(raw[:usable], dtype='<i2').reshape(-1, self.channels)
+            if self._process.wait() != 0:
+                raise AudioDecodeError(f"ffmpeg could not decode {self.file_path}")
+        finally:
+            self.close()
+
+    def close(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.stdout.close()
+            self._process.wait()
+            self._process = None
+
+
+def _read_wav_header(file_path):
+    """Returns (audio_format, channels, sample_rate, bits_per_sample, data_offset, data_size) of a RIFF/WAVE file."""
+    file_size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise AudioDecodeError(f"{file_path} is not a RIFF/WAVE file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise AudioDecodeError(f"{file_path} has no data chunk")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                payload = f.read(chunk_size)
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', payload[:16])
+                if audio_format == WAVE_FORMAT_EXTENSIBLE and len(payload) >= 26:
+                    audio_format = struct.unpack('<H', payload[24:26])[0] # first two bytes of the sub-format GUID
+                fmt = (audio_format, channels, sample_rate, bits)
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise AudioDecodeError(f"{file_path} has no fmt chunk before its data")
+                data_offset = f.tell()
+                # Files written by streaming encoders may carry a placeholder size; trust the file length.
+                data_size = min(chunk_size, file_size - data_offset)
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+    audio_format, channels, sample_rate, bits = fmt
+    if audio_format not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT) or channels < 1:
+        raise AudioDecodeError(f"Unsupported WAV encoding in {file_path} (format {audio_format:#x})")
+    return audio_format, channels, sample_rate, bits, data_offset, data_size
+
+
+def open_pcm_stream(file_path):
+    """
+    Opens file_path for block-wise decoding. WAV files are memory-mapped directly; other formats
+    go through soundfile if it is installed, otherwise through an ffmpeg executable on the PATH.
+    Raises AudioDecodeError if the file cannot be decoded with what is available.
+    """
+    try:
+        if file_path.lower().endswith(WAV_EXTENSIONS):
+            return WavStream(file_path)
+        if soundfile is not None:
+            return SoundFileStream(file_path)
+    except (OSError, ValueError, struct.error) as e:
+        raise AudioDecodeError(f"Could not decode {file_path}: {e}") from e
+    ffmpeg_path = shutil.which("ffmpeg")
+    if ffmpeg_path:
+        if not os.path.isfile(file_path):
+            raise AudioDecodeError(f"Could not decode {file_path}: file not found")
+        return FfmpegStream(file_path, ffmpeg_path)
+    raise AudioDecodeError(f"No decoder available for {file_path} (install soundfile or ffmpeg for non-WAV formats)")
+
+
+def iter_pcm_frames(file_path, frame_size=DEFAULT_FRAME_SIZE):
+    """Yields (frame_size, channels) blocks of file_path; see open_pcm_stream() for the backends."""
+    with open_pcm_stream(file_path) as stream:
+        yield from stream.frames(frame_size)
@@ -0,0 +1,238 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import Qt, QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+DEFAULT_DEBOUNCE_MS = 750    # quiet time after the last event before the changes are handed on
+MAX_DEBOUNCE_MS = 5000       # a long copy is still reported at least this often
+DEFAULT_POLL_INTERVAL_MS = 5000
+DEFAULT_SETTLE_MS = 3000     # files modified more recently than this are taken to be still copying
+
+
+def _is_inside(path, folder):
+    return path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+
+
+def iter_sub_directories(folder_path):
+    """Yields folder_path and every directory below it (symlinks are not followed)."""
+    pending_dirs = [folder_path]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        yield current_dir
+        try:
+            with os.scandir(current_dir) as entries:
+                pending_dirs.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError as e:
+            print(f"Warning: Could not read directory {current_dir}: {e}")
+
+
+def _directory_mtime(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+class LibraryFolderWatcher(QObject):
+    """
+    Watches every directory under the library folders and reports which of them had entries
+    added, removed or renamed. QFileSystemWatcher is used where it can (inotify on Linux);
+    directories it refuses, e.g. past the inotify watch limit, or all of them with use_polling=True,
+    are polled by comparing their mtime. Bursts of events are debounced into one directoriesChanged.
+    Subdirectories created later are watched (and reported) as soon as their parent changes.
+
+    The directory tree of a newly added folder is walked on a worker thread; folderWatched is
+    emitted once all of it is watched. settle_ms is how long files must stay untouched before
+    the owner treats them as complete; it reports the others back with recheck_later().
+    """
+    directoriesChanged = pyqtSignal(list) # directories whose direct contents may have changed
+    folderWatched = pyqtSignal(str)       # library folder whose whole tree is watched now
+    _walkDone = pyqtSignal(object)        # Future; emitted from the walker thread, delivered queued
+
+    def __init__(self, parent=None, debounce_ms=DEFAULT_DEBOUNCE_MS, poll_interval_ms=DEFAULT_POLL_INTERVAL_MS,
+                 use_polling=False, settle_ms=DEFAULT_SETTLE_MS):
+        super().__init__(parent)
+        self.debounce_ms = debounce_ms
+        self.use_polling = use_polling
+        self.settle_ms = settle_ms
+        self._folders = set()
+        self._walker = None # single-thread executor listing the directory trees of added folders
+        self._stop_walks = threading.Event()
+        self._walking = set() # folders whose tree is still being listed
+        # Queued even when the walk finishes before add_done_callback() runs on this thread.
+        self._walkDone.connect(self._on_walk_done, Qt.ConnectionType.QueuedConnection)
+        self._watched_dirs = set()
+        self._polled_dirs = {} # directory -> st_mtime_ns at the last poll
+        self._pending_dirs = set()
+        self._pending_since = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.timeout.connect(self.flush)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_interval_ms)
+        self._poll_timer.timeout.connect(self.poll)
+
+    def get_folders(self):
+        return list(self._folders)
+
+    def watched_directory_count(self):
+        return len(self._watched_dirs)
+
+    def polled_directory_count(self):
+        return len(self._polled_dirs)
+
+    def set_folders(self, folder_paths):
+        for folder in list(self._folders):
+            if folder not in folder_paths:
+                self.remove_folder(folder)
+        for folder in folder_paths:
+            self.add_folder(folder)
+
+    def add_folder(self, folder_path):
+        if folder_path in self._folders or not os.path.isdir(folder_path):
+            return False
+        self._folders.add(folder_path)
+        self._watch([folder_path]) # the top level right away, the rest once the walk is done
+        if self._walker is None:
+            self._stop_walks = threading.Event()
+            self._walker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="folder-watch")
+        self._walking.add(folder_path)
+        future = self._walker.submit(self._walk_folder, folder_path, self._stop_walks)
+        future.add_done_callback(self._walkDone.emit)
+        return True
+
+    def _walk_folder(self, folder_path, stop_event):
+        # Runs on the walker thread: only lists directories.
+        directories = []
+        for directory in iter_sub_directories(folder_path):
+            if stop_event.is_set():
+                return folder_path, None
+            directories.append(directory)
+        return folder_path, directories
+
+    def _on_walk_done(self, future):
+        if future.cancelled():
+            return
+        folder_path, directories = future.result()
+        self._walking.discard(folder_path)
+        if directories is None or folder_path not in self._folders:
+            return # stopped or removed while walking
+        self._watch(directories)
+        print(f"Watching {folder_path} ({len(self._watched_dirs)} directories watched, {len(self._polled_dirs)} polled)")
+        self.folderWatched.emit(folder_path)
+
+    def remove_folder(self, folder_path):
+        if folder_path not in self._folders:
+            return False
+        self._folders.discard(folder_path)
+        # A folder nested in another library folder stays watched through that one.
+        if not any(_is_inside(folder_path, folder) for folder in self._folders):
+            self._unwatch([d for d in self._watched_dirs if _is_inside(d, folder_path)])
+        self._pending_dirs = {d for d in self._pending_dirs if d in self._watched_dirs}
+        return True
+
+    def stop(self):
+        """Stops watching everything and drops events that were not reported yet."""
+        self._debounce_timer.stop()
+        self._poll_timer.stop()
+        if self._walker is not None:
+            self._stop_walks.set()
+            self._walker.shutdown(wait=False, cancel_futures=True)
+            self._walker = None
+        self._walking = set()
+        self._unwatch(list(self._watched_dirs))
+        self._folders = set()
+        self._pending_dirs = set()
+        self._pending_since = None
+
+    def _watch(self, directories):
+        directories = [d for d in directories if d not in self._watched_dirs]
+        if not directories:
+            return
+        self._watched_dirs.update(directories)
+        failed = directories if self.use_polling else self._watcher.addPaths(directories)
+        for directory in failed:
+            self._polled_dirs[directory] = _directory_mtime(directory)
+        if self._polled_dirs and not self._poll_timer.isActive():
+            self._poll_timer.start()
+
+    def _unwatch(self, directories):
+        if not directories:
+            return
+        self._watched_dirs.difference_update(directories)
+        notified = []
+        for directory in directories:
+            if directory in self._polled_dirs:
+                del self._polled_dirs[directory]
+            else:
+                notified.append(directory)
+        if notified:
+            self._watcher.removePaths(notified)
+        if not self._polled_dirs:
+            self._poll_timer.stop()
+
+    def poll(self):
+        """Compares the mtime of every polled directory with the last poll; called by the poll timer."""
+        for directory, mtime in list(self._polled_dirs.items()):
+            current_mtime = _directory_mtime(directory)
+            if current_mtime != mtime:
+                self._polled_dirs[directory] = current_mtime
+                self._on_directory_changed(directory)
+
+    def _on_directory_changed(self, directory):
+        if directory not in self._watched_dirs:
+            return
+        now = time.monotonic()
+        if not self._pending_dirs:
+            self._pending_since = now
+        self._pending_dirs.add(directory)
+        waited_ms = (now - self._pending_since) * 1000
+        self._debounce_timer.start(max(0, min(self.debounce_ms, int(MAX_DEBOUNCE_MS - waited_ms))))
+
+    def recheck_later(self, directories):
+        """Reports directories again after another debounce, e.g. because files in them were still being written."""
+        for directory in directories:
+            self._on_directory_changed(directory)
+
+    def flush(self):
+        """
+        Reports the pending directories now. New subdirectories of a changed directory are
+        watched and reported too, vanished ones are unwatched and reported with everything below.
+        """
+        self._debounce_timer.stop()
+        pending, self._pending_dirs = self._pending_dirs, set()
+        self._pending_since = None
+        changed = set()
+        for directory in sorted(pending): # parents before their subdirectories
+            if directory not in self._watched_dirs:
+                continue # already handled as part of a vanished parent
+            changed.add(directory)
+            if not os.path.isdir(directory):
+                gone = [d for d in self._watched_dirs if _is_inside(d, directory)]
+                self._unwatch(gone)
+                changed.update(gone)
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    sub_dirs = {entry.path for entry in entries if entry.is_dir(follow_symlinks=False)}
+            except OSError as e:
+                print(f"Warning: Could not read directory {directory}: {e}")
+                continue
+            if any(_is_inside(directory, folder) for folder in self._walking):
+                continue # its subdirectories are watched when the walk of the folder is done
+            for sub_dir in sub_dirs - self._watched_dirs:
+                new_dirs = list(iter_sub_directories(sub_dir))
+                self._watch(new_dirs)
+                changed.update(new_dirs)
+            gone = [d for d in self._watched_dirs
+                    if os.path.dirname(d) == directory and d not in sub_dirs and d not in self._folders]
+            for sub_dir in gone:
+                sub_tree = [d for d in self._watched_dirs if _is_inside(d, sub_dir)]
+                self._unwatch(sub_tree)
+                changed.update(sub_tree)
+        if changed:
+            self.directoriesChanged.emit(sorted(changed))
@@ -0,0 +1,148 @@
+import os
+import re
+import json
+import tempfile
+
+RECORDS_PER_CHUNK = 1000 # array items encoded per json call when streaming
+RAW_COPY_CHUNK = 1 << 20 # characters of raw JSON copied per write
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+class RawJson:
+    """
+    Already-encoded JSON: text[start:end], e.g. a section copied unchanged from the previous file.
+    The span is kept instead of a slice so an unchanged multi-megabyte section is never duplicated.
+    """
+
+    def __init__(self, text, start=0, end=None):
+        self.text = text
+        self.start = start
+        self.end = len(text) if end is None else end
+
+    def value(self):
+        return json.loads(self.text[self.start:self.end])
+
+
+class StreamedArray:
+    """A JSON array whose items are produced lazily and encoded a chunk at a time while writing."""
+
+    def __init__(self, items, chunk_size=RECORDS_PER_CHUNK):
+        self.items = items
+        self.chunk_size = chunk_size
+
+
+def _skip_value(text, index):
+    """Returns the end of the JSON value starting at index. Arrays are walked item by item."""
+    if text[index:index + 1] != '[':
+        return _decoder.raw_decode(text, index)[1]
+    index = _WHITESPACE.match(text, index + 1).end()
+    if text[index:index + 1] == ']':
+        return index + 1
+    while True:
+        _, index = _decoder.raw_decode(text, index)
+        index = _WHITESPACE.match(text, index).end()
+        delimiter = text[index:index + 1]
+        if delimiter == ']':
+            return index + 1
+        if delimiter != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+        index = _WHITESPACE.match(text, index + 1).end()
+
+
+def read_section_spans(text):
+    """
+    Returns {key: (start, end)} for the top-level members of the JSON object in text, where
+    text[start:end] is the member's encoded value. Values are decoded by the json scanner and
+    dropped right away (top-level arrays one item at a time), so a large section is never
+    materialised as a whole.
+    Raises ValueError (json.JSONDecodeError) if text is not a JSON object.
+    """
+    spans = {}
+    index = _WHITESPACE.match(text, 0).end()
+    if text[index:index + 1] != '{':
+        raise json.JSONDecodeError("Expecting '{'", text, index)
+    index = _WHITESPACE.match(text, index + 1).end()
+    if text[index:index + 1] == '}':
+        return spans
+    while True:
+        key, index = _decoder.raw_decode(text, index)
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", text, index)
+        index = _WHITESPACE.match(text, index).end()
+        if text[index:index + 1] != ':':
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, index)
+        start = _WHITESPACE.match(text, index + 1).end()
+        end = _skip_value(text, start)
+        spans[key] = (start, end)
+        index = _WHITESPACE.match(text, end).end()
+        delimiter = text[index:index + 1]
+        index = _WHITESPACE.match(text, index + 1).end()
+        if delimiter == '}':
+            return spans
+        if delimiter != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+
+
+def read_raw_sections(file_path):
+    """Returns {key: RawJson} for the top-level members of a JSON file, or {} if it does not exist."""
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return {key: RawJson(text, start, end) for key, (start, end) in read_section_spans(text).items()}
+
+
+def _write_value(f, value):
+    """Writes one encoded value and returns how many characters that took."""
+    if isinstance(value, RawJson):
+        for start in range(value.start, value.end, RAW_COPY_CHUNK):
+            f.write(value.text[start:min(start + RAW_COPY_CHUNK, value.end)])
+        return value.end - value.start
+    if isinstance(value, StreamedArray):
+        written = f.write('[')
+        chunk = []
+        first = True
+        for item in value.items:
+            chunk.append(item)
+            if len(chunk) >= value.chunk_size:
+                written += f.write(('' if first else ',') + _encoder.encode(chunk)[1:-1])
+                first = False
+                chunk = []
+        if chunk:
+            written += f.write(('' if first else ',') + _encoder.encode(chunk)[1:-1])
+        return written + f.write(']')
+    return f.write(_encoder.encode(value))
+
+
+def write_json_sections(file_path, sections):
+    """
+    Writes {key: value} as one compact JSON object, streaming each value (RawJson is copied as is,
+    StreamedArray is encoded chunk by chunk, anything else goes through json). The data goes to a
+    temporary file next to file_path that is synced and then renamed over it, so a crash mid-save
+    leaves the previous file intact. Returns {key: (start, end)}, the character span of each value
+    in the new file, in the same form as read_section_spans().
+    """
+    spans = {}
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(file_path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            position = f.write('{')
+            for key, value in sections.items():
+                position += f.write((',' if spans else '') + _encoder.encode(key) + ':')
+                length = _write_value(f, value)
+                spans[key] = (position, position + length)
+                position += length
+            f.write('}')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return spans
@@ -1,47 +1,172 @@
 import os
-import json
-import mutagen
+import sys
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from PyQt6.QtCore import QObject, pyqtSignal, QStandardPaths, QDir
+from functools import partial
+from PyQt6.QtCore import QObject, pyqtSignal
 
-CONFIG_DIR_NAME = "MusicPlayerApp"
-CONFIG_FILE_NAME = "library_config.json"
+from core.analysis_service import AnalysisService
+from core.analyzer import Analyzer, TrackAnalysis
+from core.config_store import ConfigStore
+from core.folder_watcher import LibraryFolderWatcher, DEFAULT_DEBOUNCE_MS, DEFAULT_SETTLE_MS
+from core.json_sections import StreamedArray
+from core.path_check import PathCheckService, find_missing_paths
+from core.scanner import LibraryScanner, SUPPORTED_EXTENSIONS, EXECUTOR_THREAD, plan_incremental_scan
+from core.scan_service import LibraryScanService
+from core.search_index import TrackSearchIndex
+from core.sort_index import SortedTrackIndex, SORT_BY_ARTIST
 
-@dataclass
+LIBRARY_SECTIONS = ("library_folders", "tracks_cache", "track_analysis") # top-level config keys owned by the library
+DEFERRED_LIBRARY_SECTIONS = ("tracks_cache", "track_analysis") # large sections, re-encoded only by deferred/explicit flushes
+
+def _shared_string(value):
+    # Artist/album/genre values repeat across thousands of tracks; keep one copy of each.
+    return sys.intern(value) if type(value) is str else value
+
+@dataclass(slots=True)
 class Track:
     file_path: str
     title: str
     artist: str
     album: str
     duration_ms: int = 0
+    mtime: float = 0.0
+    size: int = 0
+    inode: int = 0
+    genre: str = ""
+
+    def __post_init__(self):
+        self.artist = _shared_string(self.artist)
+        self.album = _shared_string(self.album)
+        self.genre = _shared_string(self.genre)
+
+    def fingerprint(self):
+        return self.mtime, self.size, self.inode
+
+    def to_dict(self):
+        return {
+            "file_path": self.file_path,
+            "title": self.title,
+            "artist": self.artist,
+            "album": self.album,
+            "duration_ms": self.duration_ms,
+            "mtime": self.mtime,
+            "size": self.size,
+            "inode": self.inode,
+            "genre": self.genre
+        }
+
+@dataclass
+class LibraryDiff:
+    added: list = field(default_factory=list)    # Track objects read for the first time
+    updated: list = field(default_factory=list)  # Track objects whose tags were re-read
+    removed: list = field(default_factory=list)  # file paths dropped from the library
+    renamed: list = field(default_factory=list)  # (old_path, new_path)
+
+    def is_empty(self):
+        return not (self.added or self.updated or self.removed or self.renamed)
 
 class MusicLibraryManager(QObject):
     libraryLoaded = pyqtSignal()
-    libraryUpdated = pyqtSignal(list)
+    libraryUpdated = pyqtSignal(object) # LibraryDiff
     scanProgress = pyqtSignal(int, str)
+    scanFinished = pyqtSignal(object, bool) # LibraryDiff of the whole scan, cancelled
+    tracksAvailabilityChanged = pyqtSignal(object, object) # paths now missing, paths found again
+    analysisProgress = pyqtSignal(int, int)  # files done, total
+    analysisFinished = pyqtSignal(int, bool) # files analysed, cancelled
+    watchScanFinished = pyqtSignal(object, bool) # LibraryDiff of one batch of watched directories, cancelled
 
-    SUPPORTED_EXTENSIONS = [".mp3", ".wav", ".flac", ".aac", ".m4a", ".ogg"]
+    SUPPORTED_EXTENSIONS = list(SUPPORTED_EXTENSIONS)
+    SCAN_BATCH_SIZE = 256
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, database=None, config_store=None):
         super().__init__(parent)
-        self._tracks = {} 
+        self._database = database # optional LibraryDatabase; None means the JSON config holds the library
+        self._track_map = {}
+        self._tracks_pending_load = False
+        self._track_analysis = {} # file_path -> TrackAnalysis; JSON backend only, the database has its own table
+        self._search_index = TrackSearchIndex()
+        self._sort_index = SortedTrackIndex(SORT_BY_ARTIST)
         self._library_folders = set()
-        self._config_path = self._get_config_file_path()
+        self.set_scan_pool()
+        self._scan_service = LibraryScanService(self)
+        self._scan_service.scanProgress.connect(self.scanProgress)
+        self._scan_service.planReady.connect(self._on_background_plan_ready)
+        self._scan_service.chunkReady.connect(self._on_background_chunk_ready)
+        self._scan_service.scanFinished.connect(self._on_background_scan_finished)
+        self._background_scan_diff = None
+        # Cached paths are not stat'ed on load; a background check (or playing a track) flags the missing ones.
+        self._missing_paths = set()
+        self._path_check_service = PathCheckService(self)
+        self._path_check_service.batchChecked.connect(self._apply_path_check_batch)
+        self._analysis_service = AnalysisService(self)
+        self._analysis_service.trackAnalysed.connect(self.store_track_analysis)
+        self._analysis_service.analysisProgress.connect(self.analysisProgress)
+        self._analysis_service.analysisFinished.connect(self._on_analysis_finished)
+        # Live updates: created by start_watching_folders(), with a directory -> paths index of the tracks.
+        self._folder_watcher = None
+        self._paths_by_dir = None
+        # Directories the watcher reported are rescanned by a second scan service, one batch at a time
+        # and never alongside a full scan; batches arriving meanwhile are queued.
+        self._watch_scan_service = LibraryScanService(self)
+        self._watch_scan_service.planReady.connect(self._on_watch_plan_ready)
+        self._watch_scan_service.chunkReady.connect(self._on_watch_chunk_ready)
+        self._watch_scan_service.scanFinished.connect(self._on_watch_scan_finished)
+        self._queued_watch_dirs = set()
+        self._watch_scan_diff = None
+        self._watch_scan_dirs = set()
+        self._unsettled_files = {} # file_path -> fingerprint of files that were still being written
+        self._config_store = config_store if config_store is not None else ConfigStore(parent=self)
+        # No config writes in the middle of a scan, whether of the whole library or of watched directories.
+        self._config_store.add_flush_guard(self.is_scan_running)
+        self._config_store.add_flush_guard(self.is_watch_scan_running)
         self.load_library_from_disk()
 
-    def _get_config_file_path(self):
-        config_dir_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppConfigLocation)
-        if not config_dir_path:
-            config_dir_path = os.path.join(os.path.expanduser("~"), ".MusicPlayerApp")
-        
-        app_config_dir = QDir(os.path.join(config_dir_path, CONFIG_DIR_NAME))
-        if not app_config_dir.exists():
-            app_config_dir.mkpath(".")
-        return os.path.join(app_config_dir.absolutePath(), CONFIG_FILE_NAME)
+    @property
+    def _tracks(self):
+        # With the SQLite store the tracks table is only read on first use.
+        if self._tracks_pending_load:
+            self._tracks_pending_load = False
+            self._track_map = {row["file_path"]: Track(**row) for row in self._database.iter_track_rows()}
+            self._rebuild_indexes()
+            print(f"Loaded {len(self._track_map)} tracks from {self._database.db_path}.")
+        return self._track_map
+
+    @_tracks.setter
+    def _tracks(self, tracks):
+        self._tracks_pending_load = False
+        self._track_map = tracks
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        self._search_index.rebuild(self._track_map.values())
+        self._sort_index.rebuild(self._track_map.values())
+        if self._paths_by_dir is not None:
+            self._rebuild_paths_by_dir()
+
+    def _rebuild_paths_by_dir(self):
+        paths_by_dir = {}
+        for file_path in self._tracks: # also runs the deferred database load
+            paths_by_dir.setdefault(os.path.dirname(file_path), set()).add(file_path)
+        self._paths_by_dir = paths_by_dir
+
+    def _db_transaction(self):
+        return self._database.transaction() if self._database else nullcontext()
+
+    def _mark_dirty(self, section):
+        # The JSON config only holds the library when there is no database. Re-encoding the track
+        # records takes seconds on big libraries, so those sections do not arm the write-behind timer.
+        if not self._database:
+            self._config_store.mark_dirty(section, deferred=section in DEFERRED_LIBRARY_SECTIONS)
 
     def add_library_folder(self, folder_path):
         if folder_path and os.path.isdir(folder_path):
             self._library_folders.add(folder_path)
+            self._mark_dirty("library_folders")
+            if self._database:
+                self._database.add_folder(folder_path)
+            if self._folder_watcher is not None:
+                self._folder_watcher.add_folder(folder_path)
             print(f"Added library folder: {folder_path}")
             return True
         return False
@@ -49,174 +174,511 @@ class MusicLibraryManager(QObject):
     def remove_folder(self, folder_path_to_remove):
         if folder_path_to_remove in self._library_folders:
             self._library_folders.discard(folder_path_to_remove)
+            self._mark_dirty("library_folders")
+            if self._folder_watcher is not None:
+                self._folder_watcher.remove_folder(folder_path_to_remove)
             
             tracks_to_remove = [fp for fp, track in self._tracks.items() if track.file_path.startswith(folder_path_to_remove)]
-            for fp in tracks_to_remove:
-                del self._tracks[fp]
+            with self._db_transaction():
+                if self._database:
+                    self._database.remove_folder(folder_path_to_remove)
+                for fp in tracks_to_remove:
+                    self._remove_track(fp)
             print(f"Removed folder {folder_path_to_remove} and its tracks from library.")
-            self.libraryUpdated.emit(self.get_all_tracks_for_ui_update()) 
+            self.libraryUpdated.emit(LibraryDiff(removed=tracks_to_remove))
             return True
         return False
 
     def get_library_folders(self):
         return list(self._library_folders)
 
-    def scan_folder(self, folder_path, existing_track_paths_in_view=None):
-        if existing_track_paths_in_view is None:
-            existing_track_paths_in_view = set()
+    def set_scan_pool(self, executor_kind=EXECUTOR_THREAD, max_workers=None):
+        """Selects the pool used for tag parsing: 'serial', 'thread' or 'process'."""
+        self._scanner = LibraryScanner(executor_kind=executor_kind, max_workers=max_workers,
+                                       batch_size=self.SCAN_BATCH_SIZE)
 
-        newly_added_tracks_data = [] 
-        files_scanned = 0
-        
+    def _add_track(self, track):
+        self._tracks[track.file_path] = track
+        self._missing_paths.discard(track.file_path)
+        self._mark_dirty("tracks_cache")
+        self._search_index.add(track)
+        self._sort_index.add(track)
+        if self._paths_by_dir is not None:
+            self._paths_by_dir.setdefault(os.path.dirname(track.file_path), set()).add(track.file_path)
+        if self._database:
+            self._database.upsert_track(track)
+
+    def _remove_track(self, file_path):
+        track = self._tracks.pop(file_path, None)
+        if track is not None:
+            self._missing_paths.discard(file_path)
+            self._mark_dirty("tracks_cache")
+            if self._track_analysis.pop(file_path, None) is not None:
+                self._mark_dirty("track_analysis")
+            self._search_index.remove(file_path)
+            self._sort_index.remove(file_path)
+            if self._paths_by_dir is not None:
+                dir_paths = self._paths_by_dir.get(os.path.dirname(file_path))
+                if dir_paths is not None:
+                    dir_paths.discard(file_path)
+                    if not dir_paths:
+                        del self._paths_by_dir[os.path.dirname(file_path)]
+            if self._database:
+                self._database.delete_track(file_path)
+        return track
+
+    def _merge_scanned_batch(self, metadata_batch, diff):
+        with self._db_transaction():
+            self._merge_metadata(metadata_batch, diff)
+
+    def _merge_metadata(self, metadata_batch, diff):
+        for metadata in metadata_batch:
+            track_obj = Track(**metadata)
+            is_update = track_obj.file_path in self._tracks
+            if is_update:
+                self._remove_track(track_obj.file_path)
+            self._add_track(track_obj)
+            (diff.updated if is_update else diff.added).append(track_obj)
+
+    def _apply_scan_plan(self, plan, diff):
+        with self._db_transaction():
+            self._apply_renames_and_removals(plan, diff)
+
+    def _apply_renames_and_removals(self, plan, diff):
+        for old_path, new_path, fingerprint in plan.renamed:
+            track = self._remove_track(old_path)
+            if track is None:
+                continue
+            track.file_path = new_path
+            track.mtime, track.size, track.inode = fingerprint
+            self._add_track(track)
+            diff.renamed.append((old_path, new_path))
+        for file_path in plan.removed:
+            if self._remove_track(file_path) is not None:
+                diff.removed.append(file_path)
+
+    def _report_scan_progress(self, files_scanned, current_file, files_per_second):
+        self.scanProgress.emit(files_scanned, f"{os.path.basename(current_file)} ({files_per_second:.0f} files per sec)")
+
+    def _rescan_folders(self, folder_paths):
+        known_fingerprints = {fp: track.fingerprint() for fp, track in self._tracks.items()}
+        plan = plan_incremental_scan(folder_paths, known_fingerprints)
+        print(f"Scan plan: {len(plan.to_parse)} to read, {len(plan.renamed)} renamed, "
+              f"{len(plan.removed)} removed, {plan.unchanged} unchanged.")
+
+        diff = LibraryDiff()
+        self._apply_scan_plan(plan, diff)
+        if plan.to_parse:
+            print(f"Reading tags with {self._scanner.executor_kind} pool ({self._scanner.max_workers} workers)")
+            self._scanner.parse(
+                plan.to_parse,
+                on_batch=lambda batch: self._merge_scanned_batch(batch, diff),
+                on_progress=self._report_scan_progress
+            )
+        return diff
+
+    def _existing_library_folders(self):
+        for folder in list(self._library_folders): 
+            if not os.path.isdir(folder):
+                print(f"Warning: Library folder {folder} no longer exists. Removing from list.")
+                self._library_folders.discard(folder)
+                self._mark_dirty("library_folders")
+                if self._database:
+                    self._database.remove_folder(folder)
+        return list(self._library_folders)
+
+    def scan_folder(self, folder_path):
+        """Incrementally scans one folder and returns the LibraryDiff of what changed."""
         print(f"Scanning folder: {folder_path}")
-        for dirpath, _, filenames in os.walk(folder_path):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                files_scanned += 1
-                self.scanProgress.emit(files_scanned, file_path)
-
-                if file_path.lower().endswith(tuple(self.SUPPORTED_EXTENSIONS)):
-                    if file_path in self._tracks or file_path in existing_track_paths_in_view:
-                        continue 
-
-                    try:
-                        audio = mutagen.File(file_path, easy=True)
-                        if audio is None:
-                            print(f"Warning: Could not read metadata for {file_path} (mutagen returned None)")
-                            continue
-
-                        title = audio.get('title', [os.path.splitext(os.path.basename(file_path))[0]])[0]
-                        artist = audio.get('artist', ["Unknown Artist"])[0]
-                        album = audio.get('album', ["Unknown Album"])[0]
-                        
-                        duration_ms = 0
-                        if hasattr(audio, 'info') and audio.info and hasattr(audio.info, 'length'):
-                            duration_ms = int(audio.info.length * 1000)
-                        
-                        track_obj = Track(
-                            file_path=file_path,
-                            title=title if title else os.path.splitext(os.path.basename(file_path))[0],
-                            artist=artist if artist else "Unknown Artist",
-                            album=album if album else "Unknown Album",
-                            duration_ms=duration_ms
-                        )
-                        self._tracks[file_path] = track_obj
-                        newly_added_tracks_data.append({
-                            'text': f"{track_obj.title} - {track_obj.artist} ({track_obj.album})",
-                            'file_path': track_obj.file_path,
-                            'duration_ms': track_obj.duration_ms
-                        })
-                    except mutagen.MutagenError as e:
-                        print(f"Error reading metadata for {file_path}: {e}")
-                    except Exception as e:
-                        print(f"Generic error processing file {file_path}: {e}")
-        print(f"Finished scanning {folder_path}. Found {len(newly_added_tracks_data)} new tracks.")
-        return newly_added_tracks_data
+        diff = self._rescan_folders([folder_path])
+        print(f"Finished scanning {folder_path}. Found {len(diff.added)} new tracks.")
+        return diff
 
     def scan_all_library_folders(self):
+        """Synchronous rescan on the calling thread. The GUI uses start_background_scan() instead."""
         print(f"Rescanning library folders: {self._library_folders}")
-        all_new_tracks_data = []
         if not self._library_folders:
             print("No library folders set to scan.")
-            self.libraryUpdated.emit([])
+            self.libraryUpdated.emit(LibraryDiff())
+            self.scanFinished.emit(LibraryDiff(), False)
             return
-        
-        current_track_paths_in_view = {track.file_path for track in self._tracks.values()}
 
-        for folder in list(self._library_folders): 
-            if not os.path.isdir(folder):
-                print(f"Warning: Library folder {folder} no longer exists. Removing from list.")
-                self._library_folders.discard(folder)
-                continue
-            new_tracks_from_folder = self.scan_folder(folder, existing_track_paths_in_view=current_track_paths_in_view)
-            all_new_tracks_data.extend(new_tracks_from_folder)
-            current_track_paths_in_view.update(d['file_path'] for d in new_tracks_from_folder)
+        diff = self._rescan_folders(self._existing_library_folders())
+        self._log_scan_result(diff)
+        self.libraryUpdated.emit(diff)
+        self.scanFinished.emit(diff, False)
 
-        if all_new_tracks_data:
-            print(f"Total new tracks added from rescan: {len(all_new_tracks_data)}")
-            self.libraryUpdated.emit(all_new_tracks_data) 
+    def _log_scan_result(self, diff):
+        if diff.is_empty():
+            print("No changes found during rescan.")
         else:
-            print("No new tracks found during rescan.")
-            self.libraryUpdated.emit([]) 
+            print(f"Rescan: {len(diff.added)} added, {len(diff.updated)} updated, "
+                  f"{len(diff.removed)} removed, {len(diff.renamed)} renamed.")
+
+    def is_scan_running(self):
+        return self._scan_service.is_running()
+
+    def start_background_scan(self):
+        """
+        Rescans all library folders on a worker thread.
+        Changes are merged chunk by chunk on this (GUI) thread and announced with libraryUpdated;
+        scanFinished reports the total diff once the worker stops.
+        """
+        if self.is_scan_running():
+            return False
+        if not self._library_folders:
+            print("No library folders set to scan.")
+            self.scanFinished.emit(LibraryDiff(), False)
+            return False
+
+        folders = self._existing_library_folders()
+        known_fingerprints = {fp: track.fingerprint() for fp, track in self._tracks.items()}
+        self._background_scan_diff = LibraryDiff()
+        print(f"Starting background scan of {folders} ({self._scanner.executor_kind} pool, {self._scanner.max_workers} workers)")
+        return self._scan_service.start(self._scanner, folders, known_fingerprints)
+
+    def cancel_scan(self):
+        self._scan_service.cancel()
+
+    def wait_for_scan(self, timeout_ms=None):
+        self._scan_service.wait(timeout_ms)
+
+    def _on_background_plan_ready(self, plan):
+        chunk_diff = LibraryDiff()
+        self._apply_scan_plan(plan, chunk_diff)
+        self._record_background_chunk(chunk_diff)
+
+    def _on_background_chunk_ready(self, metadata_batch):
+        chunk_diff = LibraryDiff()
+        self._merge_scanned_batch(metadata_batch, chunk_diff)
+        self._record_background_chunk(chunk_diff)
+
+    def _record_background_chunk(self, chunk_diff):
+        if chunk_diff.is_empty():
+            return
+        total = self._background_scan_diff
+        if total is not None:
+            total.added.extend(chunk_diff.added)
+            total.updated.extend(chunk_diff.updated)
+            total.removed.extend(chunk_diff.removed)
+            total.renamed.extend(chunk_diff.renamed)
+        self.libraryUpdated.emit(chunk_diff)
+
+    def _on_background_scan_finished(self, cancelled):
+        diff = self._background_scan_diff or LibraryDiff()
+        self._background_scan_diff = None
+        if cancelled:
+            print(f"Background scan cancelled after {len(diff.added)} new track(s).")
+        else:
+            self._log_scan_result(diff)
+        self.scanFinished.emit(diff, cancelled)
+        self._start_watch_scan() # watcher batches that waited for the full scan
+
+    # --- live folder watching ---
+
+    def start_watching_folders(self, debounce_ms=DEFAULT_DEBOUNCE_MS, use_polling=False, settle_ms=DEFAULT_SETTLE_MS):
+        """
+        Watches the library folders for files being added, removed or renamed. Each debounced burst
+        of changes is applied by apply_directory_changes() and announced with libraryUpdated.
+        Files modified within settle_ms are left alone until they stop changing.
+        """
+        if self._folder_watcher is not None:
+            return False
+        self._rebuild_paths_by_dir()
+        self._folder_watcher = LibraryFolderWatcher(self, debounce_ms=debounce_ms, use_polling=use_polling,
+                                                    settle_ms=settle_ms)
+        self._folder_watcher.directoriesChanged.connect(self.apply_directory_changes)
+        self._folder_watcher.set_folders(self._existing_library_folders())
+        return True
+
+    def stop_watching_folders(self):
+        if self._folder_watcher is None:
+            return
+        self._folder_watcher.stop()
+        self._folder_watcher.deleteLater()
+        self._folder_watcher = None
+        self._queued_watch_dirs = set()
+        self._unsettled_files = {}
+        self._watch_scan_service.cancel()
+        self._watch_scan_service.wait()
+        self._paths_by_dir = None
+
+    def is_watching_folders(self):
+        return self._folder_watcher is not None
+
+    def apply_directory_changes(self, directories):
+        """
+        Brings the tracks directly inside each of directories up to date on a worker thread: only those
+        directories are listed and only new or modified files are read. Changes are merged here chunk by
+        chunk and announced with libraryUpdated; watchScanFinished reports the whole diff of the batch.
+        Files still being written are skipped and their directories handed back to the watcher.
+        """
+        self._queued_watch_dirs.update(directories)
+        self._start_watch_scan()
+
+    def is_watch_scan_running(self):
+        return self._watch_scan_service.is_running()
+
+    def wait_for_watch_scan(self, timeout_ms=None):
+        self._watch_scan_service.wait(timeout_ms)
+
+    def _start_watch_scan(self):
+        if not self._queued_watch_dirs or self.is_watch_scan_running() or self.is_scan_running():
+            return False
+        if self._paths_by_dir is None:
+            self._rebuild_paths_by_dir()
+        directories, self._queued_watch_dirs = sorted(self._queued_watch_dirs), set()
+        self._watch_scan_dirs = set(directories)
+        known_fingerprints = {}
+        for directory in directories:
+            for file_path in self._paths_by_dir.get(directory, ()):
+                known_fingerprints[file_path] = self._tracks[file_path].fingerprint()
+        previous_unsettled = {file_path: fingerprint for file_path, fingerprint in self._unsettled_files.items()
+                              if os.path.dirname(file_path) in self._watch_scan_dirs}
+        settle_ms = self._folder_watcher.settle_ms if self._folder_watcher is not None else DEFAULT_SETTLE_MS
+        self._watch_scan_diff = LibraryDiff()
+        return self._watch_scan_service.start_directories(self._scanner, directories, known_fingerprints,
+                                                          settle_ms / 1000.0, previous_unsettled)
+
+    def _on_watch_plan_ready(self, plan):
+        # The plan covers every file of the scanned directories, so their earlier entries are replaced.
+        self._unsettled_files = {file_path: fingerprint for file_path, fingerprint in self._unsettled_files.items()
+                                 if os.path.dirname(file_path) not in self._watch_scan_dirs}
+        self._unsettled_files.update(plan.unsettled)
+        if plan.unsettled and self._folder_watcher is not None:
+            self._folder_watcher.recheck_later(sorted({os.path.dirname(p) for p in plan.unsettled}))
+        chunk_diff = LibraryDiff()
+        self._apply_scan_plan(plan, chunk_diff)
+        self._record_watch_chunk(chunk_diff)
+
+    def _on_watch_chunk_ready(self, metadata_batch):
+        chunk_diff = LibraryDiff()
+        self._merge_scanned_batch(metadata_batch, chunk_diff)
+        self._record_watch_chunk(chunk_diff)
+
+    def _record_watch_chunk(self, chunk_diff):
+        if chunk_diff.is_empty():
+            return
+        total = self._watch_scan_diff
+        if total is not None:
+            total.added.extend(chunk_diff.added)
+            total.updated.extend(chunk_diff.updated)
+            total.removed.extend(chunk_diff.removed)
+            total.renamed.extend(chunk_diff.renamed)
+        self.libraryUpdated.emit(chunk_diff)
+
+    def _on_watch_scan_finished(self, cancelled):
+        diff = self._watch_scan_diff or LibraryDiff()
+        self._watch_scan_diff = None
+        if not diff.is_empty():
+            print(f"Folder watcher: {len(diff.added)} added, {len(diff.updated)} updated, "
+                  f"{len(diff.removed)} removed, {len(diff.renamed)} renamed in {len(self._watch_scan_dirs)} directories.")
+        self.watchScanFinished.emit(diff, cancelled)
+        self._start_watch_scan()
+
+    # --- track availability ---
+
+    def is_track_missing(self, file_path):
+        return file_path in self._missing_paths
+
+    def get_missing_track_paths(self):
+        return set(self._missing_paths)
+
+    def _apply_path_check_batch(self, checked_paths, missing_paths):
+        missing_paths = set(missing_paths)
+        now_missing = {path for path in missing_paths if path not in self._missing_paths and path in self._tracks}
+        found_again = {path for path in checked_paths if path in self._missing_paths and path not in missing_paths}
+        if now_missing or found_again:
+            self._missing_paths |= now_missing
+            self._missing_paths -= found_again
+            self.tracksAvailabilityChanged.emit(now_missing, found_again)
+
+    def verify_track_exists(self, file_path):
+        """Stats one track right away (e.g. before playing it) and updates its missing flag."""
+        exists = os.path.exists(file_path)
+        self._apply_path_check_batch([file_path], [] if exists else [file_path])
+        return exists
+
+    def check_track_paths(self, file_paths=None):
+        """Runs the batched parallel stat pass on the calling thread; returns the missing paths."""
+        file_paths = list(self._tracks) if file_paths is None else list(file_paths)
+        return find_missing_paths(file_paths, on_batch=self._apply_path_check_batch)
+
+    def start_path_check(self):
+        """Starts the low-priority background check of every cached track path."""
+        return self._path_check_service.start(list(self._tracks))
+
+    def is_path_check_running(self):
+        return self._path_check_service.is_running()
+
+    def cancel_path_check(self):
+        self._path_check_service.cancel()
+
+    def wait_for_path_check(self, timeout_ms=None):
+        self._path_check_service.wait(timeout_ms)
 
     def get_track_by_path(self, file_path):
+        if self._tracks_pending_load:
+            row = self._database.get_track_row(file_path)
+            return Track(**row) if row else None
         return self._tracks.get(file_path)
 
-    def get_all_tracks_sorted(self):
-        return sorted(self._tracks.values(), key=lambda track: (track.artist.lower(), track.album.lower(), track.title.lower()))
+    def search_tracks(self, query, fuzzy=False, within=None):
+        """
+        Looks up tracks through the search index (see TrackSearchIndex for the query syntax).
+        Returns a set of file paths, or None if the query is empty and nothing should be filtered.
+        within narrows the search to an earlier result (only valid when is_search_refinement() says so).
+        """
+        self._tracks # make sure a pending database load has built the index
+        return self._search_index.search(query, fuzzy=fuzzy, within=within)
+
+    def is_search_refinement(self, old_query, new_query):
+        return self._search_index.is_refinement(old_query, new_query)
+
+    def get_track_position(self, file_path, descending=False):
+        """Row of file_path in get_all_tracks_sorted() with the current order, or None if it is not in the library."""
+        position = self._sort_index.position(file_path)
+        if position is None or not descending:
+            return position
+        return len(self._sort_index) - 1 - position
 
-    def get_all_tracks_for_ui_update(self):
-        return [
-            {
-                'text': f"{track.title} - {track.artist} ({track.album})", 
-                'file_path': track.file_path,
-                'duration_ms': track.duration_ms
-            } 
-            for track in self.get_all_tracks_sorted()
-        ]
+    def get_all_tracks_sorted(self, order=None, descending=False):
+        """
+        Returns all tracks in the given order (see core.sort_index; artist/album/title by default).
+        The order is maintained as tracks come and go; asking for a different one re-sorts once.
+        """
+        tracks = self._tracks
+        if order is not None:
+            self._sort_index.set_order(order, tracks.values())
+        ordered = [tracks[path] for path in self._sort_index.paths()]
+        if descending:
+            ordered.reverse()
+        return ordered
+
+    def get_track_analysis(self, file_path):
+        """Returns the stored TrackAnalysis of a library track, or None if it is missing or the file changed since."""
+        track = self.get_track_by_path(file_path)
+        if track is None:
+            return None
+        if self._database:
+            row = self._database.get_analysis_row(file_path)
+            analysis = TrackAnalysis(**row) if row else None
+        else:
+            analysis = self._track_analysis.get(file_path)
+        if analysis is None or analysis.fingerprint() != track.fingerprint():
+            return None
+        return analysis
+
+    def store_track_analysis(self, analysis):
+        """Saves analyzer output for a library track; results for tracks no longer in the library are dropped."""
+        if self.get_track_by_path(analysis.file_path) is None:
+            return False
+        if self._database:
+            self._database.upsert_analysis(analysis)
+        else:
+            self._track_analysis[analysis.file_path] = analysis
+            self._mark_dirty("track_analysis")
+        return True
+
+    def get_tracks_needing_analysis(self):
+        """Tracks without stored features, or whose file changed after they were analysed."""
+        if self._database:
+            analysed = self._database.get_analysis_fingerprints()
+        else:
+            analysed = {path: analysis.fingerprint() for path, analysis in self._track_analysis.items()}
+        return [track for path, track in self._tracks.items() if analysed.get(path) != track.fingerprint()]
+
+    def analyze_library(self, analyzer, should_cancel=None):
+        """
+        Runs analyzer (core.analyzer.Analyzer) over every track that needs it and stores the results.
+        Blocks until done; the analysis itself runs in the analyzer's pool. Returns the number of files analysed.
+        Each result is committed as it arrives, so a cancelled run keeps what it finished.
+        """
+        tracks = self.get_tracks_needing_analysis()
+        print(f"Analysing {len(tracks)} track(s) with {analyzer.executor_kind} pool ({analyzer.max_workers} workers)")
+        return analyzer.analyze_many(tracks, on_result=self.store_track_analysis, should_cancel=should_cancel)
+
+    def start_library_analysis(self, analyzer=None):
+        """
+        Like analyze_library(), but on a worker thread; results are stored on this (GUI) thread one by one.
+        Progress is reported with analysisProgress and the end with analysisFinished.
+        """
+        if self.is_analysis_running():
+            return False
+        tracks = self.get_tracks_needing_analysis()
+        if not tracks:
+            print("Every track is already analysed.")
+            self.analysisFinished.emit(0, False)
+            return False
+        analyzer = analyzer or Analyzer()
+        print(f"Starting background analysis of {len(tracks)} track(s) with {analyzer.executor_kind} pool ({analyzer.max_workers} workers)")
+        return self._analysis_service.start(analyzer, [track.file_path for track in tracks])
+
+    def is_analysis_running(self):
+        return self._analysis_service.is_running()
+
+    def cancel_analysis(self):
+        self._analysis_service.cancel()
+
+    def wait_for_analysis(self, timeout_ms=None):
+        self._analysis_service.wait(timeout_ms)
+
+    def _on_analysis_finished(self, files_done, cancelled):
+        print(f"Track analysis {'cancelled' if cancelled else 'finished'} after {files_done} file(s).")
+        self.analysisFinished.emit(files_done, cancelled)
 
     def remove_track_by_path(self, file_path):
         if file_path in self._tracks:
-            del self._tracks[file_path]
+            self._remove_track(file_path)
             print(f"Track {file_path} removed from library manager.")
             return True
         return False
 
+    def _library_section(self, key):
+        if key == "library_folders":
+            return list(self._library_folders)
+        if key == "tracks_cache":
+            return StreamedArray(track.to_dict() for track in self._tracks.values())
+        return StreamedArray(analysis.to_dict() for analysis in self._track_analysis.values())
+
     def save_library_to_disk(self):
-        print(f"Attempting to save library. Config path: {self._config_path}")
-        if not self._config_path:
-            print("Error: Config path not set. Cannot save library.")
+        """
+        The JSON config is written by the ConfigStore: the library's sections are marked dirty as they
+        change and produced (track records streamed) when the store flushes. The folder list follows
+        the write-behind delay; the track sections wait for the store's deferred write or shutdown.
+        This only makes sure pending changes are scheduled.
+        """
+        if self._database:
+            print(f"Library is stored incrementally in {self._database.db_path}. Nothing to save.")
             return
 
-        library_data_to_save = {
-            "library_folders": list(self._library_folders),
-            "tracks_cache": [
-                {
-                    "file_path": track.file_path, 
-                    "title": track.title, 
-                    "artist": track.artist, 
-                    "album": track.album,
-                    "duration_ms": track.duration_ms
-                } 
-                for track in self._tracks.values()
-            ]
-        }
-        
-        try:
-            all_config_data = {}
-            if os.path.exists(self._config_path):
-                try:
-                    with open(self._config_path, 'r', encoding='utf-8') as f:
-                        all_config_data = json.load(f)
-                except json.JSONDecodeError:
-                    print(f"Warning: Config file {self._config_path} is corrupted. Will create new or overwrite.")
-            
-            all_config_data.update(library_data_to_save)
+        if not any(self._config_store.is_dirty(key) for key in LIBRARY_SECTIONS):
+            print("Library unchanged since it was loaded. Nothing to save.")
+            return
+        if self._config_store.is_dirty("library_folders"):
+            self._config_store.schedule_write()
+        self._config_store.schedule_deferred_write()
+        print(f"Library changes will be written to {self._config_store.config_path}.")
 
-            config_dir = os.path.dirname(self._config_path)
-            if not os.path.exists(config_dir):
-                os.makedirs(config_dir, exist_ok=True)
-                print(f"Created directory: {config_dir}")
-            
-            with open(self._config_path, 'w', encoding='utf-8') as f:
-                json.dump(all_config_data, f, indent=4)
-            print(f"Library saved to {self._config_path}")
+    def load_library_from_disk(self):
+        if self._database:
+            self._library_folders = set(self._database.get_folders())
+            self._tracks_pending_load = True
+            print(f"Loaded library folders: {self._library_folders}. Tracks will be read from {self._database.db_path} on first use.")
+            self.libraryLoaded.emit()
+            return
 
-        except IOError as e:
-            print(f"Error saving library to {self._config_path}: {e}")
-        except Exception as e:
-            print(f"An unexpected error occurred while saving library: {e}")
+        all_config_data = {key: self._config_store.get(key, []) for key in LIBRARY_SECTIONS}
+        # From here on the store asks the library for its sections instead of keeping the parsed lists.
+        for key in LIBRARY_SECTIONS:
+            self._config_store.set_writer(key, partial(self._library_section, key))
 
-    def load_library_from_disk(self):
-        if not os.path.exists(self._config_path):
-            print(f"Library config not found at {self._config_path}. Starting with an empty library.")
+        if not self._config_store.exists():
+            print(f"Library config not found at {self._config_store.config_path}. Starting with an empty library.")
             self.libraryLoaded.emit() 
             return
 
         try:
-            with open(self._config_path, 'r', encoding='utf-8') as f:
-                all_config_data = json.load(f)
-            
             self._library_folders = set(all_config_data.get("library_folders", []))
             print(f"Loaded library folders: {self._library_folders}")
 
@@ -228,32 +690,40 @@ class MusicLibraryManager(QObject):
                     print(f"LYRICS_DEBUG: Skipping invalid cache entry (not a dict): {track_data}")
                     continue
                 fp = track_data.get("file_path")
-                if fp and os.path.exists(fp): 
+                if fp: # existence is checked later, see start_path_check()
                     track = Track(
                         file_path=fp,
                         title=track_data.get("title", "Unknown Title"),
                         artist=track_data.get("artist", "Unknown Artist"),
                         album=track_data.get("album", "Unknown Album"),
-                        duration_ms=track_data.get("duration_ms", 0)
+                        duration_ms=track_data.get("duration_ms", 0),
+                        mtime=track_data.get("mtime", 0.0),
+                        size=track_data.get("size", 0),
+                        inode=track_data.get("inode", 0),
+                        genre=track_data.get("genre", "")
                     )
                     valid_tracks_to_load[fp] = track
                     loaded_tracks_count += 1
-                elif fp:
-                    print(f"Track path {fp} from cache does not exist. Skipping.")
             
             self._tracks = valid_tracks_to_load
+
+            self._track_analysis = {}
+            for analysis_data in all_config_data.get("track_analysis", []):
+                try:
+                    analysis = TrackAnalysis(**analysis_data)
+                except TypeError:
+                    print(f"Skipping invalid track analysis entry: {analysis_data}")
+                    continue
+                if analysis.file_path in valid_tracks_to_load:
+                    self._track_analysis[analysis.file_path] = analysis
             if loaded_tracks_count > 0:
                 print(f"Loaded {loaded_tracks_count} tracks from cache.")
             else:
                 print("No valid tracks found in cache or cache was empty.")
 
-        except (IOError, json.JSONDecodeError) as e:
-            print(f"Error loading library from {self._config_path}: {e}. Starting with an empty library.")
-            self._tracks.clear()
-            self._library_folders.clear()
         except Exception as e:
             print(f"An unexpected error occurred while loading library: {e}. Starting with an empty library.")
-            self._tracks.clear()
+            self._tracks = {}
             self._library_folders.clear()
         
         self.libraryLoaded.emit() 
\ No newline at end of file
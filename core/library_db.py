@@ -0,0 +1,347 @@
+import os
+import json
+import shutil
+import sqlite3
+from contextlib import contextmanager
+
+from core.json_sections import write_json_sections
+
+DATABASE_FILE_NAME = "library.db"
+STORAGE_BACKEND_KEY = "storage_backend" # top-level key in library_config.json: "json" (default) or "sqlite"
+STORAGE_BACKEND_JSON = "json"
+STORAGE_BACKEND_SQLITE = "sqlite"
+
+# Sections of library_config.json that live in the database once it has been migrated.
+MIGRATED_JSON_SECTIONS = ("library_folders", "tracks_cache", "playlists_data", "track_analysis")
+
+TRACK_COLUMNS = ("file_path", "title", "artist", "album", "duration_ms", "mtime", "size", "inode", "genre")
+ANALYSIS_COLUMNS = ("file_path", "mtime", "size", "inode", "duration_s", "rms_db", "peak_db",
+                    "spectral_centroid_hz", "tempo_bpm", "key")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    file_path TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    mtime REAL NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL DEFAULT 0,
+    inode INTEGER NOT NULL DEFAULT 0,
+    genre TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_artist_album ON tracks (artist, album, title);
+CREATE INDEX IF NOT EXISTS idx_tracks_inode ON tracks (inode);
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist_id TEXT NOT NULL REFERENCES playlists (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    file_path TEXT NOT NULL,
+    PRIMARY KEY (playlist_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_playlist_tracks_path ON playlist_tracks (playlist_id, file_path);
+CREATE TABLE IF NOT EXISTS lyrics (
+    audio_path TEXT PRIMARY KEY,
+    lrc_mtime_ns INTEGER,
+    lrc_size INTEGER,
+    is_synced INTEGER NOT NULL,
+    lines TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analysis (
+    file_path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    rms_db REAL NOT NULL,
+    peak_db REAL NOT NULL,
+    spectral_centroid_hz REAL NOT NULL,
+    tempo_bpm REAL NOT NULL,
+    key TEXT NOT NULL
+);
+"""
+
+
+class LibraryDatabase:
+    """
+    SQLite store for library folders, cached tracks and playlists.
+    Every single add/remove is committed as its own transaction; use transaction()
+    to group a batch (e.g. one scan batch) into one commit.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._connection = sqlite3.connect(db_path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._connection.executescript(SCHEMA)
+        self._add_missing_track_columns()
+        self._transaction_depth = 0
+
+    def _add_missing_track_columns(self):
+        """Upgrades databases created before a column was added to the tracks table."""
+        existing = {row[1] for row in self._connection.execute("PRAGMA table_info(tracks)")}
+        if "genre" not in existing:
+            self._connection.execute("ALTER TABLE tracks ADD COLUMN genre TEXT NOT NULL DEFAULT ''")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @contextmanager
+    def transaction(self):
+        """Groups the statements of the with-block into one transaction. Nested blocks join the outer one."""
+        if self._transaction_depth == 0:
+            self._connection.execute("BEGIN")
+        self._transaction_depth += 1
+        try:
+            yield self._connection
+        except Exception:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._connection.execute("ROLLBACK")
+            raise
+        self._transaction_depth -= 1
+        if self._transaction_depth == 0:
+            self._connection.execute("COMMIT")
+
+    # --- meta ---
+
+    def get_meta(self, key, default=None):
+        row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # --- folders ---
+
+    def get_folders(self):
+        return [row[0] for row in self._connection.execute("SELECT path FROM folders")]
+
+    def add_folder(self, folder_path):
+        with self.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO folders (path) VALUES (?)", (folder_path,))
+
+    def remove_folder(self, folder_path):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM folders WHERE path = ?", (folder_path,))
+
+    # --- tracks ---
+
+    def count_tracks(self):
+        return self._connection.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+
+    def iter_track_rows(self):
+        """Yields track rows as dicts keyed by TRACK_COLUMNS, streamed from the cursor."""
+        cursor = self._connection.execute(f"SELECT {', '.join(TRACK_COLUMNS)} FROM tracks")
+        for row in cursor:
+            yield dict(zip(TRACK_COLUMNS, row))
+
+    def get_track_row(self, file_path):
+        row = self._connection.execute(
+            f"SELECT {', '.join(TRACK_COLUMNS)} FROM tracks WHERE file_path = ?", (file_path,)
+        ).fetchone()
+        return dict(zip(TRACK_COLUMNS, row)) if row else None
+
+    def upsert_track(self, track):
+        with self.transaction() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO tracks ({', '.join(TRACK_COLUMNS)}) VALUES ({', '.join('?' * len(TRACK_COLUMNS))})",
+                tuple(getattr(track, column) for column in TRACK_COLUMNS)
+            )
+
+    def delete_track(self, file_path):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM tracks WHERE file_path = ?", (file_path,))
+            conn.execute("DELETE FROM analysis WHERE file_path = ?", (file_path,))
+
+    # --- analysis ---
+
+    def get_analysis_row(self, file_path):
+        """Returns the stored audio features of a track as a dict keyed by ANALYSIS_COLUMNS, or None."""
+        row = self._connection.execute(
+            f"SELECT {', '.join(ANALYSIS_COLUMNS)} FROM analysis WHERE file_path = ?", (file_path,)
+        ).fetchone()
+        return dict(zip(ANALYSIS_COLUMNS, row)) if row else None
+
+    def get_analysis_fingerprints(self):
+        """Returns {file_path: (mtime, size, inode)} of every analysed track."""
+        return {row[0]: tuple(row[1:]) for row in self._connection.execute("SELECT file_path, mtime, size, inode FROM analysis")}
+
+    def upsert_analysis(self, analysis):
+        with self.transaction() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO analysis ({', '.join(ANALYSIS_COLUMNS)}) VALUES ({', '.join('?' * len(ANALYSIS_COLUMNS))})",
+                tuple(getattr(analysis, column) for column in ANALYSIS_COLUMNS)
+            )
+
+    # --- lyrics ---
+
+    def get_lyrics_row(self, audio_path):
+        """Returns (lrc_signature, lines, is_synced) for a cached lyrics entry, or None."""
+        row = self._connection.execute(
+            "SELECT lrc_mtime_ns, lrc_size, is_synced, lines FROM lyrics WHERE audio_path = ?", (audio_path,)
+        ).fetchone()
+        if row is None:
+            return None
+        lrc_mtime_ns, lrc_size, is_synced, lines = row
+        signature = None if lrc_mtime_ns is None else (lrc_mtime_ns, lrc_size)
+        return signature, [tuple(line) for line in json.loads(lines)], bool(is_synced)
+
+    def upsert_lyrics(self, audio_path, lrc_signature, lines, is_synced):
+        lrc_mtime_ns, lrc_size = lrc_signature if lrc_signature else (None, None)
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO lyrics (audio_path, lrc_mtime_ns, lrc_size, is_synced, lines) VALUES (?, ?, ?, ?, ?)",
+                (audio_path, lrc_mtime_ns, lrc_size, int(is_synced), json.dumps(lines, separators=(',', ':')))
+            )
+
+    # --- playlists ---
+
+    def get_playlist_rows(self):
+        """Returns [(playlist_id, name, [track_paths...]), ...]."""
+        playlists = []
+        for playlist_id, name in self._connection.execute("SELECT id, name FROM playlists").fetchall():
+            track_paths = [row[0] for row in self._connection.execute(
+                "SELECT file_path FROM playlist_tracks WHERE playlist_id = ? ORDER BY position", (playlist_id,))]
+            playlists.append((playlist_id, name, track_paths))
+        return playlists
+
+    def upsert_playlist(self, playlist_id, name):
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO playlists (id, name) VALUES (?, ?) "
+                         "ON CONFLICT (id) DO UPDATE SET name = excluded.name", (playlist_id, name))
+
+    def delete_playlist(self, playlist_id):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM playlists WHERE id = ?", (playlist_id,))
+
+    def append_playlist_track(self, playlist_id, file_path):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO playlist_tracks (playlist_id, position, file_path) "
+                "SELECT ?, COALESCE(MAX(position), -1) + 1, ? FROM playlist_tracks WHERE playlist_id = ?",
+                (playlist_id, file_path, playlist_id)
+            )
+
+    def append_playlist_tracks(self, playlist_id, file_paths):
+        with self.transaction() as conn:
+            start = conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM playlist_tracks WHERE playlist_id = ?", (playlist_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO playlist_tracks (playlist_id, position, file_path) VALUES (?, ?, ?)",
+                ((playlist_id, start + offset, path) for offset, path in enumerate(file_paths))
+            )
+
+    def delete_playlist_track(self, playlist_id, file_path):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM playlist_tracks WHERE playlist_id = ? AND file_path = ?", (playlist_id, file_path))
+
+    def delete_playlist_tracks(self, playlist_id, file_paths):
+        with self.transaction() as conn:
+            conn.executemany(
+                "DELETE FROM playlist_tracks WHERE playlist_id = ? AND file_path = ?",
+                ((playlist_id, path) for path in file_paths)
+            )
+
+    def replace_playlist_tracks(self, playlist_id, track_paths):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM playlist_tracks WHERE playlist_id = ?", (playlist_id,))
+            conn.executemany(
+                "INSERT INTO playlist_tracks (playlist_id, position, file_path) VALUES (?, ?, ?)",
+                ((playlist_id, position, path) for position, path in enumerate(track_paths))
+            )
+
+    # --- migration ---
+
+    def is_migrated(self):
+        return self.get_meta("migrated_from_json") == "1"
+
+    def migrate_from_json(self, json_config_path):
+        """
+        One-time import of library_folders, tracks_cache, track_analysis and playlists_data from library_config.json.
+        The imported sections are then removed from the JSON file (a .pre-sqlite.bak copy is kept),
+        so startup no longer has to parse them.
+        """
+        all_config_data = {}
+        if os.path.exists(json_config_path):
+            try:
+                with open(json_config_path, 'r', encoding='utf-8') as f:
+                    all_config_data = json.load(f)
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not read {json_config_path} for migration: {e}. Starting with an empty database.")
+                all_config_data = {}
+
+        with self.transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO folders (path) VALUES (?)",
+                             ((path,) for path in all_config_data.get("library_folders", [])))
+            conn.executemany(
+                f"INSERT OR REPLACE INTO tracks ({', '.join(TRACK_COLUMNS)}) VALUES ({', '.join('?' * len(TRACK_COLUMNS))})",
+                (
+                    (
+                        track_data["file_path"],
+                        track_data.get("title", "Unknown Title"),
+                        track_data.get("artist", "Unknown Artist"),
+                        track_data.get("album", "Unknown Album"),
+                        track_data.get("duration_ms", 0),
+                        track_data.get("mtime", 0.0),
+                        track_data.get("size", 0),
+                        track_data.get("inode", 0),
+                        track_data.get("genre", ""),
+                    )
+                    for track_data in all_config_data.get("tracks_cache", [])
+                    if isinstance(track_data, dict) and track_data.get("file_path")
+                )
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO analysis ({', '.join(ANALYSIS_COLUMNS)}) VALUES ({', '.join('?' * len(ANALYSIS_COLUMNS))})",
+                (
+                    tuple(analysis_data[column] for column in ANALYSIS_COLUMNS)
+                    for analysis_data in all_config_data.get("track_analysis", [])
+                    if isinstance(analysis_data, dict) and all(column in analysis_data for column in ANALYSIS_COLUMNS)
+                )
+            )
+            for pl_data in all_config_data.get("playlists_data", []):
+                if pl_data.get("id") and pl_data.get("name"):
+                    conn.execute("INSERT OR REPLACE INTO playlists (id, name) VALUES (?, ?)", (pl_data["id"], pl_data["name"]))
+                    conn.execute("DELETE FROM playlist_tracks WHERE playlist_id = ?", (pl_data["id"],))
+                    conn.executemany(
+                        "INSERT INTO playlist_tracks (playlist_id, position, file_path) VALUES (?, ?, ?)",
+                        ((pl_data["id"], position, path) for position, path in enumerate(pl_data.get("track_paths", [])))
+                    )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from_json', '1')")
+        print(f"Migrated library from {json_config_path} into {self.db_path}.")
+
+        if any(section in all_config_data for section in MIGRATED_JSON_SECTIONS):
+            try:
+                shutil.copy2(json_config_path, json_config_path + ".pre-sqlite.bak")
+                for section in MIGRATED_JSON_SECTIONS:
+                    all_config_data.pop(section, None)
+                # Atomic like every other config write: a crash here must not cost the remaining settings.
+                write_json_sections(json_config_path, all_config_data)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Warning: Could not strip migrated sections from {json_config_path}: {e}")
+
+
+def open_library_database(json_config_path):
+    """Opens library.db next to library_config.json, migrating the JSON data on first use."""
+    db_path = os.path.join(os.path.dirname(json_config_path), DATABASE_FILE_NAME)
+    database = LibraryDatabase(db_path)
+    if not database.is_migrated():
+        database.migrate_from_json(json_config_path)
+    return database
@@ -1,7 +1,12 @@
 import syncedlyrics
 import os
-import mutagen
 import re
+from bisect import bisect_right
+from collections import OrderedDict
+
+from core.tags import read_tags
+
+DEFAULT_LYRICS_CACHE_SIZE = 256 # tracks whose parsed lyrics are kept in memory
 
 def find_lrc_file(audio_file_path):
     """Tries to find an LRC file with the same name as the audio file."""
@@ -71,32 +76,191 @@ def parse_lrc_content(lrc_content):
         return []
 
 
-def get_lyrics(audio_file_path):
+class LyricsCache:
+    """
+    LRU cache of parsed lyrics, keyed by audio path and validated against the LRC file's
+    (mtime_ns, size): editing, adding or deleting the .lrc invalidates the entry.
+    With a LibraryDatabase, parsed lyrics are also kept in its lyrics table across restarts.
+    """
+
+    def __init__(self, max_entries=DEFAULT_LYRICS_CACHE_SIZE, database=None):
+        self.max_entries = max_entries
+        self._database = database
+        self._entries = OrderedDict() # audio path -> (lrc_signature, lyrics, is_synced)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def peek(self, audio_file_path):
+        """Returns the cached (lrc_signature, lyrics, is_synced) without validating it against the LRC file."""
+        entry = self._entries.get(audio_file_path)
+        if entry is None and self._database is not None:
+            entry = self._database.get_lyrics_row(audio_file_path)
+            if entry is not None:
+                self._remember(audio_file_path, entry)
+        return entry
+
+    def get(self, audio_file_path, lrc_signature):
+        """Returns (lyrics, is_synced) if cached for this LRC signature, else None."""
+        entry = self.peek(audio_file_path)
+        if entry is None or entry[0] != lrc_signature:
+            return None
+        self._entries.move_to_end(audio_file_path)
+        return entry[1], entry[2]
+
+    def store_result(self, result):
+        """Records a LyricsResult produced by resolve_lyrics() (only written through if it was parsed)."""
+        if result.from_cache:
+            self._remember(result.audio_path, (result.lrc_signature, result.lyrics, result.is_synced))
+        else:
+            self.put(result.audio_path, result.lrc_signature, result.lyrics, result.is_synced)
+
+    def put(self, audio_file_path, lrc_signature, lyrics, is_synced):
+        self._remember(audio_file_path, (lrc_signature, lyrics, is_synced))
+        if self._database is not None:
+            self._database.upsert_lyrics(audio_file_path, lrc_signature, lyrics, is_synced)
+
+    def _remember(self, audio_file_path, entry):
+        self._entries[audio_file_path] = entry
+        self._entries.move_to_end(audio_file_path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class LyricsTimeline:
+    """
+    Synced lyrics prepared for playback.
+    seek() finds the active line for a playback position: during normal playback the answer is
+    the current or the next line, which is checked first; anything else (a seek) is a bisect.
+    The HTML shown for each active line is built once and then reused.
+    """
+
+    def __init__(self, lyrics, context_lines=2):
+        self._timestamps = [timestamp for timestamp, _ in lyrics]
+        self._current_html = [f"<b>{line}</b>" for _, line in lyrics]
+        self._context_html = [f"<span style='color:grey;'>{line}</span>" for _, line in lyrics]
+        self.context_lines = context_lines
+        self.current_index = -1 # -1: before the first line
+        self._rendered = {}
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def index_at(self, position_ms):
+        timestamps = self._timestamps
+        index = self.current_index
+        next_index = index + 1
+        if next_index < len(timestamps):
+            if position_ms < timestamps[next_index]:
+                if index < 0 or position_ms >= timestamps[index]:
+                    return index
+            elif next_index + 1 >= len(timestamps) or position_ms < timestamps[next_index + 1]:
+                return next_index
+        elif index >= 0 and position_ms >= timestamps[index]:
+            return index
+        return bisect_right(timestamps, position_ms) - 1
+
+    def seek(self, position_ms):
+        """Moves to the line active at position_ms; returns True if that is a different line."""
+        index = self.index_at(position_ms)
+        if index == self.current_index:
+            return False
+        self.current_index = index
+        return True
+
+    def render(self):
+        """HTML for the active line with its context lines around it."""
+        index = self.current_index
+        html = self._rendered.get(index)
+        if html is None:
+            if index < 0:
+                html = self._context_html[0] if self._context_html else ""
+            else:
+                start = max(0, index - self.context_lines)
+                end = min(len(self._timestamps), index + self.context_lines + 1)
+                html = "\n".join(
+                    self._current_html[i] if i == index else self._context_html[i] for i in range(start, end)
+                )
+            self._rendered[index] = html
+        return html
+
+
+def lrc_file_signature(audio_file_path):
+    """
+    Returns (lrc_path, signature) for the LRC file next to the audio file, where signature is
+    (mtime_ns, size), or None if there is no LRC file. One stat call, no read.
+    """
+    lrc_path = os.path.splitext(audio_file_path)[0] + ".lrc"
+    try:
+        st = os.stat(lrc_path)
+    except OSError:
+        return lrc_path, None
+    return lrc_path, (st.st_mtime_ns, st.st_size)
+
+
+class LyricsResult:
+    """Lyrics resolved for one audio file; audio_path tells the caller which track they belong to."""
+
+    def __init__(self, audio_path, lyrics, is_synced, lrc_signature=None, from_cache=False):
+        self.audio_path = audio_path
+        self.lyrics = lyrics
+        self.is_synced = is_synced
+        self.lrc_signature = lrc_signature
+        self.from_cache = from_cache
+
+
+def resolve_lyrics(audio_file_path, cached_entry=None):
+    """
+    Thread-safe part of get_lyrics(): stats the LRC file and either confirms cached_entry
+    (from LyricsCache.peek()) or reads and parses the lyrics. Touches no shared state,
+    so it can run on a worker thread; the caller stores the result in its cache.
+    """
+    lrc_file_path, lrc_signature = lrc_file_signature(audio_file_path)
+    if cached_entry is not None and cached_entry[0] == lrc_signature:
+        print(f"LYRICS_DEBUG: Using cached lyrics for {audio_file_path} ({len(cached_entry[1])} lines).")
+        return LyricsResult(audio_file_path, cached_entry[1], cached_entry[2], lrc_signature, from_cache=True)
+    lyrics, is_synced = _read_lyrics(audio_file_path, lrc_file_path if lrc_signature else None)
+    return LyricsResult(audio_file_path, lyrics, is_synced, lrc_signature)
+
+
+def get_lyrics(audio_file_path, cache=None):
     """
     Attempts to load lyrics.
     Priority:
     1. Synced LRC file.
     2. Embedded unsynced lyrics from MP3 tags.
 
+    With a LyricsCache, lyrics parsed before (and whose LRC file is unchanged) are returned
+    without reading or parsing anything.
+
     Returns:
         tuple: (list_of_lyric_tuples, is_synced_flag)
                list_of_lyric_tuples: [(timestamp_ms, line), ...] or [(0, "full_text")]
                is_synced_flag: True if lyrics are from LRC, False otherwise.
     """
     print(f"LYRICS_DEBUG: Entered get_lyrics for: {audio_file_path}")
-    lrc_file_path = find_lrc_file(audio_file_path)
-    
+    result = resolve_lyrics(audio_file_path, cache.peek(audio_file_path) if cache is not None else None)
+    if cache is not None:
+        cache.store_result(result)
+    return result.lyrics, result.is_synced
+
+
+def _read_lyrics(audio_file_path, lrc_file_path):
     if lrc_file_path:
         print(f"LYRICS_DEBUG: Attempting to read LRC file: {lrc_file_path}")
         try:
-            # Try with common encodings if utf-8 fails for LRC files
+            with open(lrc_file_path, 'rb') as f:
+                lrc_bytes = f.read()
+            # Try with common encodings if utf-8 fails for LRC files (decoded in memory, the file is read once)
             content_read = False
             lrc_content = None
             encodings_to_try = ['utf-8', 'iso-8859-1', 'cp1251', 'cp1252'] # Add more if needed
             for enc in encodings_to_try:
                 try:
-                    with open(lrc_file_path, 'r', encoding=enc) as f:
-                        lrc_content = f.read()
+                    lrc_content = lrc_bytes.decode(enc)
                     print(f"LYRICS_DEBUG: LRC content read successfully with encoding {enc}.")
                     print(f"LYRICS_DEBUG: LRC content (first 100 chars): {lrc_content[:100]}")
                     content_read = True
@@ -123,99 +287,18 @@ def get_lyrics(audio_file_path):
         except Exception as e:
             print(f"LYRICS_DEBUG: Generic error reading or parsing LRC file {lrc_file_path}: {e}")
     else:
-        print("LYRICS_DEBUG: LRC file not found by find_lrc_file.")
+        print("LYRICS_DEBUG: No LRC file next to the audio file.")
 
-    print("LYRICS_DEBUG: Proceeding to check MP3 tags.")
-    if audio_file_path.lower().endswith('.mp3'):
-        print(f"LYRICS_DEBUG: Attempting to load lyrics from MP3 tags for: {audio_file_path}")
-        try:
-            audio = mutagen.File(audio_file_path, easy=False) 
-            if audio is not None:
-                unsynced_text = None
-                found_text_in_tag = False
-
-                # Print all available tags for debugging
-                if hasattr(audio, 'tags') and audio.tags:
-                    print(f"LYRICS_DEBUG: All tags found by mutagen (easy=False): {list(audio.tags.keys())}")
-                else:
-                    print("LYRICS_DEBUG: No 'tags' attribute or audio.tags is empty (easy=False).")
-
-                # Try specific common USLT keys first
-                # These keys might not exist directly if lang/desc are default empty strings
-                # but mutagen might resolve them.
-                uslt_keys_to_try = ['USLT::eng', 'USLT::XXX', 'USLT::'] 
-                for key in uslt_keys_to_try:
-                    if key in audio:
-                        unsynced_text = audio[key].text
-                        print(f"LYRICS_DEBUG: Found direct key '{key}'. Text length: {len(unsynced_text) if unsynced_text else 'None or 0'}. Text: '{unsynced_text[:100] if unsynced_text else ''}...' ")
-                        if unsynced_text and unsynced_text.strip():
-                            found_text_in_tag = True
-                            break 
-                    else:
-                        print(f"LYRICS_DEBUG: Direct key '{key}' not found in audio object.")
-                
-                # If not found by direct keys, try iterating through all USLT frames
-                if not found_text_in_tag and hasattr(audio, 'tags') and audio.tags:
-                    uslt_frames = audio.tags.getall('USLT')
-                    if uslt_frames:
-                        print(f"LYRICS_DEBUG: Found {len(uslt_frames)} USLT frames via getall('USLT'). Iterating...")
-                        for i, frame in enumerate(uslt_frames):
-                            frame_text = frame.text
-                            frame_lang = getattr(frame, 'lang', 'N/A')
-                            frame_desc = getattr(frame, 'desc', 'N/A')
-                            print(f"LYRICS_DEBUG: USLT Frame {i}: Lang='{frame_lang}', Desc='{frame_desc}', Text Length: {len(frame_text) if frame_text else 'None or 0'}. Text: '{frame_text[:100] if frame_text else ''}...' ")
-                            if frame_text and frame_text.strip():
-                                unsynced_text = frame_text
-                                print(f"LYRICS_DEBUG: Using text from USLT Frame {i}.")
-                                found_text_in_tag = True
-                                break 
-                    else:
-                        print("LYRICS_DEBUG: No USLT frames found via getall('USLT').")
-                
-                # Fallback to easy=True if complex access failed or for other tags
-                if not found_text_in_tag:
-                    print("LYRICS_DEBUG: No text found via specific USLT keys or getall('USLT'). Trying easy=True for 'lyrics'.")
-                    audio_easy = mutagen.File(audio_file_path, easy=True)
-                    if audio_easy:
-                        if hasattr(audio_easy, 'tags') and audio_easy.tags:
-                             print(f"LYRICS_DEBUG: All tags found by mutagen (easy=True): {list(audio_easy.tags.keys())}")
-                        else:
-                            print("LYRICS_DEBUG: No 'tags' attribute or audio_easy.tags is empty (easy=True).")
-                        
-                        lyrics_tag_keys = ['lyrics', 'LYRICS'] # Common keys for lyrics in easy mode
-                        for easy_key in lyrics_tag_keys:
-                            if easy_key in audio_easy:
-                                lyrics_value = audio_easy[easy_key]
-                                # In easy mode, lyrics are often a list of strings
-                                if isinstance(lyrics_value, list) and lyrics_value:
-                                    unsynced_text = lyrics_value[0] # Take the first one
-                                elif isinstance(lyrics_value, str):
-                                    unsynced_text = lyrics_value
-                                else:
-                                    print(f"LYRICS_DEBUG: Tag '{easy_key}' (easy=True) found, but value is not a list or string, or is empty: {type(lyrics_value)}")
-                                    continue
-
-                                print(f"LYRICS_DEBUG: Found '{easy_key}' tag via easy=True. Text length: {len(unsynced_text) if unsynced_text else 'None or 0'}. Text: '{unsynced_text[:100] if unsynced_text else ''}...' ")
-                                if unsynced_text and unsynced_text.strip():
-                                    found_text_in_tag = True
-                                    break
-                            else:
-                                print(f"LYRICS_DEBUG: Tag '{easy_key}' (easy=True) not found.")
-                        if not found_text_in_tag:
-                             print("LYRICS_DEBUG: No 'lyrics' or 'LYRICS' tag found via easy=True containing text.")
-                    else:
-                        print("LYRICS_DEBUG: mutagen.File (easy=True) returned None.")
-
-                # Final check on unsynced_text
-                if found_text_in_tag and unsynced_text and unsynced_text.strip():
-                    print(f"LYRICS_DEBUG: Returning unsynced lyrics from MP3 tags (length: {len(unsynced_text.strip())}).")
-                    return [(0, unsynced_text.strip())], False 
-                else:
-                    print("LYRICS_DEBUG: No valid/stripped unsynced text found in MP3 tags after all checks.")
-            else:
-                print("LYRICS_DEBUG: mutagen.File (easy=False) returned None for MP3 tags.")
-        except Exception as e:
-            print(f"LYRICS_DEBUG: Error reading MP3 tags from {audio_file_path}: {e}")
+    print("LYRICS_DEBUG: Proceeding to check embedded lyrics.")
+    tag_info = read_tags(audio_file_path)
+    if tag_info is not None:
+        if tag_info.synced_lyrics:
+            print(f"LYRICS_DEBUG: Returning synced lyrics from SYLT tag ({len(tag_info.synced_lyrics)} lines).")
+            return list(tag_info.synced_lyrics), True
+        if tag_info.lyrics:
+            print(f"LYRICS_DEBUG: Returning unsynced lyrics from tags (length: {len(tag_info.lyrics)}).")
+            return [(0, tag_info.lyrics)], False
+        print("LYRICS_DEBUG: No lyrics in the file's tags.")
 
     print("LYRICS_DEBUG: No lyrics found from any source.")
     return [], False 
\ No newline at end of file
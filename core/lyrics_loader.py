@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.lyrics import resolve_lyrics
+
+
+class LyricsLoader(QObject):
+    """
+    Resolves lyrics on a background thread so starting playback never waits for file I/O
+    or tag parsing. request() returns the concurrent.futures.Future of the job; when it
+    completes, lyricsReady is emitted on the GUI thread with the LyricsResult, but only if
+    that track is still the one last requested. Results for other tracks are cached and dropped.
+    """
+    lyricsReady = pyqtSignal(object) # LyricsResult
+    _jobDone = pyqtSignal(object)    # Future; emitted from the worker thread, delivered queued
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self._cache = cache # LyricsCache; only ever touched on the GUI thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lyrics")
+        self._current_path = None
+        self._pending_future = None
+        self._jobDone.connect(self._on_job_done)
+
+    def current_path(self):
+        return self._current_path
+
+    def request(self, audio_path):
+        if self._pending_future is not None:
+            self._pending_future.cancel() # only succeeds if the job has not started yet
+        self._current_path = audio_path
+        cached_entry = self._cache.peek(audio_path) if self._cache is not None else None
+        future = self._executor.submit(resolve_lyrics, audio_path, cached_entry)
+        self._pending_future = future
+        future.add_done_callback(self._jobDone.emit)
+        return future
+
+    def cancel(self):
+        """Forgets the current request; its result will be discarded when it arrives."""
+        self._current_path = None
+        if self._pending_future is not None:
+            self._pending_future.cancel()
+            self._pending_future = None
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_job_done(self, future):
+        if future is self._pending_future:
+            self._pending_future = None
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error loading lyrics: {e}")
+            return
+        if self._cache is not None:
+            self._cache.store_result(result)
+        if result.audio_path != self._current_path:
+            print(f"DEBUG: Discarding lyrics for {result.audio_path}; it is no longer the current track.")
+            return
+        self.lyricsReady.emit(result)
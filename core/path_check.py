@@ -0,0 +1,120 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+STAT_BATCH_SIZE = 256 # paths per result batch handed back to the GUI thread
+DEFAULT_STAT_WORKERS = 16 # stat calls mostly wait on the disk or the network, not on the GIL
+
+
+def _missing_in(paths):
+    return [path for path in paths if not os.path.exists(path)]
+
+
+def find_missing_paths(paths, max_workers=DEFAULT_STAT_WORKERS, batch_size=STAT_BATCH_SIZE,
+                       on_batch=None, should_cancel=None):
+    """
+    Checks that every path still exists, running the stat calls for several batches in parallel.
+    on_batch(checked_paths, missing_paths) is called once per batch, in input order.
+    Returns the set of missing paths found before should_cancel() (if given) returned True.
+    """
+    paths = list(paths)
+    batches = [paths[start:start + batch_size] for start in range(0, len(paths), batch_size)]
+    missing = set()
+    if not batches:
+        return missing
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+        # Submitted a window at a time so cancelling does not leave thousands of stats queued.
+        window = max_workers * 2
+        futures = [pool.submit(_missing_in, batch) for batch in batches[:window]]
+        for index, batch in enumerate(batches):
+            if should_cancel and should_cancel():
+                for future in futures[index:]:
+                    future.cancel()
+                break
+            batch_missing = futures[index].result()
+            if index + window < len(batches):
+                futures.append(pool.submit(_missing_in, batches[index + window]))
+            missing.update(batch_missing)
+            if on_batch:
+                on_batch(batch, batch_missing)
+    return missing
+
+
+class _PathCheckWorker(QObject):
+    batchChecked = pyqtSignal(list, list) # checked paths, missing paths
+    finished = pyqtSignal(bool)           # cancelled
+
+    def __init__(self, paths, max_workers, cancel_event):
+        super().__init__()
+        self._paths = paths
+        self._max_workers = max_workers
+        self._cancel_event = cancel_event
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            find_missing_paths(self._paths, max_workers=self._max_workers,
+                               on_batch=self.batchChecked.emit, should_cancel=self._cancel_event.is_set)
+        except Exception as e:
+            print(f"Error while checking track paths: {e}")
+        finally:
+            self.finished.emit(self._cancel_event.is_set())
+            self.thread().quit()
+
+
+class PathCheckService(QObject):
+    """
+    Verifies in a low-priority QThread that cached track paths still exist, so loading the
+    library never has to stat every file up front. Results arrive batch by batch.
+    """
+    batchChecked = pyqtSignal(list, list)
+    checkFinished = pyqtSignal(bool) # cancelled
+
+    def __init__(self, parent=None, max_workers=DEFAULT_STAT_WORKERS):
+        super().__init__(parent)
+        self.max_workers = max_workers
+        self._thread = None
+        self._worker = None
+        self._cancel_event = threading.Event()
+
+    def is_running(self):
+        return self._thread is not None
+
+    def start(self, paths):
+        if self.is_running():
+            print("A path check is already running.")
+            return False
+
+        self._cancel_event = threading.Event()
+        self._thread = QThread()
+        self._worker = _PathCheckWorker(list(paths), self.max_workers, self._cancel_event)
+        self._worker.moveToThread(self._thread)
+
+        self._thread.started.connect(self._worker.run)
+        self._worker.batchChecked.connect(self.batchChecked)
+        self._worker.finished.connect(self._on_worker_finished)
+
+        self._thread.start(QThread.Priority.LowestPriority)
+        return True
+
+    def cancel(self):
+        if self.is_running():
+            self._cancel_event.set()
+
+    def wait(self, timeout_ms=None):
+        if self._thread is not None:
+            if timeout_ms is None:
+                self._thread.wait()
+            else:
+                self._thread.wait(timeout_ms)
+
+    def _on_worker_finished(self, cancelled):
+        thread, worker = self._thread, self._worker
+        self._thread = None
+        self._worker = None
+        thread.quit()
+        thread.wait()
+        worker.deleteLater()
+        thread.deleteLater()
+        self.checkFinished.emit(cancelled)
@@ -1,8 +1,20 @@
 import os
+import time
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput, QMediaMetaData
-from PyQt6.QtCore import QObject, pyqtSignal, QUrl, QStandardPaths
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, QUrl, QStandardPaths
+
+DEFAULT_PRELOAD_LEAD_MS = 5000 # the queued next track starts loading this long before the current one ends
+READY_STATUSES = (QMediaPlayer.MediaStatus.LoadedMedia, QMediaPlayer.MediaStatus.BufferedMedia)
+DEFAULT_POSITION_INTERVAL_MS = 100 # UI position updates per second while playing: 10
 
 class AudioPlayer(QObject):
+    """
+    Wraps two QMediaPlayers: the active one that is heard and a standby one used for gapless playback.
+    With gapless mode on, the track given to queue_next() is loaded into the standby player
+    preload_lead_ms before the active track ends; at end-of-media the two are swapped and
+    trackAdvanced is emitted instead of EndOfMedia. If the next track was not ready in time,
+    EndOfMedia is reported as usual and the caller starts the next track itself.
+    """
     # Signals to communicate with MainWindow or other UI components
     mediaStatusChanged = pyqtSignal(QMediaPlayer.MediaStatus)
     playbackStateChanged = pyqtSignal(QMediaPlayer.PlaybackState)
@@ -10,28 +22,148 @@ class AudioPlayer(QObject):
     positionChanged = pyqtSignal(int)  # position in milliseconds
     metaDataChanged = pyqtSignal() # For track info updates
     durationChanged = pyqtSignal(int) # duration in milliseconds
+    trackAdvanced = pyqtSignal(str) # gapless switch to the queued track (its path)
+    transitionMeasured = pyqtSignal(dict) # timings of a gapless switch, see _report_transition()
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._player = QMediaPlayer()
-        self._audio_output = QAudioOutput()
-        self._player.setAudioOutput(self._audio_output)
-
-        # Connect internal QMediaPlayer signals to our custom signals
-        self._player.mediaStatusChanged.connect(self.mediaStatusChanged.emit)
-        self._player.playbackStateChanged.connect(self.playbackStateChanged.emit)
-        self._player.errorOccurred.connect(self._handle_error) # Use a handler to pass error string
-        self._player.positionChanged.connect(self.positionChanged.emit)
-        self._player.metaDataChanged.connect(self.metaDataChanged.emit)
-        self._player.durationChanged.connect(self.durationChanged.emit)
+        self._player, self._audio_output = self._create_deck()
+        self._next_player, self._next_audio_output = self._create_deck()
 
         self.current_source_path = None
+        self.gapless_enabled = True
+        self.preload_lead_ms = DEFAULT_PRELOAD_LEAD_MS
+        self._queued_path = None        # track to play after the current one
+        self._preload_started_at = None # perf_counter() when the standby player got its source
+        self._preload_ready_ms = None   # how long the standby player took to load
+        self._preload_margin_ms = None  # time left on the current track when the next one was ready
+        self._switch_started_at = None  # perf_counter() at the end-of-media that triggered a swap
+
+    def _create_deck(self):
+        player = QMediaPlayer()
+        audio_output = QAudioOutput()
+        player.setAudioOutput(audio_output)
+        # Every signal goes through a handler that ignores it unless it comes from the active player.
+        player.mediaStatusChanged.connect(lambda status, p=player: self._handle_media_status(p, status))
+        player.playbackStateChanged.connect(lambda state, p=player: self._handle_playback_state(p, state))
+        # errorOccurred also carries the message; it must be taken here or it would end up in p.
+        player.errorOccurred.connect(lambda error, error_string, p=player: self._handle_error(p, error))
+        player.positionChanged.connect(lambda position, p=player: self._handle_position(p, position))
+        player.metaDataChanged.connect(lambda p=player: p is self._player and self.metaDataChanged.emit())
+        player.durationChanged.connect(lambda duration, p=player: p is self._player and self.durationChanged.emit(duration))
+        return player, audio_output
 
-    def _handle_error(self, error):
+    def _handle_error(self, player, error):
+        if player is self._next_player:
+            print(f"PLAYER_DEBUG: Could not preload {self._queued_path}: {player.errorString()}")
+            self._clear_preload()
+            return
         # QMediaPlayer.errorOccurred only gives the enum, we need the string too.
         self.errorOccurred.emit(error, self._player.errorString())
 
+    def _handle_media_status(self, player, status):
+        if player is self._next_player:
+            if status in READY_STATUSES and self._preload_started_at is not None and self._preload_ready_ms is None:
+                self._preload_ready_ms = (time.perf_counter() - self._preload_started_at) * 1000
+                self._preload_margin_ms = max(0, self._player.duration() - self._player.position())
+            elif status == QMediaPlayer.MediaStatus.InvalidMedia:
+                print(f"PLAYER_DEBUG: Queued track {self._queued_path} is invalid; it will not be preloaded.")
+                self._clear_preload()
+            return
+        if status == QMediaPlayer.MediaStatus.EndOfMedia and self._swap_to_preloaded():
+            return
+        self.mediaStatusChanged.emit(status)
+
+    def _handle_playback_state(self, player, state):
+        if player is not self._player:
+            return
+        if state == QMediaPlayer.PlaybackState.PlayingState and self._switch_started_at is not None:
+            self._report_transition()
+        self.playbackStateChanged.emit(state)
+
+    def _handle_position(self, player, position_ms):
+        if player is not self._player:
+            return
+        self._maybe_start_preload(position_ms)
+        self.positionChanged.emit(position_ms)
+
+    # --- gapless playback ---
+
+    def set_gapless_enabled(self, enabled):
+        self.gapless_enabled = bool(enabled)
+        if not self.gapless_enabled:
+            self._clear_preload()
+
+    def set_preload_lead_ms(self, lead_ms):
+        self.preload_lead_ms = max(0, int(lead_ms))
+
+    def queue_next(self, file_path):
+        """Sets the track to continue with when the current one ends (None clears it)."""
+        if file_path == self._queued_path:
+            return
+        self._clear_preload()
+        self._queued_path = file_path or None
+        self._maybe_start_preload(self._player.position())
+
+    def queued_path(self):
+        return self._queued_path
+
+    def _maybe_start_preload(self, position_ms):
+        if not self.gapless_enabled or not self._queued_path or self._preload_started_at is not None:
+            return
+        duration_ms = self._player.duration()
+        if duration_ms <= 0 or duration_ms - position_ms > self.preload_lead_ms:
+            return
+        print(f"PLAYER_DEBUG: Preloading {self._queued_path} ({duration_ms - position_ms} ms before the end)")
+        self._preload_started_at = time.perf_counter()
+        self._next_player.setSource(QUrl.fromLocalFile(self._queued_path))
+
+    def _clear_preload(self):
+        if self._preload_started_at is not None:
+            self._next_player.setSource(QUrl())
+        self._preload_started_at = None
+        self._preload_ready_ms = None
+        self._preload_margin_ms = None
+
+    def _swap_to_preloaded(self):
+        if not self.gapless_enabled or self._preload_ready_ms is None or self._next_player.mediaStatus() not in READY_STATUSES:
+            return False
+        self._switch_started_at = time.perf_counter()
+        finished_player = self._player
+        self._player, self._next_player = self._next_player, self._player
+        self._audio_output, self._next_audio_output = self._next_audio_output, self._audio_output
+        # play() may report PlayingState synchronously, so the new track must already be current.
+        self.current_source_path = self._queued_path
+        self._queued_path = None
+        self._preload_started_at = None
+        self._player.play()
+
+        finished_player.stop()
+        finished_player.setSource(QUrl())
+
+        self.trackAdvanced.emit(self.current_source_path)
+        self.durationChanged.emit(self._player.duration())
+        self.metaDataChanged.emit()
+        return True
+
+    def _report_transition(self):
+        metrics = {
+            "path": self.current_source_path,
+            "preload_load_ms": self._preload_ready_ms,       # standby player: setSource() to LoadedMedia
+            "preload_margin_ms": self._preload_margin_ms,    # time left on the previous track once it was ready
+            "switch_ms": (time.perf_counter() - self._switch_started_at) * 1000, # end-of-media to playing
+        }
+        self._switch_started_at = None
+        self._preload_ready_ms = None
+        self._preload_margin_ms = None
+        self.transitionMeasured.emit(metrics)
+
+    # --- playback ---
+
     def set_source(self, file_path):
+        self._queued_path = None
+        self._clear_preload()
+        self._switch_started_at = None
         if file_path:
             self.current_source_path = file_path
             self._player.setSource(QUrl.fromLocalFile(file_path))
@@ -57,6 +189,7 @@ class AudioPlayer(QObject):
     def set_volume(self, volume_percent): # 0-100
         # Convert 0-100 slider range to 0.0-1.0 QAudioOutput volume range
         self._audio_output.setVolume(float(volume_percent) / 100.0)
+        self._next_audio_output.setVolume(float(volume_percent) / 100.0)
 
     def get_volume(self): # returns 0-100
         if self._audio_output:
@@ -138,5 +271,64 @@ class AudioPlayer(QObject):
         return self._player.source()
 
     def clear_source(self):
-        self.current_source_path = None
-        self._player.setSource(QUrl()) 
\ No newline at end of file
+        self.set_source(None) 
+
+
+class PositionDispatcher(QObject):
+    """
+    Hands the playback position to the UI at a fixed rate instead of on every QMediaPlayer tick.
+    While playing, one timer reads the position every interval_ms and emits positionUpdated if it
+    moved. Paused or stopped, a change (e.g. a seek) is passed on right away. While the window is
+    hidden or minimized nothing is emitted; the latest position is sent once it becomes visible again.
+    """
+    positionUpdated = pyqtSignal(int) # position in milliseconds
+
+    def __init__(self, player, interval_ms=DEFAULT_POSITION_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self._player = player
+        self._visible = True
+        self._last_emitted = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._flush)
+        player.positionChanged.connect(self._handle_position_changed)
+        player.playbackStateChanged.connect(self._update_timer)
+
+    def interval_ms(self):
+        return self._timer.interval()
+
+    def set_interval_ms(self, interval_ms):
+        self._timer.setInterval(max(1, int(interval_ms)))
+
+    def set_visible(self, visible):
+        """Called by the window when it is shown/restored (True) or hidden/minimized (False)."""
+        if visible == self._visible:
+            return
+        self._visible = visible
+        self._update_timer()
+        if visible:
+            self._flush()
+
+    def _is_playing(self):
+        return self._player.playback_state() == QMediaPlayer.PlaybackState.PlayingState
+
+    def _update_timer(self, *args):
+        if self._visible and self._is_playing():
+            if not self._timer.isActive():
+                self._timer.start()
+        else:
+            self._timer.stop()
+            self._flush()
+
+    def _handle_position_changed(self, position_ms):
+        # While the timer runs it reads the position itself; this only covers seeks when not playing.
+        if not self._timer.isActive():
+            self._flush()
+
+    def _flush(self):
+        if not self._visible:
+            return
+        position_ms = self._player.get_position()
+        if position_ms != self._last_emitted:
+            self._last_emitted = position_ms
+            self.positionUpdated.emit(position_ms)
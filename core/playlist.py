@@ -1,79 +1,170 @@
-from PyQt6.QtCore import QObject, pyqtSignal, QStandardPaths, QDir
+from PyQt6.QtCore import QObject, pyqtSignal
 import uuid # For unique playlist IDs
-import json # Make sure json is imported
-import os # Make sure os is imported
+from contextlib import contextmanager
 
-# These might be better in a shared config.py if used by multiple core modules
-CONFIG_DIR_NAME = "MusicPlayerApp" 
-CONFIG_FILE_NAME = "library_config.json"
+from core.config_store import ConfigStore
 
 class Playlist:
+    """
+    An ordered set of track paths. _paths keeps the order; _positions maps every path to its
+    row so membership and lookups are O(1). Rows at or after _stale_from may be out of date
+    after a removal or move and are renumbered lazily on the next lookup that needs them.
+    """
+
     def __init__(self, name, playlist_id=None):
         self.id = playlist_id if playlist_id else str(uuid.uuid4())
         self.name = name
-        self.track_paths = [] # List of file_paths
+        self._paths = [] # List of file_paths, in play order
+        self._positions = {} # {file_path: row}
+        self._stale_from = 0
+
+    @property
+    def track_paths(self):
+        """The ordered track paths. Treat as read-only; use the methods below to change it."""
+        return self._paths
+
+    @track_paths.setter
+    def track_paths(self, file_paths):
+        self._paths = list(dict.fromkeys(file_paths)) # drops duplicates, keeps the first occurrence
+        self._positions = {path: row for row, path in enumerate(self._paths)}
+        self._stale_from = len(self._paths)
+
+    def __contains__(self, file_path):
+        return file_path in self._positions
+
+    def index_of(self, file_path):
+        """Returns the row of file_path, or -1 if it is not in the playlist."""
+        row = self._positions.get(file_path)
+        if row is None:
+            return -1
+        if row >= self._stale_from:
+            for fresh_row in range(self._stale_from, len(self._paths)):
+                self._positions[self._paths[fresh_row]] = fresh_row
+            self._stale_from = len(self._paths)
+            row = self._positions[file_path]
+        return row
+
+    def _mark_stale(self, row):
+        self._stale_from = min(self._stale_from, row)
 
     def add_track(self, file_path):
-        if file_path not in self.track_paths:
-            self.track_paths.append(file_path)
-            return True
-        return False
+        return bool(self.add_tracks([file_path]))
+
+    def add_tracks(self, file_paths):
+        """Appends the paths not already in the playlist; returns the ones actually added, in order."""
+        added = []
+        for file_path in file_paths:
+            if file_path not in self._positions:
+                if self._stale_from == len(self._paths):
+                    self._stale_from += 1
+                self._positions[file_path] = len(self._paths)
+                self._paths.append(file_path)
+                added.append(file_path)
+        return added
 
     def remove_track(self, file_path):
-        if file_path in self.track_paths:
-            self.track_paths.remove(file_path)
-            return True
-        return False
+        return bool(self.remove_tracks([file_path]))
+
+    def remove_tracks(self, file_paths):
+        """Removes the given paths; returns the rows they had before removal, in ascending order."""
+        rows = sorted({self.index_of(path) for path in file_paths if path in self._positions})
+        if not rows:
+            return []
+        if len(rows) == 1:
+            del self._paths[rows[0]]
+        else:
+            removing = set(rows)
+            self._paths = [path for row, path in enumerate(self._paths) if row not in removing]
+        for path in file_paths:
+            self._positions.pop(path, None)
+        self._mark_stale(rows[0])
+        return rows
+
+    def move_tracks(self, rows, target_row):
+        """
+        Moves the given rows (kept in their relative order) so they start before target_row,
+        the same way TrackTableModel.move_source_rows() does. Returns False if nothing moved.
+        """
+        rows = sorted(set(r for r in rows if 0 <= r < len(self._paths)))
+        if not rows:
+            return False
+        target_row = max(0, min(target_row, len(self._paths)))
+        insert_at = target_row - sum(1 for r in rows if r < target_row)
+        if rows == list(range(insert_at, insert_at + len(rows))):
+            return False
+        if len(rows) == 1:
+            self._paths.insert(insert_at, self._paths.pop(rows[0]))
+        else:
+            moving_paths = [self._paths[r] for r in rows]
+            moving = set(rows)
+            remaining = [path for row, path in enumerate(self._paths) if row not in moving]
+            self._paths = remaining[:insert_at] + moving_paths + remaining[insert_at:]
+        self._mark_stale(min(rows[0], insert_at))
+        return True
 
     def reorder_tracks(self, new_ordered_paths):
-        # This method is called after QListWidget has already reordered its items.
-        # We expect new_ordered_paths to be the new, complete list of track paths in the desired order.
-        # The primary responsibility is to update self.track_paths.
-        # Validation that the set of items hasn't changed can be a good sanity check,
-        # but QListWidget with InternalMove should maintain the same set of items.
-        
-        # A simple check: if the counts are different, something is wrong upstream or our understanding.
-        if len(new_ordered_paths) != len(self.track_paths):
-            # This case should ideally not be hit if QListWidget's InternalMove works as expected
-            # and no tracks were added/deleted by another means between drag and drop completion.
-            print(f"Warning: Track count mismatch during reorder. Current: {len(self.track_paths)}, New: {len(new_ordered_paths)}. Proceeding with new order.")
-            # Decide on behavior: reject, or accept the new list as authoritative.
-            # For robustness with QListWidget, we might accept it, assuming QListWidget is the source of truth for its items.
-        
-        # Even more robust: check set equality if counts match and list is not empty
-        # if len(new_ordered_paths) == len(self.track_paths) and self.track_paths: # Avoid set on empty lists if it causes issues
-        #    if set(new_ordered_paths) != set(self.track_paths):
-        #        print("Warning: Track set mismatch during reorder despite same count. Proceeding with new order.")
-        #        # This would be a more serious inconsistency.
-
-        self.track_paths = list(new_ordered_paths) # Ensure it's a new list copy
+        # Accepts the complete new order (e.g. read back from the view after a drag and drop).
+        # Prefer move_tracks(), which only touches the rows between the source and the target.
+        if len(new_ordered_paths) != len(self._paths):
+            print(f"Warning: Track count mismatch during reorder. Current: {len(self._paths)}, New: {len(new_ordered_paths)}. Proceeding with new order.")
+        self.track_paths = new_ordered_paths
         return True
     
     def __repr__(self):
-        return f"Playlist(id='{self.id}', name='{self.name}', tracks={len(self.track_paths)})"
+        return f"Playlist(id='{self.id}', name='{self.name}', tracks={len(self._paths)})"
+
+
+class PlaylistChangeSet:
+    """
+    The row edits made to one playlist during a PlaylistManager batch, in the order they happened:
+    ("inserted", row, paths), ("removed", rows) and ("moved", rows, target_row), with rows as they
+    were at the time of that edit. When reset is True the order was replaced wholesale and the
+    operations are empty; the view should reload the playlist instead.
+    """
+
+    def __init__(self, playlist_id):
+        self.playlist_id = playlist_id
+        self.operations = []
+        self.reset = False
+
+    def record_inserted(self, row, file_paths):
+        if not self.reset:
+            self.operations.append(("inserted", row, list(file_paths)))
+
+    def record_removed(self, rows):
+        if not self.reset:
+            self.operations.append(("removed", list(rows)))
+
+    def record_moved(self, rows, target_row):
+        if not self.reset:
+            self.operations.append(("moved", list(rows), target_row))
+
+    def record_reset(self):
+        self.operations = []
+        self.reset = True
+
+    def is_empty(self):
+        return not self.reset and not self.operations
+
+    def __repr__(self):
+        return f"PlaylistChangeSet(playlist_id='{self.playlist_id}', operations={len(self.operations)}, reset={self.reset})"
 
 
 class PlaylistManager(QObject):
     playlistsChanged = pyqtSignal() # Emitted when playlists are created, deleted, or modified significantly
     playlistTracksChanged = pyqtSignal(str) # Emitted with playlist_id when tracks within a playlist change
+    playlistChangeSetReady = pyqtSignal(object) # PlaylistChangeSet describing those changes, emitted right before playlistTracksChanged
     playlistsLoaded = pyqtSignal() # Signal when playlists are loaded from disk
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, database=None, config_store=None):
         super().__init__(parent)
         self._playlists = {} # {playlist_id: Playlist_object}
-        self._config_path = self._get_config_file_path()
+        self._database = database # optional LibraryDatabase; every change is persisted right away
+        self._batch_depth = 0
+        self._pending_change_sets = {} # {playlist_id: PlaylistChangeSet} collected during a batch
+        self._config_store = config_store if config_store is not None else ConfigStore(parent=self)
         self.load_playlists_from_disk() # Load playlists at startup
 
-    def _get_config_file_path(self): # Helper, might be duplicated from LibraryManager
-        config_dir_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppConfigLocation)
-        if not config_dir_path:
-            config_dir_path = os.path.join(os.path.expanduser("~"), ".MusicPlayerApp")
-        
-        app_config_dir = QDir(os.path.join(config_dir_path, CONFIG_DIR_NAME))
-        if not app_config_dir.exists():
-            app_config_dir.mkpath(".")
-        return os.path.join(app_config_dir.absolutePath(), CONFIG_FILE_NAME)
-
     def create_playlist(self, name):
         if not name.strip():
             print("Playlist name cannot be empty.")
@@ -89,6 +180,8 @@ class PlaylistManager(QObject):
 
         # Use the created object to add to the dictionary
         self._playlists[created_playlist.id] = created_playlist 
+        if self._database:
+            self._database.upsert_playlist(created_playlist.id, created_playlist.name)
         
         self.playlistsChanged.emit()
         # self.save_playlists_to_disk() # Handled by MainWindow on close or specific actions
@@ -98,6 +191,8 @@ class PlaylistManager(QObject):
     def delete_playlist(self, playlist_id):
         if playlist_id in self._playlists:
             del self._playlists[playlist_id]
+            if self._database:
+                self._database.delete_playlist(playlist_id)
             self.playlistsChanged.emit()
             print(f"Deleted playlist ID: {playlist_id}")
             return True
@@ -115,6 +210,8 @@ class PlaylistManager(QObject):
                     print(f"Another playlist with name '{new_name}' already exists.")
                     return False
             self._playlists[playlist_id].name = new_name
+            if self._database:
+                self._database.upsert_playlist(playlist_id, new_name)
             self.playlistsChanged.emit()
             print(f"Renamed playlist ID {playlist_id} to '{new_name}'.")
             return True
@@ -128,27 +225,77 @@ class PlaylistManager(QObject):
         """Returns a list of all Playlist objects, typically sorted by name."""
         return sorted(self._playlists.values(), key=lambda p: p.name.lower())
 
+    @contextmanager
+    def batch(self):
+        """
+        Groups the track changes made in the with-block: the database writes share one transaction
+        and each touched playlist emits a single change set and playlistTracksChanged at the end.
+        Nested blocks join the outer one.
+        """
+        self._batch_depth += 1
+        try:
+            if self._database:
+                with self._database.transaction():
+                    yield self
+            else:
+                yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._emit_pending_change_sets()
+
+    def _change_set(self, playlist_id):
+        change_set = self._pending_change_sets.get(playlist_id)
+        if change_set is None:
+            change_set = self._pending_change_sets[playlist_id] = PlaylistChangeSet(playlist_id)
+        return change_set
+
+    def _emit_pending_change_sets(self):
+        pending, self._pending_change_sets = self._pending_change_sets, {}
+        for playlist_id, change_set in pending.items():
+            if playlist_id in self._playlists and not change_set.is_empty():
+                self.playlistChangeSetReady.emit(change_set)
+                self.playlistTracksChanged.emit(playlist_id)
+
     def add_track_to_playlist(self, playlist_id, track_file_path):
+        return self.add_tracks_to_playlist(playlist_id, [track_file_path]) == 1
+
+    def add_tracks_to_playlist(self, playlist_id, track_file_paths):
+        """
+        Appends the tracks not already in the playlist, writes them in one database transaction
+        and emits playlistTracksChanged once. Returns how many were added.
+        """
         playlist = self.get_playlist_by_id(playlist_id)
-        if playlist:
-            if playlist.add_track(track_file_path):
-                self.playlistTracksChanged.emit(playlist_id)
-                print(f"Added track {track_file_path} to playlist {playlist.name}")
-                return True
-        else:
-            print(f"Playlist ID {playlist_id} not found for adding track.")
-        return False
+        if not playlist:
+            print(f"Playlist ID {playlist_id} not found for adding tracks.")
+            return 0
+        with self.batch():
+            first_row = len(playlist.track_paths)
+            added = playlist.add_tracks(track_file_paths)
+            if added:
+                if self._database:
+                    self._database.append_playlist_tracks(playlist_id, added)
+                self._change_set(playlist_id).record_inserted(first_row, added)
+                print(f"Added {len(added)} track(s) to playlist {playlist.name}")
+        return len(added)
 
     def remove_track_from_playlist(self, playlist_id, track_file_path):
+        return self.remove_tracks_from_playlist(playlist_id, [track_file_path]) == 1
+
+    def remove_tracks_from_playlist(self, playlist_id, track_file_paths):
+        """Removes the given tracks with one change set; returns how many were in the playlist."""
         playlist = self.get_playlist_by_id(playlist_id)
-        if playlist:
-            if playlist.remove_track(track_file_path):
-                self.playlistTracksChanged.emit(playlist_id)
-                print(f"Removed track {track_file_path} from playlist {playlist.name}")
-                return True
-        else:
-            print(f"Playlist ID {playlist_id} not found for removing track.")
-        return False
+        if not playlist:
+            print(f"Playlist ID {playlist_id} not found for removing tracks.")
+            return 0
+        with self.batch():
+            removed_rows = playlist.remove_tracks(track_file_paths)
+            if removed_rows:
+                if self._database:
+                    self._database.delete_playlist_tracks(playlist_id, track_file_paths)
+                self._change_set(playlist_id).record_removed(removed_rows)
+                print(f"Removed {len(removed_rows)} track(s) from playlist {playlist.name}")
+        return len(removed_rows)
 
     def reorder_tracks_in_playlist(self, playlist_id, new_ordered_paths):
         """Reorders tracks in the specified playlist based on the new list of paths."""
@@ -159,55 +306,65 @@ class PlaylistManager(QObject):
 
         # The Playlist.reorder_tracks method already validates if the set of tracks is the same.
         if playlist.reorder_tracks(new_ordered_paths):
+            with self.batch():
+                if self._database:
+                    self._database.replace_playlist_tracks(playlist_id, playlist.track_paths)
+                self._change_set(playlist_id).record_reset()
             print(f"Tracks reordered successfully in playlist '{playlist.name}' (ID: {playlist_id}).")
-            self.playlistTracksChanged.emit(playlist_id) # Notify UI or other components
             return True
         else:
             print(f"Failed to reorder tracks in playlist '{playlist.name}'. Paths might mismatch or list empty.")
             # Optionally, emit a signal or raise an error to indicate failure more formally
             return False
 
+    def move_tracks_in_playlist(self, playlist_id, rows, target_row):
+        """Moves the given rows so they start before target_row (see Playlist.move_tracks())."""
+        playlist = self.get_playlist_by_id(playlist_id)
+        if not playlist:
+            print(f"Playlist ID {playlist_id} not found for moving tracks.")
+            return False
+        if not playlist.move_tracks(rows, target_row):
+            return False
+        with self.batch():
+            if self._database:
+                self._database.replace_playlist_tracks(playlist_id, playlist.track_paths)
+            self._change_set(playlist_id).record_moved(rows, target_row)
+        return True
+
     def save_playlists_to_disk(self):
-        """Saves the current playlists to the JSON config file."""
+        """Hands the current playlists to the ConfigStore, which writes them with its next flush."""
+        if self._database:
+            print(f"Playlists are stored incrementally in {self._database.db_path}. Nothing to save.")
+            return
+
         playlists_data = []
         for pl_id, playlist_obj in self._playlists.items():
             playlists_data.append({
                 "id": pl_id,
                 "name": playlist_obj.name,
-                "track_paths": playlist_obj.track_paths
+                "track_paths": list(playlist_obj.track_paths)
             })
-        
-        try:
-            all_config_data = {}
-            if os.path.exists(self._config_path):
-                with open(self._config_path, 'r', encoding='utf-8') as f:
-                    try:
-                        all_config_data = json.load(f)
-                    except json.JSONDecodeError:
-                        print(f"Warning: Config file {self._config_path} is corrupted. Overwriting playlists section.")
-                        pass # Will create a new structure or overwrite if file is totally corrupt
-            
-            all_config_data["playlists_data"] = playlists_data
-            
-            with open(self._config_path, 'w', encoding='utf-8') as f:
-                json.dump(all_config_data, f, indent=4)
-            print(f"Playlists saved to {self._config_path}")
-
-        except IOError as e:
-            print(f"Error saving playlists to {self._config_path}: {e}")
+        self._config_store.set("playlists_data", playlists_data)
+        print(f"Playlists will be written to {self._config_store.config_path}.")
 
     def load_playlists_from_disk(self):
-        """Loads playlists from the JSON config file."""
-        if not os.path.exists(self._config_path):
-            print(f"Playlists config not found in {self._config_path}. Starting with no playlists.")
+        """Loads playlists from the JSON config file (or from the database when one is set)."""
+        if self._database:
+            for playlist_id, name, track_paths in self._database.get_playlist_rows():
+                loaded_playlist = Playlist(name, playlist_id=playlist_id)
+                loaded_playlist.track_paths = track_paths
+                self._playlists[loaded_playlist.id] = loaded_playlist
+            print(f"Loaded {len(self._playlists)} playlists from {self._database.db_path}.")
+            self.playlistsLoaded.emit()
+            return
+
+        if not self._config_store.exists():
+            print(f"Playlists config not found in {self._config_store.config_path}. Starting with no playlists.")
             self.playlistsLoaded.emit()
             return
 
         try:
-            with open(self._config_path, 'r', encoding='utf-8') as f:
-                all_config_data = json.load(f)
-            
-            playlists_data = all_config_data.get("playlists_data", [])
+            playlists_data = self._config_store.get("playlists_data", [])
             
             loaded_playlists_count = 0
             for pl_data in playlists_data:
@@ -233,56 +390,12 @@ class PlaylistManager(QObject):
             # No self.playlistsChanged.emit() here, as that's for user-driven changes mostly.
             # Instead, a dedicated signal for UI to know loading is done.
 
-        except (IOError, json.JSONDecodeError) as e:
-            print(f"Error loading playlists from {self._config_path}: {e}. Starting with no playlists.")
+        except (AttributeError, TypeError) as e:
+            print(f"Error loading playlists from {self._config_store.config_path}: {e}. Starting with no playlists.")
             self._playlists.clear() # Ensure a clean state on error
         
         self.playlistsLoaded.emit()
 
-    # Make sure methods that modify playlists call save_playlists_to_disk or rely on a save_on_exit strategy
-    def delete_playlist(self, playlist_id):
-        # ... (existing logic) ...
-        if playlist_id in self._playlists:
-            del self._playlists[playlist_id]
-            self.playlistsChanged.emit()
-            # self.save_playlists_to_disk()
-            print(f"Deleted playlist ID: {playlist_id}")
-        # ... (existing logic) ...
-
-    def rename_playlist(self, playlist_id, new_name):
-        # ... (existing logic) ...
-        if playlist_id in self._playlists:
-            # Check for duplicate names (optional)
-            for pid, pl in self._playlists.items():
-                if pid != playlist_id and pl.name == new_name:
-                    print(f"Another playlist with name '{new_name}' already exists.")
-                    return False
-            self._playlists[playlist_id].name = new_name
-            self.playlistsChanged.emit()
-            # self.save_playlists_to_disk()
-            print(f"Renamed playlist ID {playlist_id} to '{new_name}'.")
-        # ... (existing logic) ...
-
-    def add_track_to_playlist(self, playlist_id, track_file_path):
-        # ... (existing logic) ...
-        playlist = self.get_playlist_by_id(playlist_id)
-        if playlist:
-            if playlist.add_track(track_file_path):
-                self.playlistTracksChanged.emit(playlist_id)
-                # self.save_playlists_to_disk()
-                print(f"Added track {track_file_path} to playlist {playlist.name}")
-        # ... (existing logic) ...
-
-    def remove_track_from_playlist(self, playlist_id, track_file_path):
-        # ... (existing logic) ...
-        playlist = self.get_playlist_by_id(playlist_id)
-        if playlist:
-            if playlist.remove_track(track_file_path):
-                self.playlistTracksChanged.emit(playlist_id)
-                # self.save_playlists_to_disk()
-                print(f"Removed track {track_file_path} from playlist {playlist.name}")
-        # ... (existing logic) ...
-
     # Placeholder for saving and loading - to be implemented next
     def save_playlists(self, config_path):
         pass
@@ -0,0 +1,128 @@
+import os
+import time
+import threading
+from functools import partial
+from PyQt6.QtCore import QObject, QThread, pyqtSignal, pyqtSlot
+
+from core.scanner import plan_incremental_scan, plan_directory_changes
+
+DEFAULT_PROGRESS_INTERVAL_MS = 100 # at most 10 progress updates per second reach the GUI thread
+
+
+class _ScanWorker(QObject):
+    """Runs one incremental scan inside a QThread. Only touches the file system, never the library itself."""
+    progress = pyqtSignal(int, str)
+    planReady = pyqtSignal(object) # ScanPlan, to apply renames/removals
+    chunkReady = pyqtSignal(list)  # metadata dicts of one parsed batch
+    finished = pyqtSignal(bool)    # cancelled
+
+    def __init__(self, scanner, make_plan, cancel_event, progress_interval_ms):
+        super().__init__()
+        self._scanner = scanner
+        self._make_plan = make_plan # called with should_cancel and on_progress, returns a ScanPlan
+        self._cancel_event = cancel_event
+        self._progress_interval = progress_interval_ms / 1000.0
+        self._last_progress_at = 0.0
+
+    def _emit_progress(self, files_done, status, force=False):
+        now = time.monotonic()
+        if force or now - self._last_progress_at >= self._progress_interval:
+            self._last_progress_at = now
+            self.progress.emit(files_done, status)
+
+    def _on_plan_progress(self, files_checked, current_path):
+        self._emit_progress(files_checked, f"checking {os.path.basename(current_path)}")
+
+    def _on_parse_progress(self, files_done, current_path, files_per_second):
+        self._emit_progress(files_done, f"{os.path.basename(current_path)} ({files_per_second:.0f} files per sec)")
+
+    @pyqtSlot()
+    def run(self):
+        cancelled = True
+        try:
+            plan = self._make_plan(should_cancel=self._cancel_event.is_set, on_progress=self._on_plan_progress)
+            if not plan.cancelled:
+                self.planReady.emit(plan)
+                files_done = self._scanner.parse(plan.to_parse, on_batch=self.chunkReady.emit,
+                                                 on_progress=self._on_parse_progress,
+                                                 should_cancel=self._cancel_event.is_set)
+                self._emit_progress(files_done, "done", force=True)
+                cancelled = self._cancel_event.is_set()
+        except Exception as e:
+            print(f"Error during background library scan: {e}")
+        finally:
+            self.finished.emit(cancelled)
+            # Stop the thread's event loop from here so wait() cannot deadlock on a queued quit().
+            self.thread().quit()
+
+
+class LibraryScanService(QObject):
+    """
+    Runs LibraryScanner on a worker QThread so the GUI thread only merges small chunks of results.
+    Cancellation is cooperative: the worker checks a flag between files of the walk and between parse batches.
+    start() rescans whole folders, start_directories() only the directories a folder watcher reported.
+    """
+    scanProgress = pyqtSignal(int, str)
+    planReady = pyqtSignal(object)
+    chunkReady = pyqtSignal(list)
+    scanFinished = pyqtSignal(bool) # cancelled
+
+    def __init__(self, parent=None, progress_interval_ms=DEFAULT_PROGRESS_INTERVAL_MS):
+        super().__init__(parent)
+        self.progress_interval_ms = progress_interval_ms
+        self._thread = None
+        self._worker = None
+        self._cancel_event = threading.Event()
+
+    def is_running(self):
+        return self._thread is not None
+
+    def start(self, scanner, folder_paths, known_fingerprints):
+        return self._start(scanner, partial(plan_incremental_scan, list(folder_paths), dict(known_fingerprints)))
+
+    def start_directories(self, scanner, directories, known_fingerprints, settle_seconds=0, previous_unsettled=None):
+        """Plans with plan_directory_changes(); files still being written end up in the plan's unsettled dict."""
+        return self._start(scanner, partial(plan_directory_changes, list(directories), dict(known_fingerprints),
+                                            settle_seconds, dict(previous_unsettled or {})))
+
+    def _start(self, scanner, make_plan):
+        if self.is_running():
+            print("A library scan is already running.")
+            return False
+
+        self._cancel_event = threading.Event()
+        self._thread = QThread()
+        self._worker = _ScanWorker(scanner, make_plan, self._cancel_event, self.progress_interval_ms)
+        self._worker.moveToThread(self._thread)
+
+        self._thread.started.connect(self._worker.run)
+        self._worker.progress.connect(self.scanProgress)
+        self._worker.planReady.connect(self.planReady)
+        self._worker.chunkReady.connect(self.chunkReady)
+        self._worker.finished.connect(self._on_worker_finished)
+
+        self._thread.start(QThread.Priority.LowPriority)
+        return True
+
+    def cancel(self):
+        if self.is_running():
+            print("Cancelling library scan...")
+            self._cancel_event.set()
+
+    def wait(self, timeout_ms=None):
+        """Blocks until the worker thread has stopped (used on shutdown)."""
+        if self._thread is not None:
+            if timeout_ms is None:
+                self._thread.wait()
+            else:
+                self._thread.wait(timeout_ms)
+
+    def _on_worker_finished(self, cancelled):
+        thread, worker = self._thread, self._worker
+        self._thread = None
+        self._worker = None
+        thread.quit()
+        thread.wait()
+        worker.deleteLater()
+        thread.deleteLater()
+        self.scanFinished.emit(cancelled)
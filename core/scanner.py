@@ -0,0 +1,261 @@
+import os
+import time
+import multiprocessing
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from core.tags import read_tags
+
+SUPPORTED_EXTENSIONS = (".mp3", ".wav", ".flac", ".aac", ".m4a", ".ogg")
+
+EXECUTOR_SERIAL = "serial"
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+PLAN_PROGRESS_STEP = 256
+
+
+def fingerprint_from_stat(stat_result):
+    """Returns the (mtime, size, inode) triple stored with every cached track."""
+    return stat_result.st_mtime, stat_result.st_size, stat_result.st_ino
+
+
+def iter_audio_entries(folder_path, extensions=SUPPORTED_EXTENSIONS, recursive=True):
+    """
+    Walks folder_path with os.scandir and yields (file_path, fingerprint) for supported audio files.
+    The fingerprint costs one stat call per file and no file is opened.
+    With recursive=False only the files directly inside folder_path are listed.
+    """
+    pending_dirs = [folder_path]
+    while pending_dirs:
+        current_dir = pending_dirs.pop()
+        try:
+            with os.scandir(current_dir) as entries:
+                sub_dirs = []
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                sub_dirs.append(entry.path)
+                        elif entry.name.lower().endswith(extensions) and entry.is_file():
+                            yield entry.path, fingerprint_from_stat(entry.stat())
+                    except OSError as e:
+                        print(f"Warning: Could not inspect {entry.path}: {e}")
+                # Reversed so that directories are visited in listing order when popped.
+                pending_dirs.extend(reversed(sub_dirs))
+        except OSError as e:
+            print(f"Warning: Could not read directory {current_dir}: {e}")
+
+
+def iter_audio_files(folder_path, extensions=SUPPORTED_EXTENSIONS):
+    """Walks folder_path with os.scandir and yields the paths of supported audio files."""
+    for file_path, _ in iter_audio_entries(folder_path, extensions):
+        yield file_path
+
+
+def read_track_metadata(file_path):
+    """
+    Reads the tags of a single file.
+    Runs inside pool workers, so it only returns plain picklable data:
+    a dict with the Track fields, or None if the file could not be parsed.
+    """
+    tag_info = read_tags(file_path)
+    if tag_info is None:
+        return None
+    return {
+        'file_path': file_path,
+        'title': tag_info.title or os.path.splitext(os.path.basename(file_path))[0],
+        'artist': tag_info.artist or "Unknown Artist",
+        'album': tag_info.album or "Unknown Album",
+        'duration_ms': tag_info.duration_ms,
+        'genre': tag_info.genre
+    }
+
+
+class LibraryScanner:
+    """
+    Walks library folders and parses tags on a configurable pool.
+    It knows nothing about Qt: results and progress are handed back through callbacks,
+    so it can be driven from the GUI thread or from a worker thread.
+    """
+
+    def __init__(self, executor_kind=EXECUTOR_THREAD, max_workers=None, batch_size=256):
+        if executor_kind not in (EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS):
+            raise ValueError(f"Unknown executor kind: {executor_kind}")
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers if max_workers else min(32, (os.cpu_count() or 1) + 4)
+        self.batch_size = max(1, batch_size)
+
+    def _create_executor(self):
+        if self.executor_kind == EXECUTOR_PROCESS:
+            # Spawned, not forked: LibraryScanService drives the scan from a QThread of the GUI process,
+            # and a forked child could inherit locks held by its other threads.
+            return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        if self.executor_kind == EXECUTOR_THREAD:
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tag-reader")
+        return None
+
+    def _iter_entry_batches(self, entries):
+        batch = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def parse(self, entries, on_batch=None, on_progress=None, should_cancel=None):
+        """
+        Parses the tags of an iterable of (file_path, fingerprint) pairs and returns the number of files parsed.
+
+        on_batch(list_of_metadata_dicts) is called once per batch of parsed files,
+        on_progress(files_done, current_path, files_per_second) after every batch,
+        should_cancel() is polled between batches to stop early.
+        The fingerprint is copied into each metadata dict as mtime/size/inode.
+        """
+        files_done = 0
+        started_at = time.monotonic()
+        executor = self._create_executor()
+        try:
+            for batch in self._iter_entry_batches(entries):
+                if should_cancel and should_cancel():
+                    print("Library scan cancelled.")
+                    break
+
+                paths = [file_path for file_path, _ in batch]
+                if executor is None:
+                    results = map(read_track_metadata, paths)
+                else:
+                    chunksize = max(1, len(paths) // (self.max_workers * 4)) if self.executor_kind == EXECUTOR_PROCESS else 1
+                    results = executor.map(read_track_metadata, paths, chunksize=chunksize)
+
+                parsed = []
+                for (_, fingerprint), metadata in zip(batch, results):
+                    if metadata is not None:
+                        metadata['mtime'], metadata['size'], metadata['inode'] = fingerprint
+                        parsed.append(metadata)
+                files_done += len(batch)
+
+                if on_batch and parsed:
+                    on_batch(parsed)
+                if on_progress:
+                    elapsed = time.monotonic() - started_at
+                    on_progress(files_done, paths[-1], files_done / elapsed if elapsed > 0 else 0.0)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return files_done
+
+    def scan(self, folder_paths, skip_paths=None, on_batch=None, on_progress=None, should_cancel=None):
+        """Walks folder_paths and parses every audio file not in skip_paths. See parse() for the callbacks."""
+        if skip_paths is None:
+            skip_paths = set()
+        entries = (
+            (file_path, fingerprint)
+            for folder_path in folder_paths
+            for file_path, fingerprint in iter_audio_entries(folder_path)
+            if file_path not in skip_paths
+        )
+        return self.parse(entries, on_batch=on_batch, on_progress=on_progress, should_cancel=should_cancel)
+
+
+@dataclass
+class ScanPlan:
+    to_parse: list = field(default_factory=list)  # (file_path, fingerprint) of new or modified files
+    renamed: list = field(default_factory=list)   # (old_path, new_path, fingerprint)
+    removed: list = field(default_factory=list)   # cached paths that are gone from disk
+    unsettled: dict = field(default_factory=dict) # file_path -> fingerprint of files still being written, not in to_parse
+    unchanged: int = 0
+    cancelled: bool = False
+
+
+def _is_inside_folders(file_path, folder_paths):
+    return any(file_path == folder or file_path.startswith(folder.rstrip(os.sep) + os.sep) for folder in folder_paths)
+
+
+def plan_incremental_scan(folder_paths, known_fingerprints, should_cancel=None, on_progress=None):
+    """
+    Compares what is on disk under folder_paths with known_fingerprints ({file_path: (mtime, size, inode)}).
+    Only stat calls are made: files whose fingerprint is unchanged are not opened,
+    a new path with the exact fingerprint of a vanished cached path is reported as a rename.
+
+    should_cancel() and on_progress(files_checked, current_path) are called every PLAN_PROGRESS_STEP files.
+    A cancelled plan has cancelled=True and must not be applied: its removals would be incomplete.
+    """
+    entries = (entry for folder_path in folder_paths for entry in iter_audio_entries(folder_path))
+    return _plan_from_entries(entries, known_fingerprints, lambda file_path: _is_inside_folders(file_path, folder_paths),
+                              should_cancel, on_progress)
+
+
+def plan_directory_changes(directories, known_fingerprints, settle_seconds=0, previous_unsettled=None,
+                           should_cancel=None, on_progress=None):
+    """
+    Like plan_incremental_scan(), but only for the files directly inside each of directories
+    (subdirectories are not walked); a directory that no longer exists loses all its cached files.
+    known_fingerprints only needs the cached files of those directories.
+    Used for the directories a filesystem watcher reported as changed.
+
+    Files modified less than settle_seconds ago, or whose fingerprint differs from the one in
+    previous_unsettled (the unsettled files of the last plan), are probably still being copied:
+    they go to plan.unsettled instead of to_parse and should be checked again later.
+    """
+    directories = set(directories)
+    entries = (entry for directory in directories if os.path.isdir(directory)
+               for entry in iter_audio_entries(directory, recursive=False))
+    plan = _plan_from_entries(entries, known_fingerprints, lambda file_path: os.path.dirname(file_path) in directories,
+                              should_cancel, on_progress)
+    if settle_seconds and not plan.cancelled:
+        previous_unsettled = previous_unsettled or {}
+        now = time.time()
+        to_parse = []
+        for file_path, fingerprint in plan.to_parse:
+            previous = previous_unsettled.get(file_path)
+            if 0 <= now - fingerprint[0] < settle_seconds or (previous is not None and tuple(previous) != fingerprint):
+                plan.unsettled[file_path] = fingerprint
+            else:
+                to_parse.append((file_path, fingerprint))
+        plan.to_parse = to_parse
+    return plan
+
+
+def _plan_from_entries(entries, known_fingerprints, is_in_scope, should_cancel=None, on_progress=None):
+    plan = ScanPlan()
+    seen_paths = set()
+    new_entries = []
+    for file_path, fingerprint in entries:
+        seen_paths.add(file_path)
+        if len(seen_paths) % PLAN_PROGRESS_STEP == 0:
+            if should_cancel and should_cancel():
+                plan.cancelled = True
+                return plan
+            if on_progress:
+                on_progress(len(seen_paths), file_path)
+        cached_fingerprint = known_fingerprints.get(file_path)
+        if cached_fingerprint is None:
+            new_entries.append((file_path, fingerprint))
+        elif tuple(cached_fingerprint) != fingerprint:
+            plan.to_parse.append((file_path, fingerprint))
+        else:
+            plan.unchanged += 1
+
+    # Keyed by the whole fingerprint: a rename keeps mtime and size as well, and several vanished
+    # files can share an inode (other mounts, network shares reporting 0 or 1, hardlinks).
+    vanished_by_fingerprint = {}
+    for file_path, cached_fingerprint in known_fingerprints.items():
+        if file_path not in seen_paths and is_in_scope(file_path):
+            if cached_fingerprint[2]:
+                vanished_by_fingerprint.setdefault(tuple(cached_fingerprint), []).append(file_path)
+            else:
+                plan.removed.append(file_path)
+
+    for file_path, fingerprint in new_entries:
+        candidates = vanished_by_fingerprint.get(fingerprint) if fingerprint[2] else None
+        if candidates:
+            plan.renamed.append((candidates.pop(0), file_path, fingerprint))
+        else:
+            plan.to_parse.append((file_path, fingerprint))
+
+    for old_paths in vanished_by_fingerprint.values():
+        plan.removed.extend(old_paths)
+    return plan
@@ -0,0 +1,294 @@
+import gc
+import re
+from bisect import bisect_left, insort
+from collections.abc import Set
+
+SEARCH_FIELDS = ("title", "artist", "album", "genre")
+REFINE_SCAN_LIMIT = 4096 # up to this many candidates, a refined search checks each doc's tokens directly
+
+_TOKEN_REGEX = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Splits text into casefolded word tokens ("AC/DC - Back in Black" -> ["ac", "dc", "back", "in", "black"])."""
+    return _TOKEN_REGEX.findall(text.casefold()) if text else []
+
+
+def parse_query(query):
+    """
+    Splits a search query into (field, term) pairs: field is one of SEARCH_FIELDS for "artist:queen"
+    style terms and None for free-text terms, which match any field.
+    """
+    terms = []
+    for raw_term in query.split():
+        field = None
+        if ":" in raw_term:
+            prefix, _, rest = raw_term.partition(":")
+            if prefix.casefold() in SEARCH_FIELDS:
+                field, raw_term = prefix.casefold(), rest
+        for token in tokenize(raw_term):
+            terms.append((field, token))
+    return terms
+
+
+def _deletes(token):
+    """All variants of token with one character removed (for distance-1 fuzzy lookups)."""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class _FieldIndex:
+    """Postings for one field (or for all fields together): token -> set of doc ids, plus a sorted vocabulary."""
+
+    def __init__(self):
+        self.postings = {}
+        self.vocabulary = [] # sorted, for prefix range lookups
+        self.fuzzy_variants = None # delete-variant -> set of tokens, built on first fuzzy query
+
+    def add(self, token, doc_id):
+        docs = self.postings.get(token)
+        if docs is None:
+            self.postings[token] = {doc_id}
+            insort(self.vocabulary, token)
+            if self.fuzzy_variants is not None:
+                for variant in _deletes(token) | {token}:
+                    self.fuzzy_variants.setdefault(variant, set()).add(token)
+        else:
+            docs.add(doc_id)
+
+    def discard(self, token, doc_id):
+        docs = self.postings.get(token)
+        if docs is None:
+            return
+        docs.discard(doc_id)
+        if not docs:
+            del self.postings[token]
+            position = bisect_left(self.vocabulary, token)
+            if position < len(self.vocabulary) and self.vocabulary[position] == token:
+                del self.vocabulary[position]
+            if self.fuzzy_variants is not None:
+                for variant in _deletes(token) | {token}:
+                    tokens = self.fuzzy_variants.get(variant)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self.fuzzy_variants[variant]
+
+    def sort_vocabulary(self):
+        self.vocabulary = sorted(self.postings)
+
+    def tokens_with_prefix(self, prefix):
+        start = bisect_left(self.vocabulary, prefix)
+        end = start
+        while end < len(self.vocabulary) and self.vocabulary[end].startswith(prefix):
+            end += 1
+        return self.vocabulary[start:end]
+
+    def fuzzy_tokens(self, token):
+        if self.fuzzy_variants is None:
+            self.fuzzy_variants = {}
+            for known_token in self.postings:
+                for variant in _deletes(known_token) | {known_token}:
+                    self.fuzzy_variants.setdefault(variant, set()).add(known_token)
+        matches = set()
+        for variant in _deletes(token) | {token}:
+            matches.update(self.fuzzy_variants.get(variant, ()))
+        return matches
+
+    def match(self, term, fuzzy=False):
+        """Doc ids with a token starting with term (plus tokens one edit away from term when fuzzy)."""
+        tokens = self.tokens_with_prefix(term)
+        if fuzzy and len(term) > 2 and term.isalpha():
+            tokens = set(tokens)
+            tokens.update(self.fuzzy_tokens(term))
+        if len(tokens) == 1:
+            return self.postings[next(iter(tokens))]
+        result = set()
+        for token in tokens:
+            result.update(self.postings[token])
+        return result
+
+
+class SearchResult(Set):
+    """
+    Read-only set of matching file paths, kept as doc ids so large result sets
+    cost nothing to build; membership tests map the path back to its doc id.
+    Tracks removed from the index after the search drop out of the result.
+    """
+
+    def __init__(self, doc_ids, id_by_path, paths, removal_generation):
+        self._doc_ids = doc_ids
+        self._id_by_path = id_by_path
+        self._paths = paths
+        # Every doc id is live when the result is built; the count is only redone after removals.
+        self._removal_generation = removal_generation # callable, the index's running count of removals
+        self._generation_seen = removal_generation()
+        self._count = len(doc_ids)
+
+    def __contains__(self, file_path):
+        return self._id_by_path.get(file_path) in self._doc_ids
+
+    def __iter__(self):
+        paths = self._paths
+        return (paths[doc_id] for doc_id in self._doc_ids if paths[doc_id] is not None)
+
+    def __len__(self):
+        generation = self._removal_generation()
+        if generation != self._generation_seen:
+            paths = self._paths
+            self._count = sum(1 for doc_id in self._doc_ids if paths[doc_id] is not None)
+            self._generation_seen = generation
+        return self._count
+
+    def __repr__(self):
+        return f"SearchResult({len(self)} tracks)"
+
+
+class TrackSearchIndex:
+    """
+    Inverted index over title, artist, album and genre of the library's tracks.
+
+    Queries are whitespace-separated terms that must all match (AND). Every term is a prefix
+    match on word tokens; "artist:queen" limits a term to one field, and fuzzy=True also
+    accepts tokens one edit away ("beatels" -> "beatles").
+
+    Doc ids are never reused, so a SearchResult stays correct for the paths it matched
+    even after the index has changed; rebuild() compacts them.
+    """
+
+    def __init__(self):
+        self._doc_ids = {}  # file_path -> doc id
+        self._paths = []    # doc id -> file_path (None once removed)
+        self._doc_tokens = {} # doc id -> [(field, token), ...] to undo add()
+        self._removals = 0 # running count of remove() calls; SearchResults recount their length when it moves
+        self._all_fields = _FieldIndex()
+        self._fields = {field: _FieldIndex() for field in SEARCH_FIELDS}
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def removal_generation(self):
+        return self._removals
+
+    def clear(self):
+        removals = self._removals
+        self.__init__()
+        self._removals = removals # kept, so results of the old index never mistake a new count for their own
+
+    def rebuild(self, tracks):
+        """Re-indexes everything at once; much faster than add() per track for a whole library."""
+        self.clear()
+        # The index is millions of small sets and tuples with no cycles; don't let the
+        # cyclic GC rescan them over and over while they are being created.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._bulk_add(tracks)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        for field_index in (self._all_fields, *self._fields.values()):
+            field_index.sort_vocabulary()
+
+    def _bulk_add(self, tracks):
+        # Same bookkeeping as add(), inlined with local lookups since this runs for every track at startup.
+        all_postings = self._all_fields.postings
+        field_postings = [(field, self._fields[field].postings) for field in SEARCH_FIELDS]
+        id_by_path, paths, doc_tokens_by_id = self._doc_ids, self._paths, self._doc_tokens
+        find_tokens = _TOKEN_REGEX.findall
+        for track in tracks:
+            if track.file_path in id_by_path:
+                continue
+            doc_id = len(paths)
+            paths.append(track.file_path)
+            id_by_path[track.file_path] = doc_id
+            doc_tokens = []
+            track_tokens = set()
+            for field, postings in field_postings:
+                text = getattr(track, field, "")
+                if not text:
+                    continue
+                field_tokens = set(find_tokens(text.casefold()))
+                for token in field_tokens:
+                    postings.setdefault(token, set()).add(doc_id)
+                    doc_tokens.append((field, token))
+                track_tokens |= field_tokens
+            for token in track_tokens:
+                all_postings.setdefault(token, set()).add(doc_id)
+            doc_tokens_by_id[doc_id] = doc_tokens
+
+    def add(self, track):
+        if track.file_path in self._doc_ids:
+            self.remove(track.file_path)
+        doc_id = len(self._paths)
+        self._paths.append(track.file_path)
+        self._doc_ids[track.file_path] = doc_id
+
+        doc_tokens = set()
+        for field in SEARCH_FIELDS:
+            for token in tokenize(getattr(track, field, "")):
+                doc_tokens.add((field, token))
+        for field, token in doc_tokens:
+            self._fields[field].add(token, doc_id)
+        for token in {token for _, token in doc_tokens}:
+            self._all_fields.add(token, doc_id)
+        self._doc_tokens[doc_id] = list(doc_tokens)
+
+    def remove(self, file_path):
+        doc_id = self._doc_ids.pop(file_path, None)
+        if doc_id is None:
+            return False
+        doc_tokens = self._doc_tokens.pop(doc_id)
+        for field, token in doc_tokens:
+            self._fields[field].discard(token, doc_id)
+        for token in {token for _, token in doc_tokens}:
+            self._all_fields.discard(token, doc_id)
+        self._paths[doc_id] = None
+        self._removals += 1
+        return True
+
+    def is_refinement(self, old_query, new_query):
+        """True if new_query can only narrow old_query's results (each old term extended, maybe more terms)."""
+        old_terms, new_terms = parse_query(old_query), parse_query(new_query)
+        if not old_terms or len(new_terms) < len(old_terms):
+            return False
+        return all(
+            new_field == old_field and new_term.startswith(old_term)
+            for (old_field, old_term), (new_field, new_term) in zip(old_terms, new_terms)
+        )
+
+    def _doc_matches_all(self, doc_id, terms):
+        doc_tokens = self._doc_tokens.get(doc_id)
+        if doc_tokens is None:
+            return False
+        return all(
+            any(token.startswith(term) and (field is None or field == token_field) for token_field, token in doc_tokens)
+            for field, term in terms
+        )
+
+    def search(self, query, fuzzy=False, within=None):
+        """
+        Returns the matching file paths as a SearchResult, or None when the query has no terms
+        (i.e. everything matches and the caller should not filter).
+
+        within is an earlier SearchResult of this index that is known to contain every match
+        (see is_refinement()); the search then only looks at those candidates.
+        """
+        terms = parse_query(query)
+        if not terms:
+            return None
+
+        result = None
+        if within is not None and not fuzzy and within._id_by_path is self._doc_ids:
+            candidates = within._doc_ids
+            if len(candidates) <= REFINE_SCAN_LIMIT:
+                matched = {doc_id for doc_id in candidates if self._doc_matches_all(doc_id, terms)}
+                return SearchResult(matched, self._doc_ids, self._paths, self.removal_generation)
+            result = set(candidates)
+        # Longer terms are usually more selective, so start with them to keep intersections small.
+        for field, term in sorted(terms, key=lambda t: -len(t[1])):
+            field_index = self._fields[field] if field else self._all_fields
+            matches = field_index.match(term, fuzzy=fuzzy)
+            result = set(matches) if result is None else result & matches
+            if not result:
+                break
+        return SearchResult(result, self._doc_ids, self._paths, self.removal_generation)
@@ -0,0 +1,87 @@
+from bisect import bisect_left, insort
+
+SORT_BY_ARTIST = "artist"
+SORT_BY_ALBUM = "album"
+SORT_BY_TITLE = "title"
+SORT_BY_DURATION = "duration"
+
+
+def _artist_key(track):
+    return (track.artist.casefold(), track.album.casefold(), track.title.casefold(), track.file_path)
+
+def _album_key(track):
+    return (track.album.casefold(), track.artist.casefold(), track.title.casefold(), track.file_path)
+
+def _title_key(track):
+    return (track.title.casefold(), track.artist.casefold(), track.album.casefold(), track.file_path)
+
+def _duration_key(track):
+    return (track.duration_ms, track.title.casefold(), track.file_path)
+
+SORT_KEYS = {
+    SORT_BY_ARTIST: _artist_key,
+    SORT_BY_ALBUM: _album_key,
+    SORT_BY_TITLE: _title_key,
+    SORT_BY_DURATION: _duration_key,
+}
+
+
+class SortedTrackIndex:
+    """
+    Keeps the library's file paths in one sort order.
+    Sort keys are computed once per track (casefolded, with the path as a tie-breaker so every
+    key is unique); adds and removes are bisect operations, and the whole list is only
+    re-sorted when the order itself changes or the library is replaced.
+    """
+
+    def __init__(self, order=SORT_BY_ARTIST):
+        if order not in SORT_KEYS:
+            raise ValueError(f"Unknown sort order: {order}")
+        self._order = order
+        self._key_function = SORT_KEYS[order]
+        self._keys = []        # sorted sort keys; the last element of each is the file path
+        self._key_by_path = {}
+
+    def order(self):
+        return self._order
+
+    def __len__(self):
+        return len(self._keys)
+
+    def rebuild(self, tracks):
+        key_function = self._key_function
+        self._key_by_path = {track.file_path: key_function(track) for track in tracks}
+        self._keys = sorted(self._key_by_path.values())
+
+    def set_order(self, order, tracks):
+        """Switches to another order; returns False (and does nothing) if it is already the current one."""
+        if order == self._order:
+            return False
+        if order not in SORT_KEYS:
+            raise ValueError(f"Unknown sort order: {order}")
+        self._order = order
+        self._key_function = SORT_KEYS[order]
+        self.rebuild(tracks)
+        return True
+
+    def add(self, track):
+        self.remove(track.file_path)
+        key = self._key_function(track)
+        self._key_by_path[track.file_path] = key
+        insort(self._keys, key)
+
+    def remove(self, file_path):
+        key = self._key_by_path.pop(file_path, None)
+        if key is None:
+            return False
+        position = bisect_left(self._keys, key)
+        del self._keys[position]
+        return True
+
+    def position(self, file_path):
+        """Index of file_path in paths(), or None if it is not in the index."""
+        key = self._key_by_path.get(file_path)
+        return None if key is None else bisect_left(self._keys, key)
+
+    def paths(self):
+        return [key[-1] for key in self._keys]
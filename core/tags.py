@@ -0,0 +1,222 @@
+import os
+import mmap
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import mutagen
+from mutagen.id3 import ID3
+from mutagen.mp4 import MP4Tags
+
+DEFAULT_TAG_CACHE_SIZE = 512
+MAX_ARTWORK_SEARCH_BYTES = 32 * 1024 * 1024 # cover art is looked up in at most this much of the file
+ARTWORK_PROBE_BYTES = 64
+
+ID3_TEXT_FRAMES = {"title": "TIT2", "artist": "TPE1", "album": "TALB", "genre": "TCON"}
+MP4_TEXT_ATOMS = {"title": "\xa9nam", "artist": "\xa9ART", "album": "\xa9alb", "genre": "\xa9gen"}
+PREFERRED_USLT_KEYS = ("USLT::eng", "USLT::XXX", "USLT::")
+SYLT_FORMAT_MILLISECONDS = 2
+MP4_COVER_MIME_TYPES = {13: "image/jpeg", 14: "image/png"} # MP4Cover.imageformat
+
+
+@dataclass
+class ArtworkRef:
+    """
+    An embedded picture. Its offset in the audio file is only searched for by locate_artwork(),
+    which the artwork code calls; until then (or if it was not found) offset is None.
+    head and tail are the first and last ARTWORK_PROBE_BYTES of the picture, used for that search.
+    """
+    mime: str
+    offset: int = None
+    length: int = 0
+    head: bytes = b""
+    tail: bytes = b""
+    searched: bool = False
+
+
+@dataclass
+class TagInfo:
+    """Everything the app reads from a file's tags, gathered in one mutagen pass. Missing text fields are ""."""
+    file_path: str
+    title: str = ""
+    artist: str = ""
+    album: str = ""
+    genre: str = ""
+    duration_ms: int = 0
+    lyrics: str = ""                                    # unsynced (USLT / lyrics comment)
+    synced_lyrics: list = field(default_factory=list)   # [(timestamp_ms, line)] from SYLT
+    artwork: list = field(default_factory=list)         # ArtworkRef objects
+
+
+class TagCache:
+    """Thread-safe LRU of TagInfo keyed by path, valid while the file's (mtime_ns, size) is unchanged."""
+
+    def __init__(self, max_entries=DEFAULT_TAG_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # path -> (signature, TagInfo)
+        self._lock = threading.Lock()
+
+    def get(self, file_path, signature):
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is None or entry[0] != signature:
+                return None
+            self._entries.move_to_end(file_path)
+            return entry[1]
+
+    def put(self, file_path, signature, tag_info):
+        with self._lock:
+            self._entries[file_path] = (signature, tag_info)
+            self._entries.move_to_end(file_path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_tag_cache = TagCache()
+
+
+def _first_text(values):
+    if not values:
+        return ""
+    value = values[0] if isinstance(values, (list, tuple)) else values
+    return str(value).strip()
+
+
+def _read_id3(tags, info, pictures):
+    for name, frame_id in ID3_TEXT_FRAMES.items():
+        frame = tags.get(frame_id)
+        if frame is None:
+            continue
+        if frame_id == "TCON" and getattr(frame, "genres", None):
+            setattr(info, name, frame.genres[0])
+        else:
+            setattr(info, name, _first_text(frame.text))
+
+    uslt_frames = [tags[key] for key in PREFERRED_USLT_KEYS if key in tags] + tags.getall("USLT")
+    for frame in uslt_frames:
+        if frame.text and frame.text.strip():
+            info.lyrics = frame.text.strip()
+            break
+
+    for frame in tags.getall("SYLT"):
+        if frame.format == SYLT_FORMAT_MILLISECONDS and frame.text:
+            info.synced_lyrics = sorted((int(timestamp), text.strip()) for text, timestamp in frame.text if text.strip())
+            break
+
+    for frame in tags.getall("APIC"):
+        pictures.append((frame.mime or "image/jpeg", frame.data))
+
+
+def _read_mp4(tags, info, pictures):
+    for name, atom in MP4_TEXT_ATOMS.items():
+        setattr(info, name, _first_text(tags.get(atom)))
+    info.lyrics = _first_text(tags.get("\xa9lyr"))
+    for cover in tags.get("covr", []):
+        pictures.append((MP4_COVER_MIME_TYPES.get(getattr(cover, "imageformat", None), "image/jpeg"), bytes(cover)))
+
+
+def _read_comments(audio, info, pictures):
+    # Vorbis comments (FLAC, Ogg) and other dict-like tags with plain field names.
+    tags = audio.tags
+    if tags is not None:
+        for name in ("title", "artist", "album", "genre"):
+            setattr(info, name, _first_text(tags.get(name)))
+        info.lyrics = _first_text(tags.get("lyrics") or tags.get("unsyncedlyrics"))
+    for picture in getattr(audio, "pictures", []):
+        pictures.append((picture.mime or "image/jpeg", picture.data))
+
+
+def _artwork_refs(pictures):
+    return [ArtworkRef(mime, None, len(data), data[:ARTWORK_PROBE_BYTES], data[-ARTWORK_PROBE_BYTES:])
+            for mime, data in pictures]
+
+
+def locate_artwork(file_path, refs, search_limit=MAX_ARTWORK_SEARCH_BYTES):
+    """
+    Finds where each ArtworkRef's picture is stored in the file with a bounded byte search (a match
+    needs the same head, tail and length), so the image can be read straight from the file without
+    parsing the tags again. Each ref is searched once; returns refs.
+    """
+    pending = [ref for ref in refs if not ref.searched and ref.head]
+    if not pending:
+        return refs
+    try:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = min(len(mapped), search_limit)
+            for ref in pending:
+                position = mapped.find(ref.head, 0, end)
+                while position != -1:
+                    picture_end = position + ref.length
+                    if picture_end <= len(mapped) and mapped[picture_end - len(ref.tail):picture_end] == ref.tail:
+                        ref.offset = position
+                        break
+                    position = mapped.find(ref.head, position + 1, end)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not locate cover art in {file_path}: {e}")
+    for ref in pending:
+        ref.searched = True
+    return refs
+
+
+def _file_signature(file_path):
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def read_tags(file_path, use_cache=True):
+    """
+    Opens file_path with mutagen once and returns its TagInfo (None if it cannot be parsed).
+    Results are cached per process until the file's mtime or size changes, so the scanner,
+    the lyrics loader and cover art lookups share one parse. Artwork offsets are not searched
+    for here; see locate_artwork().
+    """
+    try:
+        signature = _file_signature(file_path)
+    except OSError as e:
+        print(f"Error reading metadata for {file_path}: {e}")
+        return None
+    if use_cache:
+        cached = _tag_cache.get(file_path, signature)
+        if cached is not None:
+            return cached
+
+    try:
+        audio = mutagen.File(file_path)
+    except mutagen.MutagenError as e:
+        print(f"Error reading metadata for {file_path}: {e}")
+        return None
+    except Exception as e:
+        print(f"Generic error processing file {file_path}: {e}")
+        return None
+    if audio is None:
+        print(f"Warning: Could not read metadata for {file_path} (mutagen returned None)")
+        return None
+
+    info = TagInfo(file_path)
+    if getattr(audio, "info", None) is not None and getattr(audio.info, "length", None):
+        info.duration_ms = int(audio.info.length * 1000)
+
+    pictures = []
+    try:
+        if isinstance(audio.tags, ID3):
+            _read_id3(audio.tags, info, pictures)
+        elif isinstance(audio.tags, MP4Tags):
+            _read_mp4(audio.tags, info, pictures)
+        else:
+            _read_comments(audio, info, pictures)
+    except Exception as e:
+        print(f"Warning: Could not read all tags of {file_path}: {e}")
+    if pictures:
+        info.artwork = _artwork_refs(pictures) # located on demand, the scanner never needs the offsets
+
+    if use_cache:
+        _tag_cache.put(file_path, signature, info)
+    return info
+
+
+def clear_tag_cache():
+    _tag_cache.clear()
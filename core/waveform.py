@@ -0,0 +1,211 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from core.decoder import open_pcm_stream, AudioDecodeError
+from core.scanner import fingerprint_from_stat
+
+PEAKS_PER_SECOND = 50      # one (min, max) pair per 20 ms of audio
+PEAK_SCALE = 127           # peaks are stored as int8 in [-127, 127]
+PEAKS_PER_BLOCK = 256      # peaks reduced from each decoded block (~5 s of audio)
+WAVEFORM_FORMAT_VERSION = 1 # part of the cache key; bump when the stored layout changes
+DEFAULT_WAVEFORM_CACHE_BYTES = 256 * 1024 * 1024 # ~10,000 four-minute tracks
+
+
+def compute_peaks(samples, sample_rate, full_scale, peaks_per_second=PEAKS_PER_SECOND):
+    """
+    Reduces (frames, channels) samples to an int8 array of shape (n, 2) holding the min and max
+    over all channels of each 1/peaks_per_second slice of audio, scaled to [-PEAK_SCALE, PEAK_SCALE].
+    """
+    samples = np.asarray(samples)
+    if samples.ndim == 1:
+        samples = samples.reshape(-1, 1)
+    frames_per_peak = max(1, sample_rate // peaks_per_second)
+    # Interleaved frames of one slice are contiguous, so each slice is one row of a reshaped view.
+    block = frames_per_peak * samples.shape[1]
+    flat = np.ascontiguousarray(samples).reshape(-1)
+    whole = len(flat) // block * block
+    mins = flat[:whole].reshape(-1, block).min(axis=1)
+    maxs = flat[:whole].reshape(-1, block).max(axis=1)
+    if whole < len(flat):
+        mins = np.append(mins, flat[whole:].min())
+        maxs = np.append(maxs, flat[whole:].max())
+
+    peaks = np.empty((len(mins), 2), dtype=np.int8)
+    scale = PEAK_SCALE / full_scale
+    peaks[:, 0] = np.clip(np.floor(mins * scale), -PEAK_SCALE, PEAK_SCALE)
+    peaks[:, 1] = np.clip(np.ceil(maxs * scale), -PEAK_SCALE, PEAK_SCALE)
+    return peaks
+
+
+def compute_stream_peaks(stream, peaks_per_second=PEAKS_PER_SECOND):
+    """compute_peaks() for a core.decoder.PcmStream, one decoded block at a time."""
+    frames_per_peak = max(1, stream.sample_rate // peaks_per_second)
+    # Blocks hold a whole number of peaks, so reducing them separately gives the same result.
+    block_peaks = [
+        compute_peaks(block, stream.sample_rate, stream.full_scale, peaks_per_second)
+        for block in stream.frames(frames_per_peak * PEAKS_PER_BLOCK)
+    ]
+    return np.concatenate(block_peaks) if block_peaks else np.zeros((0, 2), dtype=np.int8)
+
+
+class Waveform:
+    """Min/max peaks of one track, PEAKS_PER_SECOND pairs per second (peaks may be a read-only memmap)."""
+
+    def __init__(self, peaks, peaks_per_second=PEAKS_PER_SECOND):
+        self.peaks = peaks
+        self.peaks_per_second = peaks_per_second
+
+    def __len__(self):
+        return len(self.peaks)
+
+    @property
+    def duration_ms(self):
+        return len(self.peaks) * 1000 // self.peaks_per_second
+
+    def columns(self, width, start_ms=0, end_ms=None):
+        """
+        Returns (mins, maxs) float arrays in [-1, 1] with one value per pixel column for the
+        time range [start_ms, end_ms), so a view of any width can be drawn without decoding.
+        """
+        start = max(0, start_ms * self.peaks_per_second // 1000)
+        end = len(self.peaks) if end_ms is None else min(len(self.peaks), end_ms * self.peaks_per_second // 1000)
+        visible = self.peaks[start:end]
+        if width <= 0 or len(visible) == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        bounds = np.arange(width) * len(visible) // width
+        if len(visible) >= width:
+            mins = np.minimum.reduceat(visible[:, 0], bounds)
+            maxs = np.maximum.reduceat(visible[:, 1], bounds)
+        else:
+            mins, maxs = visible[bounds, 0], visible[bounds, 1]
+        return mins.astype(np.float32) / PEAK_SCALE, maxs.astype(np.float32) / PEAK_SCALE
+
+
+class WaveformCache:
+    """
+    On-disk cache of peak arrays, one .npy file per track named "<path hash>-<fingerprint hash>.npy"
+    after its path and (mtime, size, inode) fingerprint. Files are loaded memory-mapped, so opening
+    a cached waveform costs a page-in of the part that is drawn. Storing a track's waveform deletes
+    the entry of its previous fingerprint; a read bumps the file's mtime, and once the files exceed
+    max_bytes the least recently used are deleted. Safe to use from several worker threads.
+    """
+
+    def __init__(self, cache_dir, peaks_per_second=PEAKS_PER_SECOND, max_bytes=DEFAULT_WAVEFORM_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.peaks_per_second = peaks_per_second
+        self.max_bytes = max_bytes
+        self._entries = None # file name -> size, least recently used first
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path_digest(self, audio_path):
+        key = f"{WAVEFORM_FORMAT_VERSION}|{self.peaks_per_second}|{os.path.abspath(audio_path)}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def cache_file_path(self, audio_path, fingerprint):
+        fingerprint_digest = hashlib.sha1(repr(tuple(fingerprint)).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{self._path_digest(audio_path)}-{fingerprint_digest}.npy")
+
+    def _load_entries(self):
+        # Called with the lock held.
+        if self._entries is not None:
+            return
+        found = []
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".npy") and entry.is_file():
+                        st = entry.stat()
+                        found.append((st.st_mtime_ns, entry.name, st.st_size))
+        except OSError:
+            pass
+        self._entries = OrderedDict((name, file_size) for _, name, file_size in sorted(found))
+        self._total_bytes = sum(self._entries.values())
+
+    def total_bytes(self):
+        with self._lock:
+            self._load_entries()
+            return self._total_bytes
+
+    def load(self, audio_path, fingerprint):
+        """Returns the cached Waveform for this fingerprint, or None if there is none."""
+        cache_path = self.cache_file_path(audio_path, fingerprint)
+        try:
+            peaks = np.load(cache_path, mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Discarding unreadable waveform cache file {cache_path}: {e}")
+            return None
+        if peaks.ndim != 2 or peaks.shape[1] != 2 or peaks.dtype != np.int8:
+            return None
+        with self._lock:
+            self._load_entries()
+            name = os.path.basename(cache_path)
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return Waveform(peaks, self.peaks_per_second)
+
+    def store(self, audio_path, fingerprint, peaks):
+        cache_path = self.cache_file_path(audio_path, fingerprint)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(peaks, dtype=np.int8))
+            os.replace(temp_path, cache_path) # readers never see a half-written file
+            file_size = os.path.getsize(cache_path)
+        except OSError as e:
+            print(f"Warning: Could not write waveform cache file {cache_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        name = os.path.basename(cache_path)
+        outdated_prefix = self._path_digest(audio_path) + "-"
+        with self._lock:
+            self._load_entries()
+            outdated = [n for n in self._entries if n.startswith(outdated_prefix) and n != name]
+            for outdated_name in outdated: # the same track with an older fingerprint
+                self._delete(outdated_name)
+            self._total_bytes += file_size - self._entries.pop(name, 0)
+            self._entries[name] = file_size
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                self._delete(next(iter(self._entries)))
+
+    def _delete(self, name):
+        # Called with the lock held. A waveform still mapped by a reader stays readable until it is closed.
+        self._total_bytes -= self._entries.pop(name)
+        try:
+            os.remove(os.path.join(self.cache_dir, name))
+        except OSError as e:
+            print(f"Warning: Could not evict waveform cache file {name}: {e}")
+
+    def get(self, audio_path):
+        """
+        Returns the track's Waveform, decoding and caching it on the first request.
+        Returns None if the file is missing or cannot be decoded. Safe to call from worker threads.
+        """
+        try:
+            fingerprint = fingerprint_from_stat(os.stat(audio_path))
+        except OSError as e:
+            print(f"Warning: Cannot read {audio_path} for its waveform: {e}")
+            return None
+        waveform = self.load(audio_path, fingerprint)
+        if waveform is not None:
+            return waveform
+        try:
+            with open_pcm_stream(audio_path) as stream:
+                peaks = compute_stream_peaks(stream, self.peaks_per_second)
+        except AudioDecodeError as e:
+            print(f"Warning: {e}")
+            return None
+        self.store(audio_path, fingerprint, peaks)
+        return self.load(audio_path, fingerprint) or Waveform(peaks, self.peaks_per_second)
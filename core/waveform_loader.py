@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.waveform import WaveformCache
+
+
+class WaveformLoader(QObject):
+    """
+    Fetches waveforms from a WaveformCache on a background thread; decoding a track that is not
+    cached yet can take a while. waveformReady is emitted on the GUI thread with (path, Waveform),
+    only for the track that was requested last. Results for other tracks are still written to the cache.
+    """
+    waveformReady = pyqtSignal(str, object) # audio path, Waveform
+    _jobDone = pyqtSignal(object)           # Future; emitted from the worker thread, delivered queued
+
+    def __init__(self, cache_dir, parent=None):
+        super().__init__(parent)
+        self._cache = WaveformCache(cache_dir)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="waveform")
+        self._current_path = None
+        self._pending_future = None
+        self._jobDone.connect(self._on_job_done)
+
+    def current_path(self):
+        return self._current_path
+
+    def request(self, audio_path):
+        if self._pending_future is not None:
+            self._pending_future.cancel()
+        self._current_path = audio_path
+        future = self._executor.submit(self._load, audio_path)
+        self._pending_future = future
+        future.add_done_callback(self._jobDone.emit)
+        return future
+
+    def _load(self, audio_path):
+        return audio_path, self._cache.get(audio_path)
+
+    def cancel(self):
+        self._current_path = None
+        if self._pending_future is not None:
+            self._pending_future.cancel()
+            self._pending_future = None
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_job_done(self, future):
+        if future is self._pending_future:
+            self._pending_future = None
+        if future.cancelled():
+            return
+        try:
+            audio_path, waveform = future.result()
+        except Exception as e:
+            print(f"Error loading waveform: {e}")
+            return
+        if audio_path != self._current_path or waveform is None:
+            return
+        self.waveformReady.emit(audio_path, waveform)
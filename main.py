@@ -38,6 +38,23 @@ QListWidget::item:hover {
     background-color: #2A2D2E; 
 }
 
+QTableView {
+    background-color: #252526;
+    alternate-background-color: #2A2A2B;
+    border: 1px solid #333333;
+    color: #CCCCCC;
+    selection-background-color: #007ACC;
+    selection-color: #FFFFFF;
+}
+
+QHeaderView::section {
+    background-color: #2D2D2D;
+    color: #D4D4D4;
+    border: none;
+    border-right: 1px solid #333333;
+    padding: 4px;
+}
+
 QPushButton {
     background-color: #3C3C3C;
     color: #F0F0F0;
@@ -1,27 +1,126 @@
 import unittest
 import sys
 import os
+import tempfile
 
+import numpy as np
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.core.analyzer import Analyzer
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.synthetic_audio import write_wav, SAMPLE_RATE
+from core.analyzer import Analyzer
+from core.config_store import ConfigStore
+from core.library import MusicLibraryManager
+from core.scanner import EXECUTOR_SERIAL, EXECUTOR_PROCESS
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def tone(frequencies, duration_s, amplitude=0.5):
+    t = np.arange(int(duration_s * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = sum(np.sin(2 * np.pi * f * t) for f in frequencies) / len(frequencies)
+    return (signal * amplitude * 32767).astype(np.int16)
+
+def click_track(bpm, duration_s):
+    samples = np.zeros(int(duration_s * SAMPLE_RATE), dtype=np.int16)
+    click = tone([1000], 0.005, amplitude=0.8)
+    for beat_s in np.arange(0, duration_s, 60.0 / bpm):
+        start = int(beat_s * SAMPLE_RATE)
+        samples[start:start + len(click)] = click[:len(samples) - start]
+    return samples
 
 class TestAnalyzer(unittest.TestCase):
     def setUp(self):
-        self.analyzer = Analyzer()
-        self.track = {"id": 1, "title": "Song 1", "artist": "Artist 1", "duration": 180}
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.analyzer = Analyzer(EXECUTOR_SERIAL)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name, samples):
+        path = os.path.join(self.temp_dir.name, name)
+        write_wav(path, duration_s=len(samples) / SAMPLE_RATE, channels=1, samples=samples)
+        return path
+
+    def test_analyze_sine(self):
+        # Тестируем анализ синуса 440 Гц с амплитудой 0.5
+        result = self.analyzer.analyze(self._write("sine.wav", tone([440], 3.0)))
+        self.assertAlmostEqual(result.duration_s, 3.0, places=2)
+        self.assertAlmostEqual(result.peak_db, -6.02, delta=0.1)
+        self.assertAlmostEqual(result.rms_db, -9.03, delta=0.1)
+        self.assertAlmostEqual(result.spectral_centroid_hz, 440, delta=20)
+        self.assertEqual(result.tempo_bpm, 0.0)
+        self.assertTrue(result.key.startswith("A "))
+
+    def test_analyze_click_track(self):
+        result = self.analyzer.analyze(self._write("clicks.wav", click_track(120, 8.0)))
+        self.assertAlmostEqual(result.tempo_bpm, 120, delta=2)
 
-    def test_analyze_with_track(self):
-        # Тестируем анализ с треком
-        result = self.analyzer.analyze(self.track)
-        expected = "Analysis for Song 1 - Artist 1: Frequency = 440Hz, Intensity = 0.5 (placeholder)"
-        self.assertEqual(result, expected)
+    def test_analyze_chords(self):
+        a_minor = self.analyzer.analyze(self._write("a_minor.wav", tone([220.0, 261.63, 329.63], 2.0)))
+        c_major = self.analyzer.analyze(self._write("c_major.wav", tone([261.63, 329.63, 392.0], 2.0)))
+        self.assertEqual(a_minor.key, "A minor")
+        self.assertEqual(c_major.key, "C major")
+
+    def test_analyze_many(self):
+        paths = [self._write(f"sine_{i}.wav", tone([440], 1.0)) for i in range(3)]
+        results = []
+        done = self.analyzer.analyze_many(paths + [os.path.join(self.temp_dir.name, "missing.wav")], on_result=results.append)
+        self.assertEqual(done, 4)
+        self.assertEqual([result.file_path for result in results], paths)
+
+    def test_analyze_many_in_process_pool(self):
+        paths = [self._write(f"pool_{i}.wav", tone([440], 0.5)) for i in range(5)]
+        results, progress = [], []
+        done = Analyzer(EXECUTOR_PROCESS, max_workers=2).analyze_many(
+            paths, on_result=results.append, on_progress=lambda files_done, total: progress.append((files_done, total)))
+        self.assertEqual(done, 5)
+        self.assertEqual(sorted(result.file_path for result in results), sorted(paths))
+        self.assertEqual(progress, [(i, 5) for i in range(1, 6)])
 
     def test_analyze_without_track(self):
         # Тестируем анализ без трека
-        result = self.analyzer.analyze(None)
-        self.assertEqual(result, "No track selected for analysis!")
+        self.assertIsNone(self.analyzer.analyze(None))
+
+class TestLibraryAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        music_dir = os.path.join(self.temp_dir.name, "music")
+        os.makedirs(music_dir)
+        for i in range(3):
+            write_wav(os.path.join(music_dir, f"sine_{i}.wav"), duration_s=1.0, channels=1, samples=tone([440], 1.0))
+        store = ConfigStore(os.path.join(self.temp_dir.name, "library_config.json"), write_delay_ms=None)
+        self.manager = MusicLibraryManager(config_store=store)
+        self.manager.add_library_folder(music_dir)
+        self.manager.scan_all_library_folders()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_background_analysis_stores_each_result(self):
+        progress = []
+        finished = []
+        self.manager.analysisProgress.connect(lambda done, total: progress.append((done, total)))
+        loop = QEventLoop()
+        self.manager.analysisFinished.connect(lambda done, cancelled: (finished.append((done, cancelled)), loop.quit()))
+        QTimer.singleShot(20000, loop.quit)
+        self.assertTrue(self.manager.start_library_analysis(Analyzer(EXECUTOR_SERIAL)))
+        loop.exec()
+
+        self.assertEqual(finished, [(3, False)])
+        self.assertEqual(progress[-1], (3, 3))
+        self.assertEqual(self.manager.get_tracks_needing_analysis(), [])
+        self.assertFalse(self.manager.is_analysis_running())
+
+    def test_wait_delivers_queued_results(self):
+        finished = []
+        self.manager.analysisFinished.connect(lambda done, cancelled: finished.append(done))
+        self.assertTrue(self.manager.start_library_analysis(Analyzer(EXECUTOR_SERIAL)))
+        self.manager.wait_for_analysis() # no event loop runs, as on shutdown
+        self.assertEqual(finished, [3])
+        self.assertEqual(self.manager.get_tracks_needing_analysis(), [])
+        self.assertFalse(self.manager.is_analysis_running())
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mutagen.flac import FLAC, Picture
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QImage, QColor
+
+from benchmarks.synthetic_audio import write_flac
+from core import artwork, tags
+from core.artwork import ArtworkCache, ThumbnailCache, album_key, make_thumbnail, THUMBNAIL_SIZE
+from core.artwork_loader import ArtworkLoader
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def encoded_image(width, height, color, image_format="JPG"):
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor(color))
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    image.save(buffer, image_format)
+    return bytes(data)
+
+class TestArtworkCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "artwork")
+        self.album_dir = os.path.join(self.temp_dir.name, "Album")
+        os.makedirs(self.album_dir)
+        self.tracks = [os.path.join(self.album_dir, f"{i}.flac") for i in range(2)]
+        for i, path in enumerate(self.tracks):
+            write_flac(path, f"Song {i}", "Artist", "Album")
+        tags.clear_tag_cache()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _embed_cover(self, path, data):
+        audio = FLAC(path)
+        picture = Picture()
+        picture.mime, picture.type, picture.data = "image/jpeg", 3, data
+        audio.add_picture(picture)
+        audio.save()
+
+    def test_embedded_cover_extracted_once_per_album(self):
+        # Тестируем извлечение обложки один раз на альбом
+        self._embed_cover(self.tracks[0], encoded_image(300, 200, "red"))
+        cache = ArtworkCache(self.cache_dir)
+        image = cache.get(self.tracks[0], "Album")
+        self.assertEqual((image.width(), image.height()), (THUMBNAIL_SIZE, THUMBNAIL_SIZE * 2 // 3))
+
+        cache.save_index()
+        with mock.patch.object(artwork, "read_tags") as read_tags:
+            again = ArtworkCache(self.cache_dir).get(self.tracks[1], "Album")
+            read_tags.assert_not_called()
+        self.assertEqual(again.size(), image.size())
+
+    def test_folder_image_and_missing_artwork(self):
+        with open(os.path.join(self.album_dir, "Folder.JPG"), 'wb') as f:
+            f.write(encoded_image(64, 64, "blue"))
+        cache = ArtworkCache(self.cache_dir)
+        self.assertIsNotNone(cache.get(self.tracks[0], "Album"))
+
+        os.remove(os.path.join(self.album_dir, "Folder.JPG"))
+        self.assertIsNone(ArtworkCache(self.cache_dir).get(self.tracks[0], "Album"))
+
+    def test_thumbnails_are_content_addressed_and_evicted(self):
+        thumbnails = ThumbnailCache(self.cache_dir, max_bytes=1)
+        red = make_thumbnail(encoded_image(100, 100, "red"))
+        thumbnails.store("a" * 40, THUMBNAIL_SIZE, red)
+        thumbnails.store("b" * 40, THUMBNAIL_SIZE, red)
+        self.assertIsNone(thumbnails.load("a" * 40, THUMBNAIL_SIZE))
+        self.assertIsNotNone(thumbnails.load("b" * 40, THUMBNAIL_SIZE))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_loader_requests_each_album_once(self):
+        self._embed_cover(self.tracks[0], encoded_image(80, 80, "green"))
+        loader = ArtworkLoader(self.cache_dir, max_workers=2)
+        ready = []
+        loop = QEventLoop()
+        loader.artworkReady.connect(lambda key, image: (ready.append((key, image)), loop.quit()))
+        QTimer.singleShot(5000, loop.quit)
+        keys = {loader.request(path, "Album") for path in self.tracks}
+        loop.exec()
+
+        self.assertEqual(keys, {album_key(self.tracks[0], "Album")})
+        self.assertEqual(len(ready), 1)
+        self.assertIsNotNone(ready[0][1])
+        self.assertFalse(loader.is_pending(ready[0][0]))
+        loader.shutdown()
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, artwork.ALBUM_INDEX_FILE_NAME)))
+
+if __name__ == '__main__':
+    unittest.main()
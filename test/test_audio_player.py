@@ -0,0 +1,280 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+
+from core import player
+from core.player import AudioPlayer, PositionDispatcher, QMediaPlayer, DEFAULT_POSITION_INTERVAL_MS
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+MediaStatus = QMediaPlayer.MediaStatus
+PlaybackState = QMediaPlayer.PlaybackState
+
+class FakeDeck(QObject):
+    """Stands in for QMediaPlayer: status changes are driven by the test, play() reports PlayingState at once."""
+    MediaStatus = QMediaPlayer.MediaStatus
+    PlaybackState = QMediaPlayer.PlaybackState
+    Error = QMediaPlayer.Error
+
+    mediaStatusChanged = pyqtSignal(object)
+    playbackStateChanged = pyqtSignal(object)
+    errorOccurred = pyqtSignal(object, str)
+    positionChanged = pyqtSignal(int)
+    metaDataChanged = pyqtSignal()
+    durationChanged = pyqtSignal(int)
+
+    created = []
+
+    def __init__(self):
+        super().__init__()
+        self.source_path = None
+        self.play_calls = 0
+        self._status = MediaStatus.NoMedia
+        self._state = PlaybackState.StoppedState
+        self._duration = 0
+        self._position = 0
+        self._error_string = ""
+        FakeDeck.created.append(self)
+
+    def setAudioOutput(self, audio_output):
+        pass
+
+    def setSource(self, url):
+        self.source_path = url.toLocalFile() or None
+        self._position = 0
+        self.set_status(MediaStatus.LoadingMedia if self.source_path else MediaStatus.NoMedia)
+
+    def set_status(self, status):
+        self._status = status
+        self.mediaStatusChanged.emit(status)
+
+    def set_position(self, position_ms):
+        self._position = position_ms
+        self.positionChanged.emit(position_ms)
+
+    def fail(self, message):
+        self._error_string = message
+        self.set_status(MediaStatus.InvalidMedia)
+        self.errorOccurred.emit(QMediaPlayer.Error.ResourceError, message)
+
+    def _set_state(self, state):
+        if state != self._state:
+            self._state = state
+            self.playbackStateChanged.emit(state)
+
+    def play(self):
+        self.play_calls += 1
+        self._set_state(PlaybackState.PlayingState)
+
+    def pause(self):
+        self._set_state(PlaybackState.PausedState)
+
+    def stop(self):
+        self._set_state(PlaybackState.StoppedState)
+
+    def mediaStatus(self):
+        return self._status
+
+    def playbackState(self):
+        return self._state
+
+    def duration(self):
+        return self._duration
+
+    def position(self):
+        return self._position
+
+    def errorString(self):
+        return self._error_string
+
+class FakeAudioOutput:
+    def __init__(self):
+        self._volume = 1.0
+
+    def setVolume(self, volume):
+        self._volume = volume
+
+    def volume(self):
+        return self._volume
+
+class FakeAudioPlayer(QObject):
+    """The part of AudioPlayer that PositionDispatcher uses."""
+    positionChanged = pyqtSignal(int)
+    playbackStateChanged = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._position = 0
+        self._state = PlaybackState.StoppedState
+
+    def set_state(self, state):
+        self._state = state
+        self.playbackStateChanged.emit(state)
+
+    def set_position(self, position_ms):
+        self._position = position_ms
+        self.positionChanged.emit(position_ms)
+
+    def playback_state(self):
+        return self._state
+
+    def get_position(self):
+        return self._position
+
+class TestAudioPlayerGapless(unittest.TestCase):
+    def setUp(self):
+        FakeDeck.created = []
+        patcher = mock.patch.multiple(player, QMediaPlayer=FakeDeck, QAudioOutput=FakeAudioOutput)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.player = AudioPlayer()
+        self.active, self.standby = FakeDeck.created
+        self.statuses = []
+        self.errors = []
+        self.advanced = []
+        self.transitions = []
+        self.player.mediaStatusChanged.connect(self.statuses.append)
+        self.player.errorOccurred.connect(lambda error, message: self.errors.append(message))
+        self.player.trackAdvanced.connect(self.advanced.append)
+        self.player.transitionMeasured.connect(self.transitions.append)
+
+    def _play_into_preload(self):
+        self.player.set_source("/music/a.mp3")
+        self.active._duration = 200000
+        self.active.set_status(MediaStatus.LoadedMedia)
+        self.player.play()
+        self.player.queue_next("/music/b.mp3")
+        self.assertIsNone(self.standby.source_path)
+        self.active.set_position(200000 - player.DEFAULT_PRELOAD_LEAD_MS + 1000)
+        self.assertEqual(self.standby.source_path, "/music/b.mp3")
+
+    def test_preloaded_track_becomes_active(self):
+        # Тестируем бесшовный переход на заранее загруженный трек
+        self._play_into_preload()
+        self.standby.set_status(MediaStatus.LoadedMedia)
+        self.active.set_status(MediaStatus.EndOfMedia)
+
+        self.assertIs(self.player._player, self.standby)
+        self.assertEqual(self.standby.play_calls, 1)
+        self.assertEqual(self.player.current_source_path, "/music/b.mp3")
+        self.assertIsNone(self.player.queued_path())
+        self.assertEqual(self.active.playbackState(), PlaybackState.StoppedState)
+        self.assertIsNone(self.active.source_path)
+        self.assertEqual(self.advanced, ["/music/b.mp3"])
+        self.assertNotIn(MediaStatus.EndOfMedia, self.statuses)
+
+        self.assertEqual(len(self.transitions), 1)
+        self.assertEqual(self.transitions[0]["path"], "/music/b.mp3")
+        self.assertIsNotNone(self.transitions[0]["preload_load_ms"])
+
+        # Pausing and resuming the new track is not another transition.
+        self.player.pause()
+        self.player.play()
+        self.assertEqual(len(self.transitions), 1)
+
+    def test_failed_preload_falls_back_to_normal_load(self):
+        self._play_into_preload()
+        self.standby.fail("Could not open file")
+        self.assertEqual(self.errors, [])
+        self.assertIsNone(self.standby.source_path)
+
+        self.active.set_status(MediaStatus.EndOfMedia)
+        self.assertIs(self.player._player, self.active)
+        self.assertEqual(self.statuses[-1], MediaStatus.EndOfMedia)
+        self.assertEqual(self.advanced, [])
+
+        # On EndOfMedia the caller starts the next track itself, on the active player.
+        self.player.set_source("/music/b.mp3")
+        self.player.play()
+        self.assertEqual(self.active.source_path, "/music/b.mp3")
+        self.assertEqual(self.active.play_calls, 2)
+        self.assertEqual(self.standby.play_calls, 0)
+        self.assertEqual(self.transitions, [])
+
+    def test_preload_not_ready_in_time_falls_back(self):
+        self._play_into_preload()
+        self.assertEqual(self.standby.mediaStatus(), MediaStatus.LoadingMedia)
+
+        self.active.set_status(MediaStatus.EndOfMedia)
+        self.assertIs(self.player._player, self.active)
+        self.assertEqual(self.statuses[-1], MediaStatus.EndOfMedia)
+        self.assertEqual(self.advanced, [])
+
+        self.player.set_source("/music/b.mp3")
+        self.assertEqual(self.active.source_path, "/music/b.mp3")
+        self.assertIsNone(self.standby.source_path)
+        self.assertEqual(self.transitions, [])
+
+class TestPositionDispatcher(unittest.TestCase):
+    def setUp(self):
+        self.player = FakeAudioPlayer()
+        self.dispatcher = PositionDispatcher(self.player, interval_ms=50)
+        self.timer = self.dispatcher._timer
+        self.positions = []
+        self.dispatcher.positionUpdated.connect(self.positions.append)
+
+    def _advance(self, start_ms, count, step_ms=10):
+        for position_ms in range(start_ms, start_ms + count * step_ms, step_ms):
+            self.player.set_position(position_ms)
+
+    def test_timer_sends_one_position_per_tick(self):
+        # Тестируем, что позиция отправляется не чаще одного раза за тик таймера
+        self.assertEqual(PositionDispatcher(self.player).interval_ms(), DEFAULT_POSITION_INTERVAL_MS)
+        self.player.set_state(PlaybackState.PlayingState)
+        self.assertTrue(self.timer.isActive())
+        self.assertEqual(self.timer.interval(), 50)
+
+        # Player ticks between timer ticks are not passed on; each tick sends the latest position.
+        self._advance(0, 5)
+        self.assertEqual(self.positions, [])
+        self.timer.timeout.emit()
+        self.assertEqual(self.positions, [40])
+        self._advance(50, 5)
+        self.timer.timeout.emit()
+        self.assertEqual(self.positions, [40, 90])
+
+        # A tick without movement sends nothing.
+        self.timer.timeout.emit()
+        self.assertEqual(self.positions, [40, 90])
+
+        self.dispatcher.set_interval_ms(0)
+        self.assertEqual(self.dispatcher.interval_ms(), 1)
+
+    def test_seek_while_paused_is_sent_at_once(self):
+        self.player.set_state(PlaybackState.PlayingState)
+        self.player.set_position(1000)
+        self.player.set_state(PlaybackState.PausedState)
+        self.assertFalse(self.timer.isActive())
+        self.assertEqual(self.positions, [1000])
+
+        self.player.set_position(5000)
+        self.assertEqual(self.positions, [1000, 5000])
+
+    def test_nothing_is_sent_while_hidden(self):
+        self.player.set_state(PlaybackState.PlayingState)
+        self.dispatcher.set_visible(False)
+        self.assertFalse(self.timer.isActive())
+
+        self._advance(0, 5)
+        self.timer.timeout.emit()
+        self.player.set_state(PlaybackState.PausedState)
+        self.player.set_position(3000)
+        self.player.set_state(PlaybackState.PlayingState)
+        self.assertFalse(self.timer.isActive())
+        self.assertEqual(self.positions, [])
+
+        # Shown again: the latest position is sent once and the timer resumes.
+        self.dispatcher.set_visible(True)
+        self.assertEqual(self.positions, [3000])
+        self.assertTrue(self.timer.isActive())
+        self.timer.timeout.emit()
+        self.assertEqual(self.positions, [3000])
+
+if __name__ == '__main__':
+    unittest.main()
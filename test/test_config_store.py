@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from core.config_store import ConfigStore
+from core.json_sections import StreamedArray
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestConfigStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, "library_config.json")
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump({"ui_settings": {"lyrics_font_size": 16}, "tracks_cache": [{"file_path": "/a.mp3"}]}, f, indent=4)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _read(self):
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_sections_are_written_in_one_flush(self):
+        # Тестируем общее хранилище настроек: одна запись на несколько изменений
+        store = ConfigStore(self.config_path, write_delay_ms=None)
+        self.assertEqual(store.get("ui_settings"), {"lyrics_font_size": 16})
+        self.assertFalse(store.flush())
+        store.set("ui_settings", {"lyrics_font_size": 20})
+        store.set("playlists_data", [])
+        self.assertTrue(store.flush())
+        self.assertFalse(store.is_dirty())
+        self.assertEqual(self._read(), {"ui_settings": {"lyrics_font_size": 20},
+                                        "tracks_cache": [{"file_path": "/a.mp3"}], "playlists_data": []})
+
+    def test_clean_writer_sections_are_copied(self):
+        store = ConfigStore(self.config_path, write_delay_ms=None)
+        tracks = store.get("tracks_cache")
+        produced = []
+        def produce():
+            produced.append(True)
+            return StreamedArray(iter(tracks))
+        store.set_writer("tracks_cache", produce)
+
+        store.set("ui_settings", {})
+        store.flush()
+        tracks.append({"file_path": "/b.mp3"})
+        store.set("ui_settings", {"lyrics_font_size": 12})
+        store.flush()
+        self.assertEqual(produced, [])
+        self.assertEqual(self._read()["tracks_cache"], [{"file_path": "/a.mp3"}])
+
+        store.mark_dirty("tracks_cache")
+        store.flush()
+        self.assertEqual(produced, [True])
+        self.assertEqual(self._read()["tracks_cache"], [{"file_path": "/a.mp3"}, {"file_path": "/b.mp3"}])
+
+    def test_write_behind_timer_coalesces_changes(self):
+        store = ConfigStore(self.config_path, write_delay_ms=20)
+        store.set("ui_settings", {"lyrics_font_size": 1})
+        store.set("ui_settings", {"lyrics_font_size": 2})
+        self.assertEqual(self._read()["ui_settings"], {"lyrics_font_size": 16})
+        loop = QEventLoop()
+        QTimer.singleShot(200, loop.quit)
+        loop.exec()
+        self.assertFalse(store.is_dirty())
+        self.assertEqual(self._read()["ui_settings"], {"lyrics_font_size": 2})
+
+    def test_deferred_sections_wait_for_explicit_flush(self):
+        store = ConfigStore(self.config_path, write_delay_ms=20, deferred_write_delay_ms=None)
+        tracks = store.get("tracks_cache")
+        produced = []
+        store.set_writer("tracks_cache", lambda: (produced.append(True), StreamedArray(iter(tracks)))[1])
+        busy = [True]
+        store.add_flush_guard(lambda: busy[0])
+
+        tracks.append({"file_path": "/b.mp3"})
+        store.mark_dirty("tracks_cache", deferred=True)
+        store.set("ui_settings", {"lyrics_font_size": 3})
+        loop = QEventLoop()
+        QTimer.singleShot(100, loop.quit)
+        loop.exec()
+        self.assertEqual(self._read()["ui_settings"], {"lyrics_font_size": 16}) # held back by the guard
+
+        busy[0] = False
+        loop = QEventLoop()
+        QTimer.singleShot(100, loop.quit)
+        loop.exec()
+        self.assertEqual(self._read()["ui_settings"], {"lyrics_font_size": 3})
+        self.assertEqual(produced, [])
+        self.assertEqual(self._read()["tracks_cache"], [{"file_path": "/a.mp3"}])
+        self.assertTrue(store.is_dirty("tracks_cache"))
+
+        self.assertTrue(store.flush())
+        self.assertEqual(produced, [True])
+        self.assertEqual(self._read()["tracks_cache"], [{"file_path": "/a.mp3"}, {"file_path": "/b.mp3"}])
+        self.assertFalse(store.is_dirty())
+
+    def test_corrupted_file_starts_empty(self):
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            f.write("{not json")
+        store = ConfigStore(self.config_path, write_delay_ms=None)
+        self.assertIsNone(store.get("ui_settings"))
+        store.set("ui_settings", {})
+        store.flush()
+        self.assertEqual(self._read(), {"ui_settings": {}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+import wave
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_audio import write_wav
+from core.decoder import open_pcm_stream, iter_pcm_frames, AudioDecodeError
+
+class TestPcmDecoder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.samples = np.random.default_rng(0).integers(-30000, 30000, size=(10000, 2)).astype(np.int16)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_wav_is_read_in_fixed_size_blocks(self):
+        # Тестируем потоковое чтение WAV блоками фиксированного размера
+        path = os.path.join(self.temp_dir.name, "a.wav")
+        write_wav(path, duration_s=len(self.samples) / 44100, samples=self.samples.reshape(-1))
+
+        with open_pcm_stream(path) as stream:
+            self.assertEqual((stream.sample_rate, stream.channels, stream.frame_count), (44100, 2, 10000))
+            blocks = list(stream.frames(4096))
+        self.assertEqual([len(block) for block in blocks], [4096, 4096, 1808])
+        self.assertTrue(np.array_equal(np.concatenate(blocks), self.samples))
+
+    def test_24_bit_wav(self):
+        path = os.path.join(self.temp_dir.name, "b.wav")
+        with wave.open(path, 'wb') as wav_file:
+            wav_file.setnchannels(2)
+            wav_file.setsampwidth(3)
+            wav_file.setframerate(48000)
+            wav_file.writeframes((self.samples.astype('<i4') << 8).view(np.uint8).reshape(-1, 4)[:, :3].tobytes())
+
+        decoded = np.concatenate(list(iter_pcm_frames(path, 1000)))
+        # 24-bit samples come back as int32 with a full scale of 2 ** 31
+        self.assertTrue(np.array_equal(decoded >> 16, self.samples))
+
+    def test_invalid_file_raises(self):
+        path = os.path.join(self.temp_dir.name, "broken.wav")
+        with open(path, 'wb') as f:
+            f.write(b"not a wav file at all")
+        with self.assertRaises(AudioDecodeError):
+            open_pcm_stream(path)
+
+if __name__ == '__main__':
+    unittest.main()
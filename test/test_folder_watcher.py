@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.synthetic_audio import write_flac, write_wav
+from core.config_store import ConfigStore
+from core.folder_watcher import LibraryFolderWatcher
+from core.library import MusicLibraryManager
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+def wait_for(signal, timeout_ms=5000):
+    received = []
+    loop = QEventLoop()
+    def on_signal(*args):
+        received.append(args)
+        loop.quit()
+    signal.connect(on_signal)
+    QTimer.singleShot(timeout_ms, loop.quit)
+    loop.exec()
+    signal.disconnect(on_signal)
+    return received
+
+class TestLibraryFolderWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.album_dir = os.path.join(self.root, "Album")
+        os.makedirs(self.album_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_polling_reports_new_and_vanished_directories(self):
+        # Тестируем резервный режим опроса каталогов
+        watcher = LibraryFolderWatcher(use_polling=True)
+        reported = []
+        watcher.directoriesChanged.connect(reported.append)
+        watcher.add_folder(self.root)
+        self.assertEqual(wait_for(watcher.folderWatched), [(self.root,)])
+        self.assertEqual(watcher.polled_directory_count(), 2)
+
+        new_dir = os.path.join(self.root, "New", "CD1")
+        os.makedirs(new_dir)
+        shutil.rmtree(self.album_dir)
+        watcher.poll()
+        watcher.flush()
+        self.assertEqual(reported, [sorted([self.root, self.album_dir, os.path.join(self.root, "New"), new_dir])])
+        self.assertEqual(watcher.watched_directory_count(), 3)
+
+        watcher.stop()
+        self.assertEqual(watcher.watched_directory_count(), 0)
+
+    def test_events_are_debounced(self):
+        watcher = LibraryFolderWatcher(debounce_ms=100)
+        watcher.add_folder(self.root)
+        wait_for(watcher.folderWatched)
+        for i in range(5):
+            open(os.path.join(self.album_dir, f"{i}.mp3"), 'wb').close()
+        received = wait_for(watcher.directoriesChanged)
+        self.assertEqual(received, [([self.album_dir],)])
+        watcher.stop()
+
+class TestLibraryLiveUpdates(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.music_dir = os.path.join(self.temp_dir.name, "music")
+        self.album_dir = os.path.join(self.music_dir, "Album")
+        os.makedirs(self.album_dir)
+        for i in range(3):
+            write_flac(os.path.join(self.album_dir, f"{i}.flac"), f"Song {i}", "Artist", "Album")
+        store = ConfigStore(os.path.join(self.temp_dir.name, "library_config.json"), write_delay_ms=None)
+        self.manager = MusicLibraryManager(config_store=store)
+        self.manager.add_library_folder(self.music_dir)
+        self.manager.scan_all_library_folders()
+
+    def tearDown(self):
+        self.manager.stop_watching_folders()
+        self.temp_dir.cleanup()
+
+    def test_apply_directory_changes_gives_precise_diff(self):
+        os.rename(os.path.join(self.album_dir, "0.flac"), os.path.join(self.album_dir, "zero.flac"))
+        os.remove(os.path.join(self.album_dir, "1.flac"))
+        write_wav(os.path.join(self.album_dir, "new.wav"), duration_s=0.1)
+        os.utime(os.path.join(self.album_dir, "new.wav"), (1, 1)) # written long ago, not still copying
+
+        self.manager.apply_directory_changes([self.album_dir])
+        self.assertTrue(self.manager.is_watch_scan_running())
+        received = wait_for(self.manager.watchScanFinished)
+        diff, cancelled = received[0]
+        self.assertFalse(cancelled)
+        self.assertEqual([track.file_path for track in diff.added], [os.path.join(self.album_dir, "new.wav")])
+        self.assertEqual(diff.removed, [os.path.join(self.album_dir, "1.flac")])
+        self.assertEqual(diff.renamed, [(os.path.join(self.album_dir, "0.flac"), os.path.join(self.album_dir, "zero.flac"))])
+        self.assertEqual(diff.updated, [])
+
+    def test_watcher_adds_dropped_album(self):
+        self.assertTrue(self.manager.start_watching_folders(debounce_ms=100, settle_ms=1000))
+        wait_for(self.manager._folder_watcher.folderWatched)
+        new_album = os.path.join(self.music_dir, "New Album")
+        os.makedirs(new_album)
+        write_flac(os.path.join(new_album, "a.flac"), "A", "Other Artist", "New Album")
+
+        # Too fresh to be complete: left out until it has not changed for settle_ms.
+        received = wait_for(self.manager.watchScanFinished)
+        self.assertEqual(received[0][0].added, [])
+        self.assertIsNone(self.manager.get_track_by_path(os.path.join(new_album, "a.flac")))
+
+        received = wait_for(self.manager.libraryUpdated)
+        self.assertEqual(len(received), 1)
+        diff = received[0][0]
+        self.assertEqual([track.title for track in diff.added], ["A"])
+        self.assertIsNotNone(self.manager.get_track_by_path(os.path.join(new_album, "a.flac")))
+
+        shutil.rmtree(new_album)
+        received = wait_for(self.manager.libraryUpdated)
+        self.assertEqual(received[0][0].removed, [os.path.join(new_album, "a.flac")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.config_store import ConfigStore
+from core.json_sections import StreamedArray, read_raw_sections, read_section_spans, write_json_sections
+from core.library import MusicLibraryManager, Track
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestJsonSections(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, "library_config.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_section_spans(self):
+        # Тестируем поиск границ секций верхнего уровня
+        text = '{ "a" : [1, {"x": "}"}] ,\n "b": "str", "c": {} }'
+        spans = read_section_spans(text)
+        self.assertEqual([text[start:end] for start, end in spans.values()], ['[1, {"x": "}"}]', '"str"', '{}'])
+        self.assertEqual(read_section_spans(" {} "), {})
+        with self.assertRaises(ValueError):
+            read_section_spans('{"a": 1 "b": 2}')
+
+    def test_write_streams_and_keeps_raw_sections(self):
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump({"ui_settings": {"volume": 70}, "tracks_cache": [1, 2]}, f, indent=4)
+        sections = read_raw_sections(self.config_path)
+        sections["tracks_cache"] = StreamedArray(({"n": i} for i in range(25)), chunk_size=10)
+        sections["empty"] = StreamedArray(iter(()))
+        write_json_sections(self.config_path, sections)
+
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data["ui_settings"], {"volume": 70})
+        self.assertEqual(data["tracks_cache"], [{"n": i} for i in range(25)])
+        self.assertEqual(data["empty"], [])
+        self.assertEqual(os.listdir(self.temp_dir.name), ["library_config.json"])
+
+class TestLibrarySave(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, "library_config.json")
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "library_folders": ["/music"],
+                "tracks_cache": [Track("/music/a.mp3", "A", "B", "C", 1000).to_dict()],
+                "playlists_data": [{"id": "p1", "name": "Mix", "track_paths": []}],
+            }, f, indent=4)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unchanged_library_is_not_rewritten(self):
+        store = ConfigStore(self.config_path, write_delay_ms=None)
+        manager = MusicLibraryManager(config_store=store)
+        mtime = os.stat(self.config_path).st_mtime_ns
+        manager.save_library_to_disk()
+        self.assertFalse(store.flush())
+        self.assertEqual(os.stat(self.config_path).st_mtime_ns, mtime)
+
+    def test_save_rewrites_changed_sections_only(self):
+        store = ConfigStore(self.config_path, write_delay_ms=None)
+        manager = MusicLibraryManager(config_store=store)
+        self.assertIsNotNone(manager.get_track_by_path("/music/a.mp3"))
+        self.assertTrue(manager.remove_track_by_path("/music/a.mp3"))
+        manager.save_library_to_disk()
+        self.assertTrue(store.flush())
+
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data["tracks_cache"], [])
+        self.assertEqual(data["library_folders"], ["/music"])
+        self.assertEqual(data["playlists_data"][0]["name"], "Mix")
+        self.assertEqual(data["track_analysis"], [])
+
+if __name__ == '__main__':
+    unittest.main()
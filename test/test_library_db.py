@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.analyzer import TrackAnalysis
+from core.library import Track
+from core import json_sections
+from core.library_db import LibraryDatabase, open_library_database
+
+class TestLibraryDatabase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.temp_dir.name, "library_config.json")
+        with open(self.json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "library_folders": ["/music"],
+                "tracks_cache": [
+                    {"file_path": "/music/a.mp3", "title": "A", "artist": "X", "album": "Y", "duration_ms": 1000},
+                    {"file_path": "/music/b.mp3", "title": "B", "artist": "X", "album": "Y", "duration_ms": 2000},
+                ],
+                "playlists_data": [{"id": "p1", "name": "Mix", "track_paths": ["/music/b.mp3", "/music/a.mp3"]}],
+                "ui_settings": {"lyrics_font_size": 20},
+            }, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_migration_from_json(self):
+        # Тестируем одноразовый перенос данных из JSON
+        database = open_library_database(self.json_path)
+        self.assertEqual(database.get_folders(), ["/music"])
+        self.assertEqual(database.count_tracks(), 2)
+        self.assertEqual(database.get_playlist_rows(), [("p1", "Mix", ["/music/b.mp3", "/music/a.mp3"])])
+
+        with open(self.json_path, 'r', encoding='utf-8') as f:
+            remaining = json.load(f)
+        self.assertEqual(remaining, {"ui_settings": {"lyrics_font_size": 20}})
+        self.assertTrue(os.path.exists(self.json_path + ".pre-sqlite.bak"))
+        database.close()
+
+        reopened = open_library_database(self.json_path)
+        self.assertEqual(reopened.count_tracks(), 2)
+        reopened.close()
+
+    def test_failed_strip_keeps_config(self):
+        with open(self.json_path, 'r', encoding='utf-8') as f:
+            original = f.read()
+        with mock.patch.object(json_sections.os, "replace", side_effect=OSError("disk full")):
+            database = open_library_database(self.json_path)
+        self.assertEqual(database.count_tracks(), 2)
+        with open(self.json_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(f.read(), original)
+        self.assertEqual([name for name in os.listdir(self.temp_dir.name) if name.endswith(".tmp")], [])
+        database.close()
+
+    def test_track_upsert_and_delete(self):
+        database = LibraryDatabase(os.path.join(self.temp_dir.name, "library.db"))
+        database.upsert_track(Track("/m/c.flac", "C", "Z", "W", 3000, 1.5, 10, 42))
+        self.assertEqual(database.get_track_row("/m/c.flac")["inode"], 42)
+        database.delete_track("/m/c.flac")
+        self.assertIsNone(database.get_track_row("/m/c.flac"))
+        database.close()
+
+    def test_analysis_is_dropped_with_its_track(self):
+        database = LibraryDatabase(os.path.join(self.temp_dir.name, "library.db"))
+        database.upsert_track(Track("/m/c.flac", "C", "Z", "W", 3000, 1.5, 10, 42))
+        database.upsert_analysis(TrackAnalysis("/m/c.flac", 1.5, 10, 42, 3.0, -12.0, -3.0, 900.0, 120.0, "A minor"))
+        self.assertEqual(database.get_analysis_row("/m/c.flac")["key"], "A minor")
+        self.assertEqual(database.get_analysis_fingerprints(), {"/m/c.flac": (1.5, 10, 42)})
+        database.delete_track("/m/c.flac")
+        self.assertIsNone(database.get_analysis_row("/m/c.flac"))
+        database.close()
+
+    def test_transaction_rolls_back_on_error(self):
+        database = LibraryDatabase(os.path.join(self.temp_dir.name, "library.db"))
+        with self.assertRaises(RuntimeError):
+            with database.transaction():
+                database.add_folder("/music")
+                raise RuntimeError("boom")
+        self.assertEqual(database.get_folders(), [])
+        database.close()
+
+    def test_playlist_tracks_keep_order(self):
+        database = LibraryDatabase(os.path.join(self.temp_dir.name, "library.db"))
+        database.upsert_playlist("p", "List")
+        for path in ("/1", "/2", "/3"):
+            database.append_playlist_track("p", path)
+        database.delete_playlist_track("p", "/2")
+        database.append_playlist_track("p", "/4")
+        self.assertEqual(database.get_playlist_rows(), [("p", "List", ["/1", "/3", "/4"])])
+        database.replace_playlist_tracks("p", ["/4", "/1"])
+        self.assertEqual(database.get_playlist_rows()[0][2], ["/4", "/1"])
+        database.append_playlist_tracks("p", ["/5", "/6"])
+        self.assertEqual(database.get_playlist_rows()[0][2], ["/4", "/1", "/5", "/6"])
+        database.delete_playlist("p")
+        self.assertEqual(database.get_playlist_rows(), [])
+        database.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import lyrics
+from core.lyrics import LyricsCache, LyricsTimeline, get_lyrics
+from core.library_db import LibraryDatabase
+
+LRC_TEXT = "[00:01.00]First line\n[00:02.50]Second line\n"
+
+class TestLyricsCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.audio_path = os.path.join(self.temp_dir.name, "song.flac")
+        self.lrc_path = os.path.join(self.temp_dir.name, "song.lrc")
+        with open(self.lrc_path, 'w', encoding='utf-8') as f:
+            f.write(LRC_TEXT)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_cached_lyrics_are_not_read_again(self):
+        # Тестируем кэш: повторный вызов не читает файл
+        cache = LyricsCache()
+        self.assertEqual(get_lyrics(self.audio_path, cache=cache), ([(1000, "First line"), (2500, "Second line")], True))
+        with mock.patch.object(lyrics, "_read_lyrics") as read_lyrics:
+            self.assertEqual(get_lyrics(self.audio_path, cache=cache)[0][1], (2500, "Second line"))
+            read_lyrics.assert_not_called()
+
+    def test_changed_lrc_invalidates_entry(self):
+        cache = LyricsCache()
+        get_lyrics(self.audio_path, cache=cache)
+        with open(self.lrc_path, 'w', encoding='utf-8') as f:
+            f.write("[00:03.00]Edited line with another length\n")
+        self.assertEqual(get_lyrics(self.audio_path, cache=cache)[0], [(3000, "Edited line with another length")])
+        os.remove(self.lrc_path)
+        self.assertEqual(get_lyrics(self.audio_path, cache=cache), ([], False))
+
+    def test_lru_eviction_and_database(self):
+        database = LibraryDatabase(os.path.join(self.temp_dir.name, "library.db"))
+        cache = LyricsCache(max_entries=2, database=database)
+        for name in ("a", "b", "c"):
+            cache.put(f"/m/{name}.mp3", None, [(0, name)], False)
+        self.assertEqual(len(cache), 2)
+
+        restarted = LyricsCache(database=database)
+        self.assertEqual(restarted.get("/m/a.mp3", None), ([(0, "a")], False))
+        self.assertIsNone(restarted.get("/m/a.mp3", (1, 2)))
+        database.close()
+
+class TestLyricsTimeline(unittest.TestCase):
+    def setUp(self):
+        self.lyrics = [(1000, "one"), (2000, "two"), (2000, "two again"), (4000, "three"), (9000, "four")]
+        self.timeline = LyricsTimeline(self.lyrics, context_lines=1)
+
+    def _linear_index(self, position_ms):
+        return max((i for i, (timestamp, _) in enumerate(self.lyrics) if timestamp <= position_ms), default=-1)
+
+    def test_seek_matches_linear_scan(self):
+        # Тестируем поиск строки: последовательное воспроизведение и перемотка
+        positions = list(range(0, 10000, 250)) + [9500, 0, 3999, 4000, 1500, 12000, 500]
+        for position_ms in positions:
+            self.timeline.seek(position_ms)
+            self.assertEqual(self.timeline.current_index, self._linear_index(position_ms), position_ms)
+
+    def test_render(self):
+        self.assertEqual(self.timeline.render(), "<span style='color:grey;'>one</span>")
+        self.assertTrue(self.timeline.seek(4500))
+        self.assertFalse(self.timeline.seek(4600))
+        self.assertEqual(self.timeline.render(), "<span style='color:grey;'>two again</span>\n<b>three</b>\n"
+                                                 "<span style='color:grey;'>four</span>")
+
+if __name__ == '__main__':
+    unittest.main()
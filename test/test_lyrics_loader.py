@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication
+
+from core.lyrics import LyricsCache
+from core.lyrics_loader import LyricsLoader
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestLyricsLoader(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name in ("first", "second"):
+            with open(os.path.join(self.temp_dir.name, name + ".lrc"), 'w', encoding='utf-8') as f:
+                f.write(f"[00:01.00]{name} line\n")
+            self.paths.append(os.path.join(self.temp_dir.name, name + ".flac"))
+        self.cache = LyricsCache()
+        self.loader = LyricsLoader(self.cache)
+        self.results = []
+        self.loader.lyricsReady.connect(self.results.append)
+
+    def tearDown(self):
+        self.loader.shutdown()
+        self.temp_dir.cleanup()
+
+    def _request_and_wait(self, *paths):
+        """Requests each path in turn and processes events until the loader has handled the last job."""
+        handled = []
+        # Connected after the loader's own slot, so this runs once the loader has handled the job.
+        self.loader._jobDone.connect(handled.append)
+        futures = [self.loader.request(path) for path in paths]
+        deadline = time.monotonic() + 5
+        while futures[-1] not in handled and time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.005)
+        self.loader._jobDone.disconnect(handled.append)
+        return futures[-1]
+
+    def test_only_current_track_is_shown(self):
+        # Тестируем фоновую загрузку: результат для старого трека отбрасывается
+        self._request_and_wait(self.paths[0], self.paths[1])
+        self.assertEqual([result.audio_path for result in self.results], [self.paths[1]])
+        self.assertEqual(self.results[0].lyrics, [(1000, "second line")])
+        self.assertIsNotNone(self.cache.get(self.paths[1], self.results[0].lrc_signature))
+
+    def test_cached_result_and_cancel(self):
+        self._request_and_wait(self.paths[0])
+        future = self._request_and_wait(self.paths[0])
+        self.assertTrue(future.result().from_cache)
+
+        self.loader.request(self.paths[1])
+        self.loader.cancel()
+        self._request_and_wait(self.paths[0])
+        self.assertEqual([result.audio_path for result in self.results], [self.paths[0]] * 3)
+
+if __name__ == '__main__':
+    unittest.main()
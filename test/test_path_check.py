@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from core.path_check import PathCheckService, find_missing_paths
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestPathCheck(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(50):
+            path = os.path.join(self.temp_dir.name, f"{i}.mp3")
+            if i % 10 != 3:
+                open(path, 'wb').close()
+            self.paths.append(path)
+        self.expected_missing = {path for i, path in enumerate(self.paths) if i % 10 == 3}
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_find_missing_paths_in_batches(self):
+        # Тестируем параллельную проверку существования файлов пачками
+        batches = []
+        missing = find_missing_paths(self.paths, max_workers=4, batch_size=8,
+                                     on_batch=lambda checked, batch_missing: batches.append(checked))
+        self.assertEqual(missing, self.expected_missing)
+        self.assertEqual([path for batch in batches for path in batch], self.paths)
+
+    def test_cancel_stops_early(self):
+        batches = []
+        find_missing_paths(self.paths, max_workers=2, batch_size=5,
+                           on_batch=lambda checked, batch_missing: batches.append(checked),
+                           should_cancel=lambda: len(batches) >= 2)
+        self.assertEqual(len(batches), 2)
+
+    def test_service_reports_missing_paths(self):
+        service = PathCheckService(max_workers=4)
+        missing = []
+        finished = []
+        service.batchChecked.connect(lambda checked, batch_missing: missing.extend(batch_missing))
+        service.checkFinished.connect(finished.append)
+        loop = QEventLoop()
+        service.checkFinished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        self.assertTrue(service.start(self.paths))
+        loop.exec()
+
+        self.assertEqual(finished, [False])
+        self.assertEqual(set(missing), self.expected_missing)
+        self.assertFalse(service.is_running())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import tempfile
+
+from PyQt6.QtCore import QCoreApplication
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.config_store import ConfigStore
+from core.library_db import LibraryDatabase
+from core.playlist import Playlist, PlaylistManager
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestPlaylist(unittest.TestCase):
+    def setUp(self):
+        self.playlist = Playlist("Mix")
+        self.playlist.add_tracks([f"/m/{i}.mp3" for i in range(6)])
+
+    def test_add_skips_duplicates(self):
+        # Тестируем добавление треков без повторов
+        added = self.playlist.add_tracks(["/m/1.mp3", "/m/new.mp3", "/m/new.mp3"])
+        self.assertEqual(added, ["/m/new.mp3"])
+        self.assertFalse(self.playlist.add_track("/m/0.mp3"))
+        self.assertEqual(len(self.playlist.track_paths), 7)
+        self.assertEqual(self.playlist.index_of("/m/new.mp3"), 6)
+
+    def test_index_follows_removals_and_moves(self):
+        self.assertEqual(self.playlist.remove_tracks(["/m/1.mp3", "/m/3.mp3"]), [1, 3])
+        self.assertNotIn("/m/1.mp3", self.playlist)
+        self.assertEqual(self.playlist.index_of("/m/4.mp3"), 2)
+
+        self.assertTrue(self.playlist.move_tracks([3], 0))
+        self.assertEqual(self.playlist.track_paths, ["/m/5.mp3", "/m/0.mp3", "/m/2.mp3", "/m/4.mp3"])
+        self.assertTrue(self.playlist.move_tracks([0, 1], 4))
+        self.assertEqual(self.playlist.track_paths, ["/m/2.mp3", "/m/4.mp3", "/m/5.mp3", "/m/0.mp3"])
+        self.assertFalse(self.playlist.move_tracks([1], 2))
+        for row, path in enumerate(self.playlist.track_paths):
+            self.assertEqual(self.playlist.index_of(path), row)
+        self.assertEqual(self.playlist.index_of("/m/1.mp3"), -1)
+
+class TestPlaylistManager(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database = LibraryDatabase(os.path.join(self.temp_dir.name, "library.db"))
+        store = ConfigStore(os.path.join(self.temp_dir.name, "library_config.json"), write_delay_ms=None)
+        self.manager = PlaylistManager(database=self.database, config_store=store)
+
+    def tearDown(self):
+        self.database.close()
+        self.temp_dir.cleanup()
+
+    def test_bulk_add_emits_once(self):
+        playlist = self.manager.create_playlist("Big")
+        changes = []
+        self.manager.playlistTracksChanged.connect(changes.append)
+        paths = [f"/m/{i}.mp3" for i in range(2000)]
+        self.assertEqual(self.manager.add_tracks_to_playlist(playlist.id, paths + paths[:10]), 2000)
+        self.assertEqual(changes, [playlist.id])
+        self.assertEqual(self.manager.add_tracks_to_playlist(playlist.id, paths[:10]), 0)
+        self.assertEqual(changes, [playlist.id])
+        self.assertEqual(self.database.get_playlist_rows()[0][2], paths)
+
+    def test_batch_emits_one_change_set(self):
+        playlist = self.manager.create_playlist("Mix")
+        self.manager.add_tracks_to_playlist(playlist.id, ["/m/0.mp3", "/m/1.mp3", "/m/2.mp3"])
+        change_sets = []
+        changes = []
+        self.manager.playlistChangeSetReady.connect(change_sets.append)
+        self.manager.playlistTracksChanged.connect(changes.append)
+        with self.manager.batch():
+            self.manager.add_tracks_to_playlist(playlist.id, ["/m/3.mp3"])
+            self.manager.remove_track_from_playlist(playlist.id, "/m/0.mp3")
+            self.manager.move_tracks_in_playlist(playlist.id, [2], 0)
+            self.assertEqual(changes, [])
+        self.assertEqual(changes, [playlist.id])
+        self.assertEqual(change_sets[0].operations, [("inserted", 3, ["/m/3.mp3"]), ("removed", [0]), ("moved", [2], 0)])
+        self.assertEqual(self.database.get_playlist_rows()[0][2], ["/m/3.mp3", "/m/1.mp3", "/m/2.mp3"])
+
+        self.manager.reorder_tracks_in_playlist(playlist.id, ["/m/1.mp3", "/m/2.mp3", "/m/3.mp3"])
+        self.assertTrue(change_sets[1].reset)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from benchmarks.synthetic_audio import build_library_tree
+from core.scanner import LibraryScanner, EXECUTOR_SERIAL
+from core.scan_service import LibraryScanService
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestLibraryScanService(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        build_library_tree(self.temp_dir.name, artists=3, albums_per_artist=2, tracks_per_album=5)
+        self.service = LibraryScanService()
+        self.chunks = []
+        self.finished = []
+        self.service.chunkReady.connect(self.chunks.append)
+        self.service.scanFinished.connect(self.finished.append)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run_until_finished(self):
+        loop = QEventLoop()
+        self.service.scanFinished.connect(loop.quit)
+        QTimer.singleShot(10000, loop.quit)
+        loop.exec()
+
+    def test_results_are_streamed_in_chunks(self):
+        # Тестируем фоновое сканирование: результаты приходят частями
+        scanner = LibraryScanner(EXECUTOR_SERIAL, batch_size=7)
+        self.assertTrue(self.service.start(scanner, [self.temp_dir.name], {}))
+        self.assertFalse(self.service.start(scanner, [self.temp_dir.name], {}))
+        self._run_until_finished()
+
+        self.assertEqual(self.finished, [False])
+        self.assertEqual(sum(len(chunk) for chunk in self.chunks), 30)
+        self.assertGreater(len(self.chunks), 1)
+        self.assertFalse(self.service.is_running())
+
+    def test_cancel_stops_the_worker(self):
+        scanner = LibraryScanner(EXECUTOR_SERIAL, batch_size=1)
+        self.service.start(scanner, [self.temp_dir.name], {})
+        self.service.cancel()
+        self._run_until_finished()
+
+        self.assertEqual(self.finished, [True])
+        self.assertLess(sum(len(chunk) for chunk in self.chunks), 30)
+
+if __name__ == '__main__':
+    unittest.main()
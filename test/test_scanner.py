@@ -0,0 +1,156 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_audio import write_flac, write_wav
+from core.scanner import (
+    LibraryScanner, iter_audio_files, iter_audio_entries, read_track_metadata, plan_incremental_scan,
+    plan_directory_changes, EXECUTOR_SERIAL, EXECUTOR_THREAD, EXECUTOR_PROCESS
+)
+
+class TestLibraryScanner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        album_dir = os.path.join(self.root, "Artist", "Album")
+        os.makedirs(album_dir)
+        for i in range(5):
+            write_flac(os.path.join(album_dir, f"{i}.flac"), f"Song {i}", "Artist", "Album", duration_s=60)
+        write_wav(os.path.join(self.root, "loose.wav"), duration_s=0.5)
+        with open(os.path.join(album_dir, "cover.jpg"), 'wb') as f:
+            f.write(b"not audio")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_iter_audio_files_skips_unsupported(self):
+        # Тестируем обход папок: только аудиофайлы
+        paths = list(iter_audio_files(self.root))
+        self.assertEqual(len(paths), 6)
+        self.assertFalse(any(p.endswith(".jpg") for p in paths))
+
+    def test_read_track_metadata(self):
+        metadata = read_track_metadata(os.path.join(self.root, "Artist", "Album", "2.flac"))
+        self.assertEqual(metadata["title"], "Song 2")
+        self.assertEqual(metadata["artist"], "Artist")
+        self.assertEqual(metadata["duration_ms"], 60000)
+
+        wav_metadata = read_track_metadata(os.path.join(self.root, "loose.wav"))
+        self.assertEqual(wav_metadata["title"], "loose")
+        self.assertEqual(wav_metadata["artist"], "Unknown Artist")
+
+    def test_pooled_scan_matches_serial(self):
+        # Тестируем, что пул потоков даёт тот же результат, что и последовательный обход
+        serial, pooled = [], []
+        LibraryScanner(EXECUTOR_SERIAL).scan([self.root], on_batch=serial.extend)
+        LibraryScanner(EXECUTOR_THREAD, max_workers=4, batch_size=2).scan([self.root], on_batch=pooled.extend)
+        self.assertEqual(sorted(d["file_path"] for d in serial), sorted(d["file_path"] for d in pooled))
+
+    def test_process_pool_scan_matches_serial(self):
+        serial, pooled = [], []
+        LibraryScanner(EXECUTOR_SERIAL).scan([self.root], on_batch=serial.extend)
+        LibraryScanner(EXECUTOR_PROCESS, max_workers=2, batch_size=2).scan([self.root], on_batch=pooled.extend)
+        self.assertEqual(sorted(serial, key=lambda d: d["file_path"]), sorted(pooled, key=lambda d: d["file_path"]))
+
+    def test_scan_skips_known_paths_and_reports_progress(self):
+        known = {os.path.join(self.root, "loose.wav")}
+        batches, progress = [], []
+        files_done = LibraryScanner(EXECUTOR_THREAD, batch_size=2).scan(
+            [self.root], skip_paths=known, on_batch=batches.append,
+            on_progress=lambda done, path, rate: progress.append(done))
+        self.assertEqual(files_done, 5)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(sum(len(b) for b in batches), 5)
+
+    def test_scan_can_be_cancelled(self):
+        parsed = []
+        files_done = LibraryScanner(EXECUTOR_SERIAL, batch_size=1).scan(
+            [self.root], on_batch=parsed.extend, should_cancel=lambda: len(parsed) >= 2)
+        self.assertEqual(files_done, 2)
+
+class TestIncrementalScanPlan(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for i in range(4):
+            write_flac(os.path.join(self.root, f"{i}.flac"), f"Song {i}", "Artist", "Album")
+        self.known = dict(iter_audio_entries(self.root))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unchanged_library_needs_no_parsing(self):
+        plan = plan_incremental_scan([self.root], self.known)
+        self.assertEqual(plan.to_parse, [])
+        self.assertEqual(plan.unchanged, 4)
+
+    def test_modified_new_and_deleted_files(self):
+        # Тестируем обнаружение изменённых, новых и удалённых файлов
+        modified = os.path.join(self.root, "1.flac")
+        write_flac(modified, "Song 1 (edit)", "Artist", "Album", duration_s=200)
+        os.utime(modified, (1, 1))
+        os.remove(os.path.join(self.root, "2.flac"))
+        write_wav(os.path.join(self.root, "new.wav"), duration_s=0.1)
+
+        plan = plan_incremental_scan([self.root], self.known)
+        self.assertEqual(sorted(os.path.basename(p) for p, _ in plan.to_parse), ["1.flac", "new.wav"])
+        self.assertEqual(plan.removed, [os.path.join(self.root, "2.flac")])
+
+    def test_rename_detected_by_inode(self):
+        old_path = os.path.join(self.root, "3.flac")
+        new_path = os.path.join(self.root, "renamed.flac")
+        os.rename(old_path, new_path)
+
+        plan = plan_incremental_scan([self.root], self.known)
+        self.assertEqual([(old, new) for old, new, _ in plan.renamed], [(old_path, new_path)])
+        self.assertEqual(plan.to_parse, [])
+        self.assertEqual(plan.removed, [])
+
+    def test_tracks_outside_scanned_folders_are_kept(self):
+        known = dict(self.known)
+        known["/elsewhere/song.mp3"] = (1.0, 10, 0)
+        plan = plan_incremental_scan([self.root], known)
+        self.assertEqual(plan.removed, [])
+
+    def test_vanished_files_sharing_an_inode_are_all_removed(self):
+        known = {
+            os.path.join(self.root, "gone_a.mp3"): (1.0, 10, 42),
+            os.path.join(self.root, "gone_b.mp3"): (2.0, 20, 42),
+            os.path.join(self.root, "gone_c.mp3"): (2.0, 20, 42),
+        }
+        plan = plan_incremental_scan([self.root], known)
+        self.assertEqual(sorted(plan.removed), sorted(known))
+        self.assertEqual(plan.renamed, [])
+
+    def test_directory_plan_lists_only_given_directories(self):
+        sub_dir = os.path.join(self.root, "sub")
+        os.makedirs(sub_dir)
+        write_wav(os.path.join(sub_dir, "deep.wav"), duration_s=0.1)
+        write_wav(os.path.join(self.root, "new.wav"), duration_s=0.1)
+        known = dict(self.known)
+        known["/gone/song.mp3"] = (1.0, 10, 0)
+
+        plan = plan_directory_changes([self.root, "/gone"], known)
+        self.assertEqual([os.path.basename(p) for p, _ in plan.to_parse], ["new.wav"])
+        self.assertEqual(plan.removed, ["/gone/song.mp3"])
+        self.assertEqual(plan.unchanged, 4)
+
+    def test_directory_plan_holds_back_files_being_written(self):
+        new_path = os.path.join(self.root, "copying.wav")
+        write_wav(new_path, duration_s=0.1)
+        plan = plan_directory_changes([self.root], self.known, settle_seconds=60)
+        self.assertEqual(plan.to_parse, [])
+        self.assertEqual(list(plan.unsettled), [new_path])
+
+        os.utime(new_path, (1, 1)) # copy finished long ago...
+        plan = plan_directory_changes([self.root], self.known, settle_seconds=60, previous_unsettled=plan.unsettled)
+        self.assertEqual(list(plan.unsettled), [new_path]) # ...but it changed since the last check
+        plan = plan_directory_changes([self.root], self.known, settle_seconds=60, previous_unsettled=plan.unsettled)
+        self.assertEqual([p for p, _ in plan.to_parse], [new_path])
+        self.assertEqual(plan.unsettled, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+
+from core.library import Track
+from core.search_index import TrackSearchIndex
+from ui.search_controller import TrackSearchController
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class _IndexLibrary:
+    """Just the search part of MusicLibraryManager, with a log of the searches that ran."""
+    def __init__(self, tracks):
+        self.index = TrackSearchIndex()
+        self.index.rebuild(tracks)
+        self.searches = []
+
+    def search_tracks(self, query, fuzzy=False, within=None):
+        self.searches.append((query, fuzzy, within is not None))
+        return self.index.search(query, fuzzy=fuzzy, within=within)
+
+    def is_search_refinement(self, old_query, new_query):
+        return self.index.is_refinement(old_query, new_query)
+
+class TestTrackSearchController(unittest.TestCase):
+    def setUp(self):
+        self.library = _IndexLibrary([
+            Track("/m/1.mp3", "Radio Ga Ga", "Queen", "The Works"),
+            Track("/m/2.mp3", "Bohemian Rhapsody", "Queen", "A Night at the Opera"),
+            Track("/m/3.mp3", "Yesterday", "The Beatles", "Help!"),
+        ])
+        self.controller = TrackSearchController(self.library, debounce_ms=20)
+        self.results = []
+        self.controller.resultsReady.connect(self.results.append)
+
+    def _wait_for_result(self):
+        loop = QEventLoop()
+        self.controller.resultsReady.connect(loop.quit)
+        QTimer.singleShot(2000, loop.quit)
+        loop.exec()
+
+    def test_typing_runs_one_search(self):
+        # Тестируем debounce: при наборе выполняется только последний запрос
+        for prefix in ("q", "qu", "que", "quee", "queen"):
+            self.controller.set_query(prefix)
+        self._wait_for_result()
+        self.assertEqual(self.library.searches, [("queen", False, False)])
+        self.assertEqual(self.results, [{"/m/1.mp3", "/m/2.mp3"}])
+
+    def test_extended_query_refines_previous_result(self):
+        self.controller.set_query("queen")
+        self._wait_for_result()
+        self.controller.set_query("queen bo")
+        self._wait_for_result()
+        self.assertEqual(self.library.searches[-1], ("queen bo", False, True))
+        self.assertEqual(self.results[-1], {"/m/2.mp3"})
+
+        self.controller.set_query("yesterday")
+        self._wait_for_result()
+        self.assertEqual(self.library.searches[-1], ("yesterday", False, False))
+
+    def test_fuzzy_fallback_and_refresh(self):
+        self.controller.set_query("beatels")
+        self.controller.refresh()
+        self.assertEqual(self.library.searches, [("beatels", False, False), ("beatels", True, False)])
+        self.assertEqual(self.results, [{"/m/3.mp3"}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.library import Track
+from core.search_index import TrackSearchIndex, tokenize
+
+class TestTrackSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = TrackSearchIndex()
+        self.index.rebuild([
+            Track("/m/1.mp3", "Yesterday", "The Beatles", "Help!", genre="Pop"),
+            Track("/m/2.mp3", "Bohemian Rhapsody", "Queen", "A Night at the Opera", genre="Rock"),
+            Track("/m/3.mp3", "Back in Black", "AC/DC", "Back in Black", genre="Hard Rock"),
+        ])
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("AC/DC - Back in Black"), ["ac", "dc", "back", "in", "black"])
+
+    def test_prefix_and_multi_term_queries(self):
+        # Тестируем поиск по префиксам и нескольким словам (AND)
+        self.assertEqual(self.index.search("bo"), {"/m/2.mp3"})
+        self.assertEqual(self.index.search("ROCK"), {"/m/2.mp3", "/m/3.mp3"})
+        self.assertEqual(self.index.search("rock back"), {"/m/3.mp3"})
+        self.assertEqual(self.index.search("rock yesterday"), set())
+        self.assertIsNone(self.index.search("   "))
+
+    def test_field_qualified_query(self):
+        self.assertEqual(self.index.search("the"), {"/m/1.mp3", "/m/2.mp3"})
+        self.assertEqual(self.index.search("artist:the"), {"/m/1.mp3"})
+        self.assertEqual(self.index.search("genre:rock album:night"), {"/m/2.mp3"})
+
+    def test_fuzzy_matching(self):
+        self.assertEqual(self.index.search("beatels"), set())
+        self.assertEqual(self.index.search("beatels", fuzzy=True), {"/m/1.mp3"})
+        self.assertEqual(self.index.search("qeen", fuzzy=True), {"/m/2.mp3"})
+
+    def test_refinement(self):
+        self.assertTrue(self.index.is_refinement("ro", "rock ba"))
+        self.assertFalse(self.index.is_refinement("rock", "ro"))
+        self.assertFalse(self.index.is_refinement("artist", "artist:q"))
+        previous = self.index.search("rock")
+        self.assertEqual(self.index.search("rock bac", within=previous), {"/m/3.mp3"})
+
+    def test_incremental_updates(self):
+        old_result = self.index.search("queen")
+        self.assertEqual(len(old_result), 1)
+        self.index.remove("/m/2.mp3")
+        self.index.add(Track("/m/4.mp3", "Radio Ga Ga", "Queen", "The Works"))
+        self.assertEqual(self.index.search("queen"), {"/m/4.mp3"})
+        self.assertEqual(self.index.search("bohemian"), set())
+        self.assertEqual(old_result, set())
+        self.assertEqual(len(old_result), 0)
+        self.assertFalse(old_result)
+        self.assertNotIn("/m/4.mp3", old_result)
+        self.assertEqual(len(self.index), 3)
+
+        self.index.rebuild([Track("/m/4.mp3", "Radio Ga Ga", "Queen", "The Works")])
+        self.index.remove("/m/4.mp3")
+        self.assertEqual(len(old_result), 0) # results of the old index keep their own count
+
+if __name__ == '__main__':
+    unittest.main()
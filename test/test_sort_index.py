@@ -0,0 +1,44 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.library import Track
+from core.sort_index import SortedTrackIndex, SORT_BY_ARTIST, SORT_BY_TITLE, SORT_BY_DURATION
+
+class TestSortedTrackIndex(unittest.TestCase):
+    def setUp(self):
+        self.tracks = [
+            Track("/m/1.mp3", "Yesterday", "The Beatles", "Help!", 125000),
+            Track("/m/2.mp3", "Bohemian Rhapsody", "queen", "A Night at the Opera", 354000),
+            Track("/m/3.mp3", "Angie", "The Rolling Stones", "Goats Head Soup", 272000),
+        ]
+        self.index = SortedTrackIndex(SORT_BY_ARTIST)
+        self.index.rebuild(self.tracks)
+
+    def test_orders(self):
+        # Тестируем сортировку без учёта регистра
+        self.assertEqual(self.index.paths(), ["/m/2.mp3", "/m/1.mp3", "/m/3.mp3"])
+        self.assertTrue(self.index.set_order(SORT_BY_TITLE, self.tracks))
+        self.assertFalse(self.index.set_order(SORT_BY_TITLE, self.tracks))
+        self.assertEqual(self.index.paths(), ["/m/3.mp3", "/m/2.mp3", "/m/1.mp3"])
+        self.index.set_order(SORT_BY_DURATION, self.tracks)
+        self.assertEqual(self.index.paths(), ["/m/1.mp3", "/m/3.mp3", "/m/2.mp3"])
+        with self.assertRaises(ValueError):
+            self.index.set_order("rating", self.tracks)
+
+    def test_add_and_remove_keep_order(self):
+        self.index.add(Track("/m/4.mp3", "Help!", "The Beatles", "Help!"))
+        self.index.add(Track("/m/0.mp3", "Aardvark", "ABBA", "Arrival"))
+        self.assertTrue(self.index.remove("/m/2.mp3"))
+        self.assertFalse(self.index.remove("/m/2.mp3"))
+        self.assertEqual(self.index.paths(), ["/m/0.mp3", "/m/4.mp3", "/m/1.mp3", "/m/3.mp3"])
+        self.index.add(Track("/m/4.mp3", "Zebra", "Zed", "Z"))
+        self.assertEqual(self.index.paths()[-1], "/m/4.mp3")
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.position("/m/4.mp3"), 3)
+        self.assertIsNone(self.index.position("/m/2.mp3"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import TIT2, TPE1, TCON, USLT, SYLT, APIC
+from mutagen.wave import WAVE
+
+from benchmarks.synthetic_audio import write_wav, write_flac
+from core import tags
+from core.lyrics import get_lyrics
+from core.scanner import read_track_metadata
+
+FAKE_JPEG = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 4
+
+class TestReadTags(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        tags.clear_tag_cache()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _tagged_wav(self):
+        path = os.path.join(self.temp_dir.name, "song.wav")
+        write_wav(path, duration_s=1.0)
+        audio = WAVE(path)
+        audio.add_tags()
+        audio.tags.add(TIT2(encoding=3, text="Song"))
+        audio.tags.add(TPE1(encoding=3, text="Singer"))
+        audio.tags.add(TCON(encoding=3, text="(17)"))
+        audio.tags.add(USLT(encoding=3, lang="eng", desc="", text="Plain lyrics"))
+        audio.tags.add(SYLT(encoding=3, lang="eng", format=2, type=1, text=[("Two", 2000), ("One", 1000)]))
+        audio.tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="", data=FAKE_JPEG))
+        audio.save()
+        return path
+
+    def test_id3_fields_lyrics_and_artwork(self):
+        # Тестируем чтение всех тегов за один проход
+        path = self._tagged_wav()
+        info = tags.read_tags(path)
+        self.assertEqual((info.title, info.artist, info.album, info.genre), ("Song", "Singer", "", "Rock"))
+        self.assertEqual(info.duration_ms, 1000)
+        self.assertEqual(info.lyrics, "Plain lyrics")
+        self.assertEqual(info.synced_lyrics, [(1000, "One"), (2000, "Two")])
+
+        artwork = info.artwork[0]
+        self.assertIsNone(artwork.offset) # only searched for on demand
+        tags.locate_artwork(path, info.artwork)
+        with open(path, 'rb') as f:
+            f.seek(artwork.offset)
+            self.assertEqual(f.read(artwork.length), FAKE_JPEG)
+        self.assertEqual(get_lyrics(path), ([(1000, "One"), (2000, "Two")], True))
+
+    def test_flac_picture_and_cache(self):
+        path = os.path.join(self.temp_dir.name, "song.flac")
+        write_flac(path, "Title", "Artist", "Album", 2.0)
+        audio = FLAC(path)
+        picture = Picture()
+        picture.mime, picture.type, picture.data = "image/png", 3, FAKE_JPEG
+        audio.add_picture(picture)
+        audio["genre"] = "Jazz"
+        audio.save()
+
+        metadata = read_track_metadata(path)
+        self.assertEqual((metadata["title"], metadata["genre"], metadata["duration_ms"]), ("Title", "Jazz", 2000))
+        with mock.patch.object(tags.mutagen, "File") as mutagen_file:
+            info = tags.read_tags(path)
+            mutagen_file.assert_not_called()
+        self.assertEqual(info.artwork[0].mime, "image/png")
+        self.assertIsNotNone(tags.locate_artwork(path, info.artwork)[0].offset)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtCore import QCoreApplication, Qt
+
+from core.library import Track
+from ui.track_table_model import TrackTableModel, TrackFilterProxyModel, COLUMN_TITLE, COLUMN_ALBUM, COLUMN_DURATION, format_duration
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TestTrackTableModel(unittest.TestCase):
+    def setUp(self):
+        self.model = TrackTableModel()
+        self.proxy = TrackFilterProxyModel()
+        self.proxy.setSourceModel(self.model)
+        self.model.set_tracks([
+            Track("/m/1.mp3", "Yesterday", "The Beatles", "Help!", 125000),
+            Track("/m/2.mp3", "Bohemian Rhapsody", "Queen", "A Night at the Opera", 354000),
+            Track("/m/3.mp3", "Angie", "The Rolling Stones", "Goats Head Soup", 272000),
+        ])
+
+    def test_columns(self):
+        self.assertEqual(self.model.rowCount(), 3)
+        self.assertEqual(self.model.index(1, COLUMN_TITLE).data(), "Bohemian Rhapsody")
+        self.assertEqual(self.model.index(1, COLUMN_DURATION).data(), "5:54")
+        self.assertEqual(format_duration(3723000), "1:02:03")
+
+    def test_filter_and_sort(self):
+        # Тестируем поиск и сортировку через прокси-модель
+        self.proxy.set_matching_paths({"/m/3.mp3", "/not/listed.mp3"})
+        self.assertEqual(self.proxy.rowCount(), 1)
+        self.proxy.set_matching_paths(None)
+        self.proxy.sort(COLUMN_DURATION, Qt.SortOrder.DescendingOrder)
+        self.assertEqual(self.model.file_path_at(self.proxy.source_row(0)), "/m/2.mp3")
+        self.proxy.sort(COLUMN_TITLE, Qt.SortOrder.AscendingOrder)
+        self.assertEqual(self.proxy.index(0, COLUMN_TITLE).data(), "Angie")
+
+    def test_search_keeps_matching_missing_rows(self):
+        tracks = {"/m/1.mp3": Track("/m/1.mp3", "A", "B", "C", 0)}
+        self.model.set_playlist_rows(["/m/1.mp3", "/gone.mp3", "/lost.mp3"], tracks.get)
+        self.proxy.set_matching_paths(set(), "gon")
+        self.assertEqual([self.model.file_path_at(self.proxy.source_row(row)) for row in range(self.proxy.rowCount())],
+                         ["/gone.mp3"])
+        self.proxy.set_matching_paths(set(), "title:lost")
+        self.assertEqual(self.proxy.rowCount(), 1)
+        self.proxy.set_matching_paths(set(), "artist:gone")
+        self.assertEqual(self.proxy.rowCount(), 0)
+
+    def test_playlist_rows_and_reorder(self):
+        tracks = {"/m/1.mp3": Track("/m/1.mp3", "A", "B", "C", 0)}
+        self.model.set_playlist_rows(["/m/1.mp3", "/gone.mp3"], tracks.get)
+        self.assertEqual(self.model.index(1, COLUMN_TITLE).data(), "[Missing Track] gone.mp3")
+
+        self.model.set_reorderable(True)
+        reordered = []
+        self.model.rowsReordered.connect(lambda rows, target_row: reordered.append((rows, target_row)))
+        mime_data = self.model.mimeData([self.model.index(1, 0)])
+        self.model.dropMimeData(mime_data, Qt.DropAction.MoveAction, 0, 0, self.model.index(-1, -1))
+        self.assertEqual(self.model.file_paths(), ["/gone.mp3", "/m/1.mp3"])
+        self.assertEqual(reordered, [([1], 0)])
+
+    def test_apply_playlist_changes(self):
+        tracks = {f"/m/{i}.mp3": Track(f"/m/{i}.mp3", f"T{i}", "A", "B", 0) for i in range(6)}
+        self.model.set_playlist_rows(["/m/0.mp3", "/m/1.mp3", "/m/2.mp3"], tracks.get)
+        resets = []
+        self.model.modelReset.connect(lambda: resets.append(True))
+        self.model.apply_playlist_changes([
+            ("inserted", 3, ["/m/3.mp3", "/m/4.mp3"]),
+            ("removed", [0, 2]),
+            ("moved", [2], 0),
+            ("inserted", 1, ["/m/5.mp3"]),
+        ], tracks.get)
+        self.assertEqual(self.model.file_paths(), ["/m/4.mp3", "/m/5.mp3", "/m/1.mp3", "/m/3.mp3"])
+        self.assertEqual(self.model.index(1, COLUMN_TITLE).data(), "T5")
+        self.assertEqual(resets, [])
+
+    def test_update_tracks_without_reset(self):
+        tracks = {f"/m/{i}.mp3": Track(f"/m/{i}.mp3", f"T{i}", "A", "B", 0) for i in range(6)}
+        self.model.set_tracks([tracks[f"/m/{i}.mp3"] for i in (0, 2, 4)])
+        resets, inserts = [], []
+        self.model.modelReset.connect(lambda: resets.append(True))
+        self.model.rowsInserted.connect(lambda parent, first, last: inserts.append((first, last)))
+
+        final_order = ["/m/0.mp3", "/m/1.mp3", "/m/3.mp3", "/m/5.mp3", "/m/4.mp3"]
+        tracks["/m/4.mp3"] = Track("/m/4.mp3", "T9", "A", "B", 0) # re-tagged, moves to the end
+        self.model.update_tracks({"/m/1.mp3": tracks["/m/1.mp3"], "/m/2.mp3": None, "/m/3.mp3": tracks["/m/3.mp3"],
+                                  "/m/4.mp3": tracks["/m/4.mp3"], "/m/5.mp3": tracks["/m/5.mp3"],
+                                  "/m/0.mp3": tracks["/m/0.mp3"]}, final_order.index)
+        self.assertEqual(self.model.file_paths(), final_order)
+        self.assertEqual(self.model.index(4, COLUMN_TITLE).data(), "T9")
+        self.assertEqual(inserts, [(1, 4)])
+        self.assertEqual(resets, [])
+
+    def test_set_missing_paths(self):
+        tracks = [Track(f"/m/{i}.mp3", f"T{i}", "A", "B", 0) for i in range(3)]
+        self.model.set_tracks(tracks)
+        self.model.set_missing_paths({"/m/1.mp3"})
+        self.assertIsNotNone(self.model.index(1, COLUMN_TITLE).data(Qt.ItemDataRole.ForegroundRole))
+        self.assertIsNone(self.model.index(0, COLUMN_TITLE).data(Qt.ItemDataRole.ForegroundRole))
+        self.model.set_missing_paths({"/m/1.mp3"}, False)
+        self.assertIsNone(self.model.index(1, COLUMN_TITLE).data(Qt.ItemDataRole.ForegroundRole))
+
+    def test_artwork_decoration(self):
+        requested = []
+        self.model.set_artwork_provider(lambda path, album: requested.append((path, album)) or "cover")
+        changed = []
+        self.model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), last.row(), roles)))
+        self.assertEqual(self.model.index(0, COLUMN_ALBUM).data(Qt.ItemDataRole.DecorationRole), "cover")
+        self.assertIsNone(self.model.index(0, COLUMN_TITLE).data(Qt.ItemDataRole.DecorationRole))
+        self.assertEqual(requested, [("/m/1.mp3", "Help!")])
+        self.model.refresh_artwork()
+        self.assertEqual(changed, [(0, 2, [Qt.ItemDataRole.DecorationRole])])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic_audio import write_wav, SAMPLE_RATE
+from core.decoder import open_pcm_stream
+from core.waveform import WaveformCache, Waveform, compute_stream_peaks, PEAKS_PER_SECOND
+
+class TestWaveform(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.audio_path = os.path.join(self.temp_dir.name, "tone.wav")
+        # Одна секунда тишины, затем одна секунда синуса с половинной амплитудой
+        t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+        tone = (np.sin(2 * np.pi * 440 * t) * 16384).astype(np.int16)
+        write_wav(self.audio_path, duration_s=2.0, channels=1,
+                  samples=np.concatenate([np.zeros(SAMPLE_RATE, dtype=np.int16), tone]))
+        self.cache = WaveformCache(os.path.join(self.temp_dir.name, "cache"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_peaks_follow_the_signal(self):
+        with open_pcm_stream(self.audio_path) as stream:
+            peaks = compute_stream_peaks(stream)
+
+        self.assertEqual(peaks.shape, (2 * PEAKS_PER_SECOND, 2))
+        self.assertTrue(np.all(peaks[:PEAKS_PER_SECOND] == 0))
+        self.assertTrue(np.all(np.abs(peaks[PEAKS_PER_SECOND:, 1] - 64) <= 1))
+        self.assertTrue(np.all(np.abs(peaks[PEAKS_PER_SECOND:, 0] + 64) <= 1))
+
+    def test_cached_peaks_are_memory_mapped(self):
+        # Тестируем кэш: второй запрос читает файл с диска без повторного декодирования
+        waveform = self.cache.get(self.audio_path)
+        self.assertEqual(waveform.duration_ms, 2000)
+        self.assertIsInstance(waveform.peaks, np.memmap)
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 1)
+
+        fingerprint = (1.0, 2, 3)
+        self.assertIsNone(self.cache.load(self.audio_path, fingerprint))
+        self.cache.store(self.audio_path, fingerprint, np.zeros((4, 2), dtype=np.int8))
+        self.assertEqual(len(self.cache.load(self.audio_path, fingerprint)), 4)
+
+    def test_new_fingerprint_replaces_entry_and_size_is_bounded(self):
+        self.cache.store(self.audio_path, (1.0, 2, 3), np.zeros((4, 2), dtype=np.int8))
+        self.cache.store(self.audio_path, (5.0, 6, 3), np.zeros((8, 2), dtype=np.int8)) # re-tagged
+        self.assertIsNone(self.cache.load(self.audio_path, (1.0, 2, 3)))
+        self.assertEqual(len(os.listdir(self.cache.cache_dir)), 1)
+
+        cache = WaveformCache(self.cache.cache_dir, max_bytes=1)
+        other_path = os.path.join(self.temp_dir.name, "other.wav")
+        cache.store(other_path, (1.0, 2, 3), np.zeros((4, 2), dtype=np.int8))
+        self.assertIsNone(cache.load(self.audio_path, (5.0, 6, 3))) # least recently used, evicted
+        self.assertIsNotNone(cache.load(other_path, (1.0, 2, 3)))
+        self.assertEqual(len(os.listdir(cache.cache_dir)), 1)
+
+    def test_columns_reduce_to_view_width(self):
+        peaks = np.array([[-10, 10], [-100, 20], [-5, 127], [0, 0]], dtype=np.int8)
+        waveform = Waveform(peaks, peaks_per_second=4)
+
+        mins, maxs = waveform.columns(2)
+        self.assertTrue(np.allclose(mins, [-100 / 127, -5 / 127]))
+        self.assertTrue(np.allclose(maxs, [20 / 127, 1.0]))
+        self.assertEqual(len(waveform.columns(8)[0]), 8)
+        self.assertEqual(len(waveform.columns(10, start_ms=500)[0]), 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap
+
+from core.artwork import album_key
+from core.artwork_loader import ArtworkLoader
+
+DEFAULT_PIXMAP_CAPACITY = 64  # albums kept as pixmaps until the view reports how many rows it shows
+ARTWORK_REFRESH_DELAY_MS = 50 # thumbnails arriving within this window are repainted together
+
+
+class ArtworkPixmapCache(QObject):
+    """
+    GUI-thread side of the artwork pipeline: an LRU of album pixmaps sized for the rows on screen,
+    in front of an ArtworkLoader. pixmap() never blocks; a miss queues the album and returns None,
+    and artworkChanged is emitted (coalesced) once thumbnails have arrived.
+    """
+    artworkChanged = pyqtSignal()
+
+    def __init__(self, cache_dir, parent=None):
+        super().__init__(parent)
+        self._loader = ArtworkLoader(cache_dir, self)
+        self._loader.artworkReady.connect(self._on_artwork_ready)
+        self._pixmaps = OrderedDict() # album key -> QPixmap, or None for albums without artwork
+        self.capacity = DEFAULT_PIXMAP_CAPACITY
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.artworkChanged)
+
+    def set_visible_rows(self, row_count):
+        """Keeps twice the visible rows' worth of albums, so scrolling back by a page is free."""
+        self.capacity = max(DEFAULT_PIXMAP_CAPACITY // 4, row_count * 2)
+        self._evict()
+
+    def pixmap(self, file_path, album):
+        key = album_key(file_path, album)
+        if key in self._pixmaps:
+            self._pixmaps.move_to_end(key)
+            return self._pixmaps[key]
+        self._loader.request(file_path, album)
+        return None
+
+    def cancel_pending(self):
+        """Drops queued requests, e.g. when the view shows other tracks."""
+        self._loader.cancel_pending()
+
+    def shutdown(self):
+        self._refresh_timer.stop()
+        self._loader.shutdown()
+
+    def _on_artwork_ready(self, key, image):
+        self._pixmaps[key] = QPixmap.fromImage(image) if image is not None else None
+        self._pixmaps.move_to_end(key)
+        self._evict()
+        if image is not None and not self._refresh_timer.isActive():
+            self._refresh_timer.start(ARTWORK_REFRESH_DELAY_MS)
+
+    def _evict(self):
+        while len(self._pixmaps) > self.capacity:
+            self._pixmaps.popitem(last=False)
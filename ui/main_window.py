@@ -3,23 +3,41 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
     QPushButton, QFileDialog, QLabel, QSlider, QListWidget, QListWidgetItem,
     QAbstractItemView, QStyle, QMessageBox, QLineEdit, QProgressDialog, QDialog, QSpinBox, QPushButton,
-    QColorDialog, QInputDialog, QMenu
+    QColorDialog, QInputDialog, QMenu, QTableView, QHeaderView, QCheckBox
 )
 from PyQt6.QtMultimedia import QMediaPlayer
-from PyQt6.QtCore import QUrl, Qt, QStandardPaths, QTimer, QPoint, QModelIndex, QDir
+from PyQt6.QtCore import QUrl, Qt, QStandardPaths, QTimer, QPoint, QEvent, QSize
 from PyQt6.QtGui import QColor, QFont, QAction, QKeySequence
 import os
-import json
 
 
-from core.lyrics import get_lyrics
-from core.player import AudioPlayer
+from core.lyrics import LyricsCache, LyricsTimeline
+from core.lyrics_loader import LyricsLoader
+from core.waveform_loader import WaveformLoader
+from core.player import AudioPlayer, PositionDispatcher, DEFAULT_PRELOAD_LEAD_MS
 from core.library import MusicLibraryManager, Track 
 from core.playlist import PlaylistManager, Playlist 
-
-
-CONFIG_DIR_NAME = "MusicPlayerApp"
-CONFIG_FILE_NAME = "library_config.json" 
+from core.config_store import ConfigStore, CONFIG_DIR_NAME
+from core.library_db import open_library_database, STORAGE_BACKEND_KEY, STORAGE_BACKEND_JSON, STORAGE_BACKEND_SQLITE
+from core.sort_index import SORT_BY_ARTIST, SORT_BY_ALBUM, SORT_BY_TITLE, SORT_BY_DURATION
+from ui.artwork_pixmaps import ArtworkPixmapCache
+from ui.search_controller import TrackSearchController
+from ui.waveform_widget import WaveformView
+from ui.track_table_model import TrackTableModel, TrackFilterProxyModel, COLUMN_TITLE, COLUMN_ARTIST, COLUMN_ALBUM, COLUMN_DURATION
+
+
+WAVEFORM_CACHE_DIR_NAME = "waveforms"
+ARTWORK_CACHE_DIR_NAME = "artwork"
+TRACK_ROW_HEIGHT = 24
+PATH_CHECK_DELAY_MS = 2000 # give the first paint and initial list population a head start
+
+# Library view: clicking a column header asks the library for that order instead of sorting in the proxy.
+LIBRARY_SORT_ORDER_FOR_COLUMN = {
+    COLUMN_TITLE: SORT_BY_TITLE,
+    COLUMN_ARTIST: SORT_BY_ARTIST,
+    COLUMN_ALBUM: SORT_BY_ALBUM,
+    COLUMN_DURATION: SORT_BY_DURATION,
+}
 
 class TextSettingsDialog(QDialog):
     def __init__(self, current_font_size, current_text_color, parent=None):
@@ -68,6 +86,38 @@ class TextSettingsDialog(QDialog):
     def get_settings(self):
         return self.font_size_spinbox.value(), self.current_color
 
+class PlaybackSettingsDialog(QDialog):
+    def __init__(self, gapless_playback, preload_lead_ms, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Playback Settings")
+        layout = QVBoxLayout(self)
+
+        self.gapless_checkbox = QCheckBox("Gapless playlist playback")
+        self.gapless_checkbox.setChecked(gapless_playback)
+        layout.addWidget(self.gapless_checkbox)
+
+        lead_layout = QHBoxLayout()
+        lead_layout.addWidget(QLabel("Preload next track (seconds before end):"))
+        self.preload_lead_spinbox = QSpinBox()
+        self.preload_lead_spinbox.setRange(1, 60)
+        self.preload_lead_spinbox.setValue(max(1, preload_lead_ms // 1000))
+        self.preload_lead_spinbox.setEnabled(gapless_playback)
+        self.gapless_checkbox.toggled.connect(self.preload_lead_spinbox.setEnabled)
+        lead_layout.addWidget(self.preload_lead_spinbox)
+        layout.addLayout(lead_layout)
+
+        button_box = QHBoxLayout()
+        ok_button = QPushButton("OK")
+        ok_button.clicked.connect(self.accept)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(self.reject)
+        button_box.addWidget(ok_button)
+        button_box.addWidget(cancel_button)
+        layout.addLayout(button_box)
+
+    def get_settings(self):
+        return self.gapless_checkbox.isChecked(), self.preload_lead_spinbox.value() * 1000
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -77,12 +127,28 @@ class MainWindow(QMainWindow):
         
         self.lyrics_font_size = 16
         self.lyrics_text_color = QColor("black")
+        self.gapless_playback = True
+        self.preload_lead_ms = DEFAULT_PRELOAD_LEAD_MS
+        # library_config.json is parsed once here and written through this store by every component.
+        self.config_store = ConfigStore(parent=self)
         self._load_ui_settings() 
 
         
         self.player = AudioPlayer(self)
-        self.library_manager = MusicLibraryManager(self) 
-        self.playlist_manager = PlaylistManager(self) 
+        self.player.set_gapless_enabled(self.gapless_playback)
+        self.player.set_preload_lead_ms(self.preload_lead_ms)
+        self.position_dispatcher = PositionDispatcher(self.player, parent=self)
+        self.library_database = None
+        if self.config_store.get(STORAGE_BACKEND_KEY, STORAGE_BACKEND_JSON) == STORAGE_BACKEND_SQLITE:
+            self.library_database = open_library_database(self.config_store.config_path)
+            self.config_store.load() # a first-run migration strips the imported sections from the file
+        self.library_manager = MusicLibraryManager(self, database=self.library_database, config_store=self.config_store) 
+        self.playlist_manager = PlaylistManager(self, database=self.library_database, config_store=self.config_store) 
+        self.lyrics_cache = LyricsCache(database=self.library_database)
+        self.lyrics_loader = LyricsLoader(self.lyrics_cache, self)
+        self.lyrics_loader.lyricsReady.connect(self._show_loaded_lyrics)
+        self.waveform_loader = WaveformLoader(self._get_cache_dir(WAVEFORM_CACHE_DIR_NAME), self)
+        self.artwork_pixmaps = ArtworkPixmapCache(self._get_cache_dir(ARTWORK_CACHE_DIR_NAME), self)
 
         
         self.current_track_index_in_playlist = -1
@@ -93,26 +159,46 @@ class MainWindow(QMainWindow):
         
         self.player.mediaStatusChanged.connect(self.handle_media_status_changed)
         self.player.errorOccurred.connect(self.handle_player_error)
-        self.player.positionChanged.connect(self.update_lyrics_display)
+        self.position_dispatcher.positionUpdated.connect(self.update_position_display)
+        self.player.durationChanged.connect(self.waveform_view.set_duration)
+        self.waveform_view.seekRequested.connect(self.player.set_position)
+        self.waveform_loader.waveformReady.connect(self._show_loaded_waveform)
         self.player.metaDataChanged.connect(self.update_track_info_display)
+        self.player.trackAdvanced.connect(self._handle_track_advanced)
+        self.player.transitionMeasured.connect(self._log_transition_metrics)
 
         
-        self.library_manager.libraryUpdated.connect(self.handle_library_scan_finished)
+        self.library_manager.scanFinished.connect(self.handle_library_scan_finished)
         self.library_manager.libraryLoaded.connect(self.handle_library_loaded) 
-        self.library_manager.libraryUpdated.connect(self.update_library_display)
+        # Scan chunks and folder watcher batches alike: only the rows they touched are updated.
+        self.library_manager.libraryUpdated.connect(self._schedule_library_display_refresh)
         self.library_manager.scanProgress.connect(self.handle_scan_progress) 
+        self.library_manager.tracksAvailabilityChanged.connect(self._handle_tracks_availability_changed)
+        self._path_check_scheduled = False
 
         
         self.playlist_manager.playlistsChanged.connect(self.update_playlist_list_widget)
         self.playlist_manager.playlistsLoaded.connect(self.update_playlist_list_widget) 
+        self.playlist_manager.playlistChangeSetReady.connect(self._apply_playlist_change_set)
         self.playlist_manager.playlistTracksChanged.connect(self.handle_playlist_tracks_changed) 
+        self._table_has_playlist_change = False # set while the table itself made the change (drag and drop)
 
         self.progress_dialog = None 
+        self.analysis_progress_dialog = None
+        self.library_manager.analysisProgress.connect(self.handle_analysis_progress)
+        self.library_manager.analysisFinished.connect(self.handle_analysis_finished)
+
+        # Background scans stream results in chunks; the rows they touched are updated at most once per interval.
+        self._pending_library_paths = set()
+        self._library_refresh_timer = QTimer(self)
+        self._library_refresh_timer.setSingleShot(True)
+        self._library_refresh_timer.setInterval(500)
+        self._library_refresh_timer.timeout.connect(self._refresh_library_display_if_visible)
 
         self.show()
 
         self._current_lyrics = []
-        self._current_lyric_index = 0
+        self._lyrics_timeline = None # LyricsTimeline while synced lyrics are shown
         self.lyrics_are_synced = False 
         self.current_view_mode = "library" 
         self.current_playlist_id_selected = None
@@ -161,29 +247,56 @@ class MainWindow(QMainWindow):
         self.rescan_button = QPushButton("Rescan Library")
         self.rescan_button.clicked.connect(self.rescan_all_folders_in_library)
         folder_buttons_layout.addWidget(self.rescan_button)
+        self.analyze_button = QPushButton("Analyze Library")
+        self.analyze_button.clicked.connect(self.analyze_library_tracks)
+        folder_buttons_layout.addWidget(self.analyze_button)
         library_panel_layout.addLayout(folder_buttons_layout)
 
         self.track_search_input = QLineEdit() 
         self.track_search_input.setPlaceholderText("Search tracks...")
-        self.track_search_input.textChanged.connect(self.filter_track_list_display)
         library_panel_layout.addWidget(self.track_search_input)
 
-        self.track_list_widget = QListWidget() 
-        self.track_list_widget.itemDoubleClicked.connect(self.play_selected_from_track_list)
-        self.track_list_widget.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
-        self.track_list_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.track_list_widget.customContextMenuRequested.connect(self._show_track_list_context_menu)
+        self.track_table_model = TrackTableModel(self)
+        self.track_proxy_model = TrackFilterProxyModel(self)
+        self.track_proxy_model.setSourceModel(self.track_table_model)
+        self.search_controller = TrackSearchController(self.library_manager, self)
+        self.search_controller.resultsReady.connect(self._show_search_results)
+        self.track_search_input.textChanged.connect(self.search_controller.set_query)
+        self.library_manager.libraryUpdated.connect(self.search_controller.invalidate)
+        self.track_table_model.rowsReordered.connect(self._handle_track_reorder_in_playlist)
+        # Album covers are fetched in the background for the rows being painted.
+        self.track_table_model.set_artwork_provider(self.artwork_pixmaps.pixmap)
+        self.artwork_pixmaps.artworkChanged.connect(self.track_table_model.refresh_artwork)
+
+        self.track_table_view = QTableView()
+        self.track_table_view.setModel(self.track_proxy_model)
+        self.track_table_view.doubleClicked.connect(self.play_selected_from_track_list)
+        self.track_table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.track_table_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.track_table_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.track_table_view.customContextMenuRequested.connect(self._show_track_list_context_menu)
+        self.track_table_view.setShowGrid(False)
+        self.track_table_view.setWordWrap(False)
+        # Fixed row heights and column widths: the view never has to measure rows that are off screen.
+        self.track_table_view.verticalHeader().setVisible(False)
+        self.track_table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.track_table_view.verticalHeader().setDefaultSectionSize(TRACK_ROW_HEIGHT)
+        self.track_table_view.setIconSize(QSize(TRACK_ROW_HEIGHT - 4, TRACK_ROW_HEIGHT - 4))
+        header = self.track_table_view.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(COLUMN_TITLE, QHeaderView.ResizeMode.Stretch)
+        header.resizeSection(COLUMN_ARTIST, 150)
+        header.resizeSection(COLUMN_ALBUM, 150)
+        header.resizeSection(COLUMN_DURATION, 70)
+        header.setSectionsClickable(True)
+        header.sortIndicatorChanged.connect(self._handle_library_sort_changed)
         
-        
-        self.track_list_widget.setDragEnabled(True)
-        self.track_list_widget.setAcceptDrops(True)
-        self.track_list_widget.setDropIndicatorShown(True)
-        
-        self.track_list_widget.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
-        
-        self.track_list_widget.model().rowsMoved.connect(self._handle_track_reorder_in_playlist)
+        self.track_table_view.setDragDropOverwriteMode(False)
+        self.track_table_view.setDropIndicatorShown(True)
+        self._set_track_view_reorderable(False)
 
-        library_panel_layout.addWidget(self.track_list_widget)
+        library_panel_layout.addWidget(self.track_table_view)
 
         self.remove_tracks_button = QPushButton("Remove Selected Tracks") 
         self.remove_tracks_button.clicked.connect(self.remove_selected_tracks_from_current_view)
@@ -209,6 +322,9 @@ class MainWindow(QMainWindow):
         self.current_track_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         player_lyrics_layout.addWidget(self.current_track_label)
 
+        self.waveform_view = WaveformView()
+        player_lyrics_layout.addWidget(self.waveform_view)
+
         self.volume_slider = QSlider(Qt.Orientation.Horizontal)
         self.volume_slider.setRange(0, 100)
         self.volume_slider.setValue(self.player.get_volume()) 
@@ -223,15 +339,60 @@ class MainWindow(QMainWindow):
         self.text_settings_button.clicked.connect(self.open_text_settings_dialog)
         player_lyrics_layout.addWidget(self.text_settings_button)
 
+        self.playback_settings_button = QPushButton("Playback Settings")
+        self.playback_settings_button.clicked.connect(self.open_playback_settings_dialog)
+        player_lyrics_layout.addWidget(self.playback_settings_button)
+
         self.lyrics_label = QLabel("Lyrics will appear here...")
         self.lyrics_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self._apply_lyrics_style()
         player_lyrics_layout.addWidget(self.lyrics_label, 1)
         main_splitter_layout.addLayout(player_lyrics_layout, 2) 
 
+    def _set_track_view_reorderable(self, reorderable):
+        # Playlists keep their own order (drag to reorder); the library view sorts by column instead.
+        self.track_table_model.set_reorderable(reorderable)
+        header = self.track_table_view.horizontalHeader()
+        header.blockSignals(True)
+        if reorderable:
+            header.setSortIndicatorShown(False)
+            self.track_table_view.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        else:
+            self.track_table_view.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop)
+            # Section -1 shows the library's default artist/album/title order until a header is clicked.
+            header.setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+            header.setSortIndicatorShown(True)
+            self._library_sort = (SORT_BY_ARTIST, False)
+        header.blockSignals(False)
+
+    def _show_search_results(self, matching_paths):
+        self.track_proxy_model.set_matching_paths(matching_paths, self.search_controller.query())
+
+    def _handle_library_sort_changed(self, column, sort_order):
+        if self.current_view_mode != "library":
+            return
+        self._library_sort = (
+            LIBRARY_SORT_ORDER_FOR_COLUMN.get(column, SORT_BY_ARTIST),
+            sort_order == Qt.SortOrder.DescendingOrder
+        )
+        self._populate_library_list()
+
+    def _selected_source_rows(self):
+        selection_model = self.track_table_view.selectionModel()
+        if selection_model is None:
+            return []
+        return sorted(self.track_proxy_model.mapToSource(index).row() for index in selection_model.selectedRows())
+
+    def _selected_track_paths(self):
+        return [self.track_table_model.file_path_at(row) for row in self._selected_source_rows()]
+
+    def _select_source_row(self, source_row):
+        proxy_row = self.track_proxy_model.proxy_row(source_row)
+        if proxy_row >= 0:
+            self.track_table_view.selectRow(proxy_row)
+
     def _show_track_list_context_menu(self, position: QPoint):
-        selected_items = self.track_list_widget.selectedItems()
-        if not selected_items: 
+        if not self._selected_source_rows(): 
             return
 
         context_menu = QMenu(self)
@@ -249,11 +410,11 @@ class MainWindow(QMainWindow):
                 playlist_action.triggered.connect(lambda checked=False, p_id=pl.id: self._add_selected_tracks_to_playlist(p_id))
                 add_to_playlist_menu.addAction(playlist_action)
 
-        context_menu.exec(self.track_list_widget.mapToGlobal(position))
+        context_menu.exec(self.track_table_view.viewport().mapToGlobal(position))
 
     def _add_selected_tracks_to_playlist(self, playlist_id):
-        selected_items = self.track_list_widget.selectedItems()
-        if not selected_items:
+        selected_paths = self._selected_track_paths()
+        if not selected_paths:
             QMessageBox.information(self, "Information", "No tracks selected.")
             return
 
@@ -262,21 +423,37 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Error", "Selected playlist not found.")
             return
         
-        added_count = 0
-        for item in selected_items:
-            file_path = item.data(Qt.ItemDataRole.UserRole) 
-            if self.playlist_manager.add_track_to_playlist(playlist_id, file_path):
-                added_count += 1
+        added_count = self.playlist_manager.add_tracks_to_playlist(playlist_id, selected_paths)
         
         if added_count > 0:
             QMessageBox.information(self, "Success", f"{added_count} track(s) added to '{playlist.name}'.")
         else:
             QMessageBox.information(self, "Information", f"No new tracks added to '{playlist.name}'. They might already be in the playlist.")
 
+    def _apply_playlist_change_set(self, change_set):
+        if self.current_view_mode != "playlist" or self.current_playlist_id_selected != change_set.playlist_id:
+            return
+        if self._table_has_playlist_change:
+            return
+        playlist = self.playlist_manager.get_playlist_by_id(change_set.playlist_id)
+        if change_set.reset or not playlist:
+            self.update_track_list_for_playlist(change_set.playlist_id)
+            return
+        self.track_table_model.apply_playlist_changes(change_set.operations, self.library_manager.get_track_by_path)
+        if self.track_table_model.rowCount() != len(playlist.track_paths):
+            print(f"Warning: Track table out of sync with playlist {playlist.name} after applying {change_set}. Reloading.")
+            self.update_track_list_for_playlist(change_set.playlist_id)
+        elif any(operation[0] == "inserted" for operation in change_set.operations):
+            self.track_table_model.set_missing_paths(self.library_manager.get_missing_track_paths())
+            self.filter_track_list_display() # new rows have to be matched against the current search
+
     def handle_playlist_tracks_changed(self, playlist_id_changed):
-        
-        if self.current_view_mode == "playlist" and self.current_playlist_id_selected == playlist_id_changed:
-            self.update_track_list_for_playlist(playlist_id_changed)
+        if self.is_playing_playlist and self.current_playlist_id_selected == playlist_id_changed:
+            playlist = self.playlist_manager.get_playlist_by_id(playlist_id_changed)
+            playing_row = playlist.index_of(self.player.source_url().toLocalFile()) if playlist else -1
+            if playing_row != -1:
+                self.current_track_index_in_playlist = playing_row
+            self._queue_next_playlist_track()
 
     def handle_library_loaded(self):
         print("DEBUG: MainWindow received libraryLoaded signal.")
@@ -297,80 +474,133 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "No Library Folders", "Please add a music folder to the library first.")
             return
 
-        if self.progress_dialog and self.progress_dialog.isVisible():
-            self.progress_dialog.cancel() 
+        if self.library_manager.is_scan_running():
+            if self.progress_dialog:
+                self.progress_dialog.show()
+            return
 
         self.progress_dialog = QProgressDialog("Scanning library...", "Cancel", 0, 0, self)
         self.progress_dialog.setWindowTitle("Library Scan")
-        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        # Non-modal: the scan runs on a worker thread, so playback controls stay usable meanwhile.
+        self.progress_dialog.setWindowModality(Qt.WindowModality.NonModal)
         self.progress_dialog.setAutoClose(True)
         self.progress_dialog.setAutoReset(True)
         self.progress_dialog.canceled.connect(self._cancel_scan_progress) 
         self.progress_dialog.setValue(0) 
         self.progress_dialog.show()
         
-        
-        QTimer.singleShot(100, self.library_manager.scan_all_library_folders)
+        self.library_manager.start_background_scan()
 
     def _cancel_scan_progress(self):
-        
-        
         if self.progress_dialog:
             self.progress_dialog.hide()
         print("DEBUG: Library scan cancel requested by user.")
+        self.library_manager.cancel_scan()
 
-    def handle_scan_progress(self, files_scanned, current_file):
+    def handle_scan_progress(self, files_scanned, scan_status):
         if self.progress_dialog:
-            self.progress_dialog.setLabelText(f"Scanning: {os.path.basename(current_file)}")
+            self.progress_dialog.setLabelText(f"Scanning: {scan_status}\n{files_scanned} file(s) processed")
             self.progress_dialog.setValue(files_scanned % self.progress_dialog.maximum() if self.progress_dialog.maximum() > 0 else files_scanned)
 
-    def handle_library_scan_finished(self, new_tracks_data):
+    def handle_library_scan_finished(self, library_diff, cancelled):
         if self.progress_dialog:
             self.progress_dialog.hide()
         
-        num_new_tracks = len(new_tracks_data)
-        QMessageBox.information(self, "Scan Complete", f"Library scan finished. Added {num_new_tracks} new track(s).")
+        if cancelled:
+            QMessageBox.information(self, "Scan Cancelled",
+                                    f"Library scan cancelled. {len(library_diff.added)} new track(s) were added before stopping.")
+        else:
+            QMessageBox.information(self, "Scan Complete",
+                                    f"Library scan finished. Added {len(library_diff.added)} new track(s), "
+                                    f"updated {len(library_diff.updated)}, removed {len(library_diff.removed)}, "
+                                    f"renamed {len(library_diff.renamed)}.")
         
-        if self.current_view_mode == "library":
-            self.update_library_display()
+        self._library_refresh_timer.stop()
+        self._refresh_library_display_if_visible()
         
         self.library_manager.save_library_to_disk()
 
+    def analyze_library_tracks(self):
+        if self.library_manager.is_analysis_running():
+            if self.analysis_progress_dialog:
+                self.analysis_progress_dialog.show()
+            return
+
+        self.analysis_progress_dialog = QProgressDialog("Analysing tracks...", "Cancel", 0, 0, self)
+        self.analysis_progress_dialog.setWindowTitle("Track Analysis")
+        # Non-modal like the scan: analysis runs on a worker thread and can take a long time.
+        self.analysis_progress_dialog.setWindowModality(Qt.WindowModality.NonModal)
+        self.analysis_progress_dialog.canceled.connect(self.library_manager.cancel_analysis)
+        if self.library_manager.start_library_analysis():
+            self.analysis_progress_dialog.show()
+
+    def handle_analysis_progress(self, files_done, total):
+        if self.analysis_progress_dialog:
+            self.analysis_progress_dialog.setMaximum(total)
+            self.analysis_progress_dialog.setValue(files_done)
+            self.analysis_progress_dialog.setLabelText(f"Analysing tracks...\n{files_done} of {total} file(s) processed")
+
+    def handle_analysis_finished(self, files_done, cancelled):
+        if self.analysis_progress_dialog:
+            self.analysis_progress_dialog.hide()
+        if cancelled:
+            QMessageBox.information(self, "Analysis Cancelled", f"Track analysis cancelled after {files_done} file(s); their results are kept.")
+        else:
+            QMessageBox.information(self, "Analysis Complete", f"Analysed {files_done} track(s).")
+
+    def _schedule_library_display_refresh(self, library_diff=None):
+        if library_diff is not None:
+            self._pending_library_paths.update(track.file_path for track in library_diff.added + library_diff.updated)
+            self._pending_library_paths.update(library_diff.removed)
+            for old_path, new_path in library_diff.renamed:
+                self._pending_library_paths.update((old_path, new_path))
+        if not self._library_refresh_timer.isActive():
+            self._library_refresh_timer.start()
+
+    def _refresh_library_display_if_visible(self):
+        # Only the touched rows change, so selection, scroll position and "Now Playing" survive a scan.
+        changed_paths, self._pending_library_paths = self._pending_library_paths, set()
+        if self.current_view_mode != "library" or not changed_paths:
+            return
+        descending = self._library_sort[1]
+        self.track_table_model.update_tracks(
+            {path: self.library_manager.get_track_by_path(path) for path in changed_paths},
+            lambda path: self.library_manager.get_track_position(path, descending)
+        )
+        if self.search_controller.query():
+            self.filter_track_list_display()
+
     def update_library_display(self): 
         print("DEBUG: update_library_display called (full library view)")
-        self.track_list_widget.clear()
-        tracks_data = self.library_manager.get_all_tracks_for_ui_update()
-        for track_info in tracks_data:
-            item = QListWidgetItem(track_info['text'])
-            item.setData(Qt.ItemDataRole.UserRole, track_info['file_path']) 
-            self.track_list_widget.addItem(item)
+        self._populate_library_list()
         
         self.current_track_label.setText("Select a track from the library.")
         self.play_button.setEnabled(False)
         self._update_play_pause_button_state()
+
+    def _populate_library_list(self):
+        order, descending = self._library_sort
+        self._pending_library_paths = set() # the full list below includes them
+        self.artwork_pixmaps.cancel_pending()
+        self.track_table_model.set_tracks(self.library_manager.get_all_tracks_sorted(order, descending))
+        self.track_table_model.set_missing_paths(self.library_manager.get_missing_track_paths())
         self.filter_track_list_display() 
 
+    def _handle_tracks_availability_changed(self, now_missing, found_again):
+        if now_missing:
+            print(f"DEBUG: {len(now_missing)} track(s) could not be found on disk.")
+        self.track_table_model.set_missing_paths(now_missing, True)
+        self.track_table_model.set_missing_paths(found_again, False)
+
     def filter_track_list_display(self):
-        search_text = self.track_search_input.text().lower()
-        for i in range(self.track_list_widget.count()):
-            item = self.track_list_widget.item(i)
-            item_text = item.text().lower()
-            
-            if search_text in item_text:
-                item.setHidden(False)
-            else:
-                item.setHidden(True)
+        # Applies the search box right away; typing goes through the controller's debounce instead.
+        self.search_controller.refresh()
 
     def _play_audio_file(self, file_path, playlist_track_index=None):
         print(f"DEBUG: _play_audio_file called with: {file_path}, playlist_track_index: {playlist_track_index}")
-        if not os.path.exists(file_path):
+        if not self.library_manager.verify_track_exists(file_path):
+            # The track stays in the library and playlists, flagged as missing, in case its drive comes back.
             QMessageBox.warning(self, "File Not Found", f"The audio file could not be found:\n{file_path}")
-            
-            if self.current_view_mode == "library":
-                self.library_manager.remove_track_by_path(file_path)
-                self.update_library_display() 
-            elif self.current_view_mode == "playlist" and self.current_playlist_id_selected:
-                self.playlist_manager.remove_track_from_playlist(self.current_playlist_id_selected, file_path)
                 
             self.player.stop()
             self.play_button.setEnabled(False)
@@ -385,6 +615,12 @@ class MainWindow(QMainWindow):
         print(f"DEBUG: self.player.play() called.")
         self.play_button.setEnabled(True)
         self._update_play_pause_button_state()
+        self._show_started_track(file_path, playlist_track_index)
+
+    def _show_started_track(self, file_path, playlist_track_index=None):
+        """Updates labels, lyrics and waveform for a track that just started and queues the next one."""
+        self.waveform_view.clear()
+        self.waveform_loader.request(file_path)
 
         track = self.library_manager.get_track_by_path(file_path) 
         if track:
@@ -405,10 +641,40 @@ class MainWindow(QMainWindow):
             self.is_playing_playlist = False
             self.current_track_index_in_playlist = -1
             print(f"DEBUG: Set is_playing_playlist=False, current_track_index_in_playlist cleared")
+        self._queue_next_playlist_track()
+
+    def _next_playlist_track_path(self):
+        if not self.is_playing_playlist or not self.current_playlist_id_selected:
+            return None
+        playlist = self.playlist_manager.get_playlist_by_id(self.current_playlist_id_selected)
+        next_index = self.current_track_index_in_playlist + 1
+        if playlist and next_index < len(playlist.track_paths):
+            return playlist.track_paths[next_index]
+        return None
+
+    def _queue_next_playlist_track(self):
+        # The player preloads this track shortly before the current one ends (gapless playback).
+        next_path = self._next_playlist_track_path()
+        self.player.queue_next(next_path if next_path and os.path.exists(next_path) else None)
+
+    def _handle_track_advanced(self, file_path):
+        print(f"DEBUG: Gapless switch to {file_path}")
+        next_index = self.current_track_index_in_playlist + 1
+        self._show_started_track(file_path, playlist_track_index=next_index)
+        self._update_play_pause_button_state()
+        if self.current_view_mode == "playlist":
+            self._select_source_row(next_index)
+
+    def _log_transition_metrics(self, metrics):
+        print(f"DEBUG: Track transition to {os.path.basename(metrics['path'])}: "
+              f"preload took {metrics['preload_load_ms']:.0f} ms with {metrics['preload_margin_ms']} ms to spare, "
+              f"switch took {metrics['switch_ms']:.1f} ms")
 
-    def play_selected_from_track_list(self, item):
-        file_path = item.data(Qt.ItemDataRole.UserRole)
-        current_row = self.track_list_widget.row(item)
+    def play_selected_from_track_list(self, proxy_index):
+        current_row = self.track_proxy_model.mapToSource(proxy_index).row()
+        file_path = self.track_table_model.file_path_at(current_row)
+        if file_path is None:
+            return
 
         if self.current_view_mode == "playlist":
             self._play_audio_file(file_path, playlist_track_index=current_row)
@@ -434,10 +700,18 @@ class MainWindow(QMainWindow):
     def load_lyrics(self, audio_file_path):
         print(f"DEBUG: Calling load_lyrics for: {audio_file_path}")
         self._current_lyrics = []
-        self._current_lyric_index = -1 
+        self._lyrics_timeline = None
+        self.lyrics_are_synced = False
         self.lyrics_label.setText("Loading lyrics...")
+        # Resolved on a worker thread; _show_loaded_lyrics() runs once it is done.
+        self.lyrics_loader.request(audio_file_path)
 
-        lyrics_data, is_synced = get_lyrics(audio_file_path)
+    def _show_loaded_waveform(self, audio_path, waveform):
+        print(f"DEBUG: Waveform ready for {audio_path}: {len(waveform)} peaks")
+        self.waveform_view.set_waveform(waveform)
+
+    def _show_loaded_lyrics(self, result):
+        lyrics_data, is_synced = result.lyrics, result.is_synced
         self.lyrics_are_synced = is_synced
 
         print(f"DEBUG: load_lyrics result: {len(lyrics_data)} lines, is_synced: {is_synced}")
@@ -445,8 +719,9 @@ class MainWindow(QMainWindow):
         if lyrics_data:
             self._current_lyrics = lyrics_data
             if self.lyrics_are_synced:
-                self.lyrics_label.setText("Lyrics loaded. Play to sync.") 
-                self.update_lyrics_display(0) 
+                self._lyrics_timeline = LyricsTimeline(lyrics_data)
+                self.lyrics_label.setText(self._lyrics_timeline.render())
+                self.update_lyrics_display(self.player.get_position()) 
             else:
                 
                 full_text = "\n".join([line[1] for line in lyrics_data])
@@ -461,12 +736,8 @@ class MainWindow(QMainWindow):
         elif self.player.playback_state() == QMediaPlayer.PlaybackState.PausedState or \
              self.player.playback_state() == QMediaPlayer.PlaybackState.StoppedState:
             
-            if self.player.source_url().isEmpty() and self.track_list_widget.count() > 0:
-                first_item = self.track_list_widget.item(0)
-                if first_item:
-                    self.play_selected_from_track_list(first_item)
-                else:
-                    self.player.play()
+            if self.player.source_url().isEmpty() and self.track_proxy_model.rowCount() > 0:
+                self.play_selected_from_track_list(self.track_proxy_model.index(0, 0))
             else:
                 self.player.play()
         self._update_play_pause_button_state()
@@ -479,40 +750,15 @@ class MainWindow(QMainWindow):
             self.play_button.setIcon(self.play_icon)
             self.play_button.setText("Play")
 
-    def update_lyrics_display(self, position_ms):
-        if not self._current_lyrics or not self.lyrics_are_synced:
-            if not self.lyrics_are_synced and self._current_lyrics and isinstance(self._current_lyrics[0][1], str):
-                pass 
-            return
-
-        new_lyric_index = -1
-        for i, (timestamp, line) in enumerate(self._current_lyrics):
-            if position_ms >= timestamp:
-                new_lyric_index = i
-            else:
-                break
-        
-        if new_lyric_index != self._current_lyric_index and new_lyric_index != -1:
-            self._current_lyric_index = new_lyric_index
-            current_line_text = self._current_lyrics[self._current_lyric_index][1]
-            
-            
-            display_text = ""
-            context_lines = 2 
-
-            start_index = max(0, self._current_lyric_index - context_lines)
-            end_index = min(len(self._current_lyrics), self._current_lyric_index + context_lines + 1)
+    def update_position_display(self, position_ms):
+        # The single (throttled) place where playback position reaches the widgets.
+        self.update_lyrics_display(position_ms)
+        self.waveform_view.set_position(position_ms)
 
-            for i in range(start_index, end_index):
-                line_ts, line_txt = self._current_lyrics[i]
-                if i == self._current_lyric_index:
-                    display_text += f"<b>{line_txt}</b>\n"
-                else:
-                    display_text += f"<span style='color:grey;'>{line_txt}</span>\n"
-            
-            self.lyrics_label.setText(display_text.strip())
-        elif new_lyric_index == -1 and self._current_lyrics: 
-            self.lyrics_label.setText("<span style='color:grey;'>" + self._current_lyrics[0][1] + "</span>")
+    def update_lyrics_display(self, position_ms):
+        # Runs on every position update: only touch the label when the active line changes.
+        if self._lyrics_timeline is not None and self._lyrics_timeline.seek(position_ms):
+            self.lyrics_label.setText(self._lyrics_timeline.render())
 
     def update_track_info_display(self):
         print("DEBUG: update_track_info_display called (STABLE VERSION - NO METADATA FETCH FROM PLAYER)")
@@ -542,12 +788,12 @@ class MainWindow(QMainWindow):
                 print(f"CRITICAL_ERROR: Could not even set error label: {e_label}")
 
     def remove_selected_tracks_from_current_view(self):
-        selected_items = self.track_list_widget.selectedItems()
-        if not selected_items:
+        selected_rows = self._selected_source_rows()
+        if not selected_rows:
             QMessageBox.information(self, "Nothing Selected", "Please select tracks to remove.")
             return
 
-        confirm_msg = f"Are you sure you want to remove {len(selected_items)} selected track(s)?\n"
+        confirm_msg = f"Are you sure you want to remove {len(selected_rows)} selected track(s)?\n"
         if self.current_view_mode == "library":
             confirm_msg += "This will remove them from the library view but not delete files from disk."
         elif self.current_view_mode == "playlist":
@@ -562,16 +808,14 @@ class MainWindow(QMainWindow):
                                      QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            for item in selected_items:
-                file_path = item.data(Qt.ItemDataRole.UserRole)
-                row = self.track_list_widget.row(item)
-
-                if self.current_view_mode == "library":
+            selected_paths = [self.track_table_model.file_path_at(row) for row in selected_rows]
+            if self.current_view_mode == "library":
+                for file_path in selected_paths:
                     self.library_manager.remove_track_by_path(file_path)
-                elif self.current_view_mode == "playlist" and self.current_playlist_id_selected:
-                    self.playlist_manager.remove_track_from_playlist(self.current_playlist_id_selected, file_path)
-                
-                self.track_list_widget.takeItem(row)
+                self.track_table_model.remove_source_rows(selected_rows)
+            elif self.current_view_mode == "playlist" and self.current_playlist_id_selected:
+                # The table drops the rows when the playlist's change set arrives.
+                self.playlist_manager.remove_tracks_from_playlist(self.current_playlist_id_selected, selected_paths)
             
             if self.current_view_mode == "library":
                 self.library_manager.save_library_to_disk() 
@@ -581,7 +825,7 @@ class MainWindow(QMainWindow):
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Delete:
-            if self.track_list_widget.hasFocus() and self.track_list_widget.selectedItems():
+            if self.track_table_view.hasFocus() and self._selected_source_rows():
                 self.remove_selected_tracks_from_current_view()
             elif self.playlist_list_widget.hasFocus() and self.playlist_list_widget.currentItem():
                 current_pl_item = self.playlist_list_widget.currentItem()
@@ -619,9 +863,7 @@ class MainWindow(QMainWindow):
                     self._play_audio_file(next_track_path, playlist_track_index=self.current_track_index_in_playlist)
                     
                     
-                    list_widget_item = self.track_list_widget.item(self.current_track_index_in_playlist)
-                    if list_widget_item:
-                        self.track_list_widget.setCurrentItem(list_widget_item)
+                    self._select_source_row(self.current_track_index_in_playlist)
                 else:
                     print("DEBUG: Reached end of playlist or playlist is empty/invalid.")
                     self.is_playing_playlist = False
@@ -639,16 +881,24 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Error", "Invalid media. Cannot play this file.")
             self.play_button.setEnabled(False)
             self.current_track_label.setText("Error: Invalid Media")
+            self.lyrics_loader.cancel()
+            self.waveform_loader.cancel()
+            self.waveform_view.clear()
             self.lyrics_label.setText("Lyrics not available.")
             self._current_lyrics = []
+            self._lyrics_timeline = None
             self.is_playing_playlist = False 
             self.current_track_index_in_playlist = -1 
             self._update_play_pause_button_state()
         elif status == QMediaPlayer.MediaStatus.NoMedia:
             self.play_button.setEnabled(False)
             self.current_track_label.setText("No track loaded.")
+            self.lyrics_loader.cancel()
+            self.waveform_loader.cancel()
+            self.waveform_view.clear()
             self.lyrics_label.setText("Lyrics will appear here...")
             self._current_lyrics = []
+            self._lyrics_timeline = None
             self.is_playing_playlist = False 
             self.current_track_index_in_playlist = -1             
             self._update_play_pause_button_state()
@@ -659,10 +909,52 @@ class MainWindow(QMainWindow):
         self.play_button.setEnabled(False)
         self._update_play_pause_button_state()
 
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.position_dispatcher.set_visible(self.isVisible() and not self.isMinimized())
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        self.position_dispatcher.set_visible(not self.isMinimized())
+        if not self._path_check_scheduled:
+            # Existence of cached tracks is checked only once the window is up, at low priority.
+            self._path_check_scheduled = True
+            QTimer.singleShot(PATH_CHECK_DELAY_MS, self.library_manager.start_path_check)
+            # New files in the library folders then show up without a manual rescan.
+            QTimer.singleShot(PATH_CHECK_DELAY_MS, self.library_manager.start_watching_folders)
+        super().showEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        visible_rows = self.track_table_view.viewport().height() // TRACK_ROW_HEIGHT + 1
+        self.artwork_pixmaps.set_visible_rows(visible_rows)
+
+    def hideEvent(self, event):
+        self.position_dispatcher.set_visible(False)
+        super().hideEvent(event)
+
     def closeEvent(self, event):
+        self.library_manager.stop_watching_folders()
+        if self.library_manager.is_scan_running():
+            self.library_manager.cancel_scan()
+            self.library_manager.wait_for_scan()
+        if self.library_manager.is_path_check_running():
+            self.library_manager.cancel_path_check()
+            self.library_manager.wait_for_path_check()
+        if self.library_manager.is_analysis_running():
+            # wait_for_analysis() stores the results still queued and reports the end; no dialog now.
+            self.library_manager.analysisFinished.disconnect(self.handle_analysis_finished)
+            self.library_manager.cancel_analysis()
+            self.library_manager.wait_for_analysis()
+        self.lyrics_loader.shutdown()
+        self.waveform_loader.shutdown()
+        self.artwork_pixmaps.shutdown()
         self.library_manager.save_library_to_disk()
         self.playlist_manager.save_playlists_to_disk()
         self._save_ui_settings()
+        self.config_store.flush() # the one write of library_config.json on shutdown
+        if self.library_database:
+            self.library_database.close()
         super().closeEvent(event)
 
     def _apply_lyrics_style(self):
@@ -684,54 +976,46 @@ class MainWindow(QMainWindow):
             self._apply_lyrics_style()
             self._save_ui_settings() 
 
-    def _get_config_file_path(self): 
-        config_dir_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppConfigLocation)
-        if not config_dir_path:
-            config_dir_path = os.path.join(os.path.expanduser("~"), "MusicPlayerApp") 
-        
-        app_config_dir = QDir(os.path.join(config_dir_path, CONFIG_DIR_NAME))
-        if not app_config_dir.exists():
-            app_config_dir.mkpath(".")
-        return os.path.join(app_config_dir.absolutePath(), CONFIG_FILE_NAME)
+    def open_playback_settings_dialog(self):
+        dialog = PlaybackSettingsDialog(self.gapless_playback, self.preload_lead_ms, self)
+        if dialog.exec():
+            self.gapless_playback, self.preload_lead_ms = dialog.get_settings()
+            self.player.set_gapless_enabled(self.gapless_playback)
+            self.player.set_preload_lead_ms(self.preload_lead_ms)
+            self._queue_next_playlist_track()
+            self._save_ui_settings()
+
+    def _get_cache_dir(self, dir_name):
+        cache_dir_path = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+        if not cache_dir_path:
+            cache_dir_path = os.path.dirname(self.config_store.config_path)
+        return os.path.join(cache_dir_path, CONFIG_DIR_NAME, dir_name)
 
     def _save_ui_settings(self):
-        config_path = self._get_config_file_path()
-        try:
-            all_config_data = {}
-            if os.path.exists(config_path):
-                try:
-                    with open(config_path, 'r', encoding='utf-8') as f:
-                        all_config_data = json.load(f)
-                except json.JSONDecodeError:
-                    print(f"Warning: Config file {config_path} corrupted. UI settings will create/overwrite their section.")
-            
-            all_config_data["ui_settings"] = {
-                "lyrics_font_size": self.lyrics_font_size,
-                "lyrics_text_color": self.lyrics_text_color.name() 
-            }
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(all_config_data, f, indent=4)
-            print(f"UI settings saved to {config_path}")
-        except IOError as e:
-            print(f"Error saving UI settings: {e}")
+        self.config_store.set("ui_settings", {
+            "lyrics_font_size": self.lyrics_font_size,
+            "lyrics_text_color": self.lyrics_text_color.name(),
+            "gapless_playback": self.gapless_playback,
+            "preload_lead_ms": self.preload_lead_ms
+        })
+        print(f"UI settings will be written to {self.config_store.config_path}")
 
     def _load_ui_settings(self):
-        config_path = self._get_config_file_path()
-        if not os.path.exists(config_path):
+        if not self.config_store.exists():
             print("UI settings file not found. Using defaults.")
             return
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                all_config_data = json.load(f)
-            ui_settings = all_config_data.get("ui_settings")
+            ui_settings = self.config_store.get("ui_settings")
             if ui_settings:
                 self.lyrics_font_size = ui_settings.get("lyrics_font_size", 16)
                 color_name = ui_settings.get("lyrics_text_color", "#000000") 
                 self.lyrics_text_color = QColor(color_name)
+                self.gapless_playback = ui_settings.get("gapless_playback", True)
+                self.preload_lead_ms = ui_settings.get("preload_lead_ms", DEFAULT_PRELOAD_LEAD_MS)
                 print(f"UI settings loaded: Font Size={self.lyrics_font_size}, Color={self.lyrics_text_color.name()}")
             else:
                 print("No UI settings found in config file. Using defaults.")
-        except (IOError, json.JSONDecodeError) as e:
+        except AttributeError as e:
             print(f"Error loading UI settings: {e}. Using defaults.")
         finally:
             if hasattr(self, 'lyrics_label'): 
@@ -788,39 +1072,26 @@ class MainWindow(QMainWindow):
         if self.player.playback_state() != QMediaPlayer.PlaybackState.StoppedState:
             current_playing_file = self.player.source_url().toLocalFile()
             playlist = self.playlist_manager.get_playlist_by_id(playlist_id)
-            if playlist and current_playing_file in playlist.track_paths:
+            if playlist and current_playing_file in playlist:
                 
                 self.is_playing_playlist = True
-                try:
-                    self.current_track_index_in_playlist = playlist.track_paths.index(current_playing_file)
-                except ValueError:
-                    self.current_track_index_in_playlist = -1 
-                    self.is_playing_playlist = False 
+                self.current_track_index_in_playlist = playlist.index_of(current_playing_file)
             else:
                 pass 
                 
 
     def update_track_list_for_playlist(self, playlist_id):
-        self.track_list_widget.clear()
+        self._set_track_view_reorderable(True)
         playlist = self.playlist_manager.get_playlist_by_id(playlist_id)
         if playlist:
             print(f"DEBUG: Updating track list for playlist '{playlist.name}'. Tracks: {len(playlist.track_paths)}")
-            for track_path in playlist.track_paths:
-                track_obj = self.library_manager.get_track_by_path(track_path)
-                if track_obj:
-                    display_text = f"{track_obj.title} - {track_obj.artist} ({track_obj.album})"
-                    item = QListWidgetItem(display_text)
-                    item.setData(Qt.ItemDataRole.UserRole, track_path)
-                    self.track_list_widget.addItem(item)
-                else:
-                    item = QListWidgetItem(f"[Missing Track] {os.path.basename(track_path)}")
-                    item.setData(Qt.ItemDataRole.UserRole, track_path)
-                    item.setForeground(QColor("grey")) 
-                    self.track_list_widget.addItem(item)
-            
+            self.artwork_pixmaps.cancel_pending()
+            self.track_table_model.set_playlist_rows(playlist.track_paths, self.library_manager.get_track_by_path)
+            self.track_table_model.set_missing_paths(self.library_manager.get_missing_track_paths())
             self.current_track_label.setText(f"Viewing Playlist: {playlist.name}")
         else:
             print(f"DEBUG: Playlist ID {playlist_id} not found when updating track list.")
+            self.track_table_model.clear()
             self.current_track_label.setText("Playlist not found.")
         self.filter_track_list_display() 
 
@@ -885,55 +1156,29 @@ class MainWindow(QMainWindow):
             self.playlist_list_widget.currentItem().setSelected(False) 
             self.playlist_list_widget.clearSelection()
         
+        self._set_track_view_reorderable(False)
         self.update_library_display()
         
         self.is_playing_playlist = False
         self.current_track_index_in_playlist = -1
-        
-        
-        
-        self.track_list_widget.setDragDropMode(QAbstractItemView.DragDropMode.NoDragDrop) 
 
-    def _handle_track_reorder_in_playlist(self, source_parent: QModelIndex, source_start: int, source_end: int, destination_parent: QModelIndex, destination_row: int):
-        
-        
+    def _handle_track_reorder_in_playlist(self, source_rows, target_row):
         if self.current_view_mode != "playlist" or not self.current_playlist_id_selected:
             print("DEBUG: Track reorder ignored, not in playlist view.")
             return
-        
-        print(f"DEBUG: _handle_track_reorder_in_playlist: src_parent={source_parent.row()}, src_start={source_start}, src_end={source_end}, dst_parent={destination_parent.row()}, dst_row={destination_row}")
-
-        
-        if source_parent != destination_parent:
-            print("DEBUG: Track reorder ignored, cross-model move detected (should not happen with InternalMove).")
-            return
 
-        new_ordered_paths = []
-        for i in range(self.track_list_widget.count()):
-            item = self.track_list_widget.item(i)
-            new_ordered_paths.append(item.data(Qt.ItemDataRole.UserRole))
-        
-        print(f"DEBUG: New ordered paths for playlist {self.current_playlist_id_selected}: {new_ordered_paths}")
+        print(f"DEBUG: Moving rows {source_rows} before row {target_row} in playlist {self.current_playlist_id_selected}")
 
-        current_playing_path_before_reorder = None
-        if self.is_playing_playlist and self.current_track_index_in_playlist != -1:
-            playlist_obj = self.playlist_manager.get_playlist_by_id(self.current_playlist_id_selected)
-            if playlist_obj and 0 <= self.current_track_index_in_playlist < len(playlist_obj.track_paths):
-                 current_playing_path_before_reorder = playlist_obj.track_paths[self.current_track_index_in_playlist]
+        # The table has already moved its rows; only the playlist (and the playing index) follow.
+        self._table_has_playlist_change = True
+        try:
+            moved = self.playlist_manager.move_tracks_in_playlist(self.current_playlist_id_selected, source_rows, target_row)
+        finally:
+            self._table_has_playlist_change = False
 
-        if self.playlist_manager.reorder_tracks_in_playlist(self.current_playlist_id_selected, new_ordered_paths):
+        if moved:
             self.playlist_manager.save_playlists_to_disk() 
             print(f"DEBUG: Successfully reordered tracks for playlist {self.current_playlist_id_selected} in manager.")
-
-            
-            if current_playing_path_before_reorder:
-                try:
-                    self.current_track_index_in_playlist = new_ordered_paths.index(current_playing_path_before_reorder)
-                    print(f"DEBUG: Updated current_track_index_in_playlist to {self.current_track_index_in_playlist} after reorder.")
-                except ValueError:
-                    print(f"DEBUG: Playing track {current_playing_path_before_reorder} not found in new order. Resetting index.")
-                    self.current_track_index_in_playlist = -1 
-                    self.is_playing_playlist = False 
         else:
             print(f"DEBUG: Failed to reorder tracks for playlist {self.current_playlist_id_selected} in manager. UI might be out of sync.")
             
@@ -0,0 +1,59 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+DEFAULT_DEBOUNCE_MS = 150
+
+
+class TrackSearchController(QObject):
+    """
+    Sits between the search box and the track list proxy.
+    Keystrokes only restart a timer, so a query runs once the user pauses and every
+    query typed in between is dropped. When the new query just extends the previous one
+    ("que" -> "queen"), only the previous matches are searched again.
+    """
+    resultsReady = pyqtSignal(object) # set of matching paths, or None to show every track
+
+    def __init__(self, library_manager, parent=None, debounce_ms=DEFAULT_DEBOUNCE_MS):
+        super().__init__(parent)
+        self._library_manager = library_manager
+        self._query = ""
+        self._last_query = None
+        self._last_result = None # exact (non-fuzzy) result of _last_query, base for refinement
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._run_query)
+
+    def query(self):
+        return self._query
+
+    def set_query(self, text):
+        """Schedules a search for text, replacing any query still waiting for the timer."""
+        self._query = text
+        self._debounce_timer.start()
+
+    def cancel(self):
+        self._debounce_timer.stop()
+
+    def invalidate(self, *args):
+        """Forgets the previous result so the next query is not refined from a library that has changed."""
+        self._last_query = None
+        self._last_result = None
+
+    def refresh(self):
+        """Re-runs the current query right away against the current library (e.g. after a rescan)."""
+        self.invalidate()
+        self._debounce_timer.stop()
+        self._run_query()
+
+    def _run_query(self):
+        query = self._query
+        within = None
+        if self._last_result is not None and self._library_manager.is_search_refinement(self._last_query, query):
+            within = self._last_result
+        result = self._library_manager.search_tracks(query, within=within)
+
+        self._last_query, self._last_result = query, result
+        if result is not None and not result:
+            # Nothing matched exactly; fall back to typo-tolerant matching before showing an empty list.
+            result = self._library_manager.search_tracks(query, fuzzy=True)
+        self.resultsReady.emit(result)
@@ -0,0 +1,364 @@
+import os
+from PyQt6.QtCore import Qt, QAbstractTableModel, QSortFilterProxyModel, QModelIndex, QMimeData, QByteArray, pyqtSignal
+from PyQt6.QtGui import QColor
+
+from core.search_index import tokenize, parse_query
+
+COLUMN_TITLE = 0
+COLUMN_ARTIST = 1
+COLUMN_ALBUM = 2
+COLUMN_DURATION = 3
+COLUMN_HEADERS = ("Title", "Artist", "Album", "Duration")
+
+FILE_PATH_ROLE = Qt.ItemDataRole.UserRole
+SORT_KEY_ROLE = Qt.ItemDataRole.UserRole + 1
+
+TRACK_ROWS_MIME_TYPE = "application/x-musicplayer-track-rows"
+
+
+def format_duration(duration_ms):
+    if not duration_ms:
+        return ""
+    total_seconds = int(duration_ms // 1000)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class TrackTableModel(QAbstractTableModel):
+    """
+    Table model over the tracks shown in the main list (full library or one playlist).
+    Data is kept in parallel column lists instead of one object per row, and the view
+    only asks for the rows that are actually on screen.
+    """
+    rowsReordered = pyqtSignal(list, int) # (source_rows, target_row) after a drag-and-drop move in a reorderable (playlist) view
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._reorderable = False
+        self._artwork_provider = None
+        self._clear_columns()
+
+    def _clear_columns(self):
+        self._paths = []
+        self._titles = []
+        self._artists = []
+        self._albums = []
+        self._durations = []
+        self._missing = []      # playlist entries whose track is not in the library
+
+    def _insert_rows(self, row, count, append_rows):
+        # append_rows() adds count rows at the end with _append_row(); they are then moved in before row.
+        row = max(0, min(row, len(self._paths)))
+        columns = ("_paths", "_titles", "_artists", "_albums", "_durations", "_missing")
+        tails = [getattr(self, name)[row:] for name in columns]
+        for name in columns:
+            del getattr(self, name)[row:]
+        self.beginInsertRows(QModelIndex(), row, row + count - 1)
+        append_rows()
+        for name, tail in zip(columns, tails):
+            getattr(self, name).extend(tail)
+        self.endInsertRows()
+
+    def _append_row(self, file_path, title, artist, album, duration_ms, missing=False):
+        self._paths.append(file_path)
+        self._titles.append(title)
+        self._artists.append(artist)
+        self._albums.append(album)
+        self._durations.append(duration_ms)
+        self._missing.append(missing)
+
+    # --- population ---
+
+    def set_tracks(self, tracks):
+        """Replaces the rows with the given Track objects, in order."""
+        self.beginResetModel()
+        self._clear_columns()
+        for track in tracks:
+            self._append_row(track.file_path, track.title, track.artist, track.album, track.duration_ms)
+        self.endResetModel()
+
+    def _append_playlist_row(self, track_path, get_track_by_path):
+        track = get_track_by_path(track_path)
+        if track:
+            self._append_row(track_path, track.title, track.artist, track.album, track.duration_ms)
+        else:
+            self._append_row(track_path, f"[Missing Track] {os.path.basename(track_path)}", "", "", 0, missing=True)
+
+    def set_playlist_rows(self, track_paths, get_track_by_path):
+        """Replaces the rows with a playlist's paths; paths unknown to the library are shown as missing."""
+        self.beginResetModel()
+        self._clear_columns()
+        for track_path in track_paths:
+            self._append_playlist_row(track_path, get_track_by_path)
+        self.endResetModel()
+
+    def insert_playlist_rows(self, row, track_paths, get_track_by_path):
+        """Inserts a playlist's paths before row (as set_playlist_rows() would show them) with one insert notification."""
+        if not track_paths:
+            return
+        def append_rows():
+            for track_path in track_paths:
+                self._append_playlist_row(track_path, get_track_by_path)
+        self._insert_rows(row, len(track_paths), append_rows)
+
+    def update_tracks(self, tracks_by_path, position_of):
+        """
+        Brings the rows of the given paths up to date without a reset (e.g. after a scan chunk).
+        tracks_by_path maps a path to its current Track, or None once it left the library;
+        position_of(path) is the row the track belongs at once every change is applied.
+        Rows whose shown values are unchanged stay as they are, and new rows are inserted one
+        run of neighbours at a time, so the view keeps its selection and scroll position.
+        """
+        stale_rows = []
+        current_paths = set()
+        for row, path in enumerate(self._paths):
+            if path not in tracks_by_path:
+                continue
+            track = tracks_by_path[path]
+            shown = (self._titles[row], self._artists[row], self._albums[row], self._durations[row])
+            if track is not None and shown == (track.title, track.artist, track.album, track.duration_ms):
+                current_paths.add(path)
+            else:
+                stale_rows.append(row) # gone, or re-read with tags that may move it
+        self.remove_source_rows(stale_rows)
+
+        # Inserted in ascending final position: every row before a new one is already in place.
+        new_rows = sorted(((position_of(path), track) for path, track in tracks_by_path.items()
+                           if track is not None and path not in current_paths), key=lambda item: item[0])
+        i = 0
+        while i < len(new_rows):
+            first_row, run = new_rows[i][0], [new_rows[i][1]]
+            i += 1
+            while i < len(new_rows) and new_rows[i][0] == first_row + len(run):
+                run.append(new_rows[i][1])
+                i += 1
+            def append_rows(run=run):
+                for track in run:
+                    self._append_row(track.file_path, track.title, track.artist, track.album, track.duration_ms)
+            self._insert_rows(first_row, len(run), append_rows)
+
+    def apply_playlist_changes(self, operations, get_track_by_path):
+        """
+        Replays the (kind, ...) operations of a PlaylistChangeSet on the rows: inserted rows are
+        looked up, removed and moved rows are edited in place, so the view keeps its scroll
+        position and selection instead of being reset.
+        """
+        for operation in operations:
+            kind = operation[0]
+            if kind == "inserted":
+                self.insert_playlist_rows(operation[1], operation[2], get_track_by_path)
+            elif kind == "removed":
+                self.remove_source_rows(operation[1])
+            elif kind == "moved":
+                self.move_source_rows(operation[1], operation[2])
+
+    def clear(self):
+        self.beginResetModel()
+        self._clear_columns()
+        self.endResetModel()
+
+    def remove_source_rows(self, rows):
+        """Removes the given rows, one notification per contiguous run (last run first)."""
+        columns = (self._paths, self._titles, self._artists, self._albums, self._durations, self._missing)
+        rows = sorted(set(r for r in rows if 0 <= r < len(self._paths)), reverse=True)
+        i = 0
+        while i < len(rows):
+            last = first = rows[i]
+            i += 1
+            while i < len(rows) and rows[i] == first - 1:
+                first = rows[i]
+                i += 1
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for column in columns:
+                del column[first:last + 1]
+            self.endRemoveRows()
+
+    def move_source_rows(self, rows, target_row):
+        """Moves the given rows (kept in their relative order) so they start before target_row."""
+        rows = sorted(set(r for r in rows if 0 <= r < len(self._paths)))
+        if not rows:
+            return False
+        moving = set(rows)
+        insert_at = target_row - sum(1 for r in rows if r < target_row)
+        remaining_rows = [r for r in range(len(self._paths)) if r not in moving]
+        new_order = remaining_rows[:insert_at] + rows + remaining_rows[insert_at:]
+        if new_order == list(range(len(self._paths))):
+            return False
+
+        self.layoutAboutToBeChanged.emit()
+        old_persistent = self.persistentIndexList()
+        new_position = {old_row: new_row for new_row, old_row in enumerate(new_order)}
+        for name in ("_paths", "_titles", "_artists", "_albums", "_durations", "_missing"):
+            column = getattr(self, name)
+            setattr(self, name, [column[old_row] for old_row in new_order])
+        self.changePersistentIndexList(
+            old_persistent,
+            [self.index(new_position[index.row()], index.column()) for index in old_persistent]
+        )
+        self.layoutChanged.emit()
+        return True
+
+    def set_missing_paths(self, file_paths, missing=True):
+        """Greys out (or restores) the rows of the given paths, e.g. tracks a path check could not find."""
+        file_paths = set(file_paths)
+        if not file_paths:
+            return
+        changed_rows = []
+        for row, path in enumerate(self._paths):
+            if path in file_paths and self._missing[row] != missing:
+                self._missing[row] = missing
+                changed_rows.append(row)
+        if changed_rows:
+            last_column = len(COLUMN_HEADERS) - 1
+            self.dataChanged.emit(self.index(changed_rows[0], 0), self.index(changed_rows[-1], last_column),
+                                  [Qt.ItemDataRole.ForegroundRole])
+
+    def set_reorderable(self, reorderable):
+        self._reorderable = reorderable
+
+    def set_artwork_provider(self, provider):
+        """provider(file_path, album) returns the album's cover pixmap or None; it must not block."""
+        self._artwork_provider = provider
+
+    def refresh_artwork(self):
+        """Repaints the covers, e.g. once more thumbnails are available. Only visible rows ask again."""
+        if self._paths:
+            self.dataChanged.emit(self.index(0, COLUMN_ALBUM), self.index(len(self._paths) - 1, COLUMN_ALBUM),
+                                  [Qt.ItemDataRole.DecorationRole])
+
+    # --- accessors ---
+
+    def file_path_at(self, row):
+        return self._paths[row] if 0 <= row < len(self._paths) else None
+
+    def file_paths(self):
+        return list(self._paths)
+
+    def is_missing_row(self, row):
+        return self._missing[row]
+
+    # --- QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMN_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COLUMN_TITLE:
+                return self._titles[row]
+            if column == COLUMN_ARTIST:
+                return self._artists[row]
+            if column == COLUMN_ALBUM:
+                return self._albums[row]
+            if column == COLUMN_DURATION:
+                return format_duration(self._durations[row])
+        elif role == SORT_KEY_ROLE:
+            if column == COLUMN_DURATION:
+                return self._durations[row]
+            return (self._titles, self._artists, self._albums)[column][row].casefold()
+        elif role == FILE_PATH_ROLE:
+            return self._paths[row]
+        elif role == Qt.ItemDataRole.DecorationRole:
+            if column == COLUMN_ALBUM and self._artwork_provider is not None:
+                return self._artwork_provider(self._paths[row], self._albums[row])
+        elif role == Qt.ItemDataRole.ToolTipRole:
+            return self._paths[row]
+        elif role == Qt.ItemDataRole.ForegroundRole:
+            if self._missing[row]:
+                return QColor("grey")
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            if column == COLUMN_DURATION:
+                return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMN_HEADERS[section]
+        return None
+
+    def flags(self, index):
+        base_flags = super().flags(index)
+        if not self._reorderable:
+            return base_flags
+        if index.isValid():
+            return base_flags | Qt.ItemFlag.ItemIsDragEnabled | Qt.ItemFlag.ItemIsDropEnabled
+        return base_flags | Qt.ItemFlag.ItemIsDropEnabled
+
+    # --- drag and drop reordering (playlist view) ---
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def mimeTypes(self):
+        return [TRACK_ROWS_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        rows = sorted({index.row() for index in indexes if index.isValid()})
+        mime_data = QMimeData()
+        mime_data.setData(TRACK_ROWS_MIME_TYPE, QByteArray(",".join(map(str, rows)).encode('ascii')))
+        return mime_data
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if not self._reorderable or action != Qt.DropAction.MoveAction or not data.hasFormat(TRACK_ROWS_MIME_TYPE):
+            return False
+        encoded = bytes(data.data(TRACK_ROWS_MIME_TYPE)).decode('ascii')
+        source_rows = [int(r) for r in encoded.split(",") if r]
+        if row == -1:
+            row = parent.row() if parent.isValid() else self.rowCount()
+        if self.move_source_rows(source_rows, row):
+            self.rowsReordered.emit(source_rows, row)
+        # The move is already done; returning False keeps the view from also removing the dragged rows.
+        return False
+
+
+class TrackFilterProxyModel(QSortFilterProxyModel):
+    """
+    Sorts on SORT_KEY_ROLE and filters on a set of matching file paths.
+    The matching itself is done by the library's search index; this only checks membership.
+    Missing rows (e.g. playlist entries whose track left the library) are not in the index,
+    so they are matched on the words of their displayed title instead: free-text and "title:"
+    terms must prefix-match a title word, terms limited to another field never match.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._matching_paths = None # None shows every row
+        self._query_terms = []
+        self.setSortRole(SORT_KEY_ROLE)
+        self.setDynamicSortFilter(False)
+
+    def set_matching_paths(self, paths, query=""):
+        """Swaps in a new search result as one model reset rather than row-by-row insert/remove signals."""
+        if paths is None and self._matching_paths is None:
+            return
+        self.beginResetModel()
+        self._matching_paths = paths
+        self._query_terms = parse_query(query) if paths is not None else []
+        self.endResetModel()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._matching_paths is None:
+            return True
+        model = self.sourceModel()
+        if model.file_path_at(source_row) in self._matching_paths:
+            return True
+        if not model.is_missing_row(source_row):
+            return False
+        title_tokens = tokenize(model.index(source_row, COLUMN_TITLE).data())
+        return all(field in (None, "title") and any(token.startswith(term) for token in title_tokens)
+                   for field, term in self._query_terms)
+
+    def source_row(self, proxy_row):
+        return self.mapToSource(self.index(proxy_row, 0)).row()
+
+    def proxy_row(self, source_row):
+        return self.mapFromSource(self.sourceModel().index(source_row, 0)).row()
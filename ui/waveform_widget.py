@@ -0,0 +1,84 @@
+from PyQt6.QtCore import Qt, QLineF, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPixmap
+from PyQt6.QtWidgets import QWidget, QSizePolicy
+
+
+class WaveformView(QWidget):
+    """
+    Draws a track's min/max peaks with the played part highlighted; clicking or dragging seeks.
+    The waveform itself is rendered into a pixmap once per size, so position updates only
+    repaint the playhead overlay.
+    """
+    seekRequested = pyqtSignal(int) # position in milliseconds
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._waveform = None
+        self._duration_ms = 0
+        self._position_ms = 0
+        self._pixmap = None
+        self.wave_color = QColor("#4a90d9")
+        self.played_color = QColor(0, 0, 0, 60)
+        self.setMinimumHeight(60)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    def set_waveform(self, waveform):
+        self._waveform = waveform
+        self._pixmap = None
+        if waveform is not None and not self._duration_ms:
+            self._duration_ms = waveform.duration_ms
+        self.update()
+
+    def clear(self):
+        self._duration_ms = 0
+        self._position_ms = 0
+        self.set_waveform(None)
+
+    def set_duration(self, duration_ms):
+        self._duration_ms = duration_ms
+        self.update()
+
+    def set_position(self, position_ms):
+        if position_ms != self._position_ms:
+            self._position_ms = position_ms
+            self.update()
+
+    def _render_pixmap(self):
+        pixmap = QPixmap(self.size())
+        pixmap.fill(Qt.GlobalColor.transparent)
+        width, height = self.width(), self.height()
+        mins, maxs = self._waveform.columns(width)
+        middle = height / 2.0
+        painter = QPainter(pixmap)
+        painter.setPen(self.wave_color)
+        painter.drawLines([QLineF(x, middle - high * middle, x, middle - low * middle)
+                           for x, (low, high) in enumerate(zip(mins.tolist(), maxs.tolist()))])
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        if self._waveform is None:
+            return
+        if self._pixmap is None or self._pixmap.size() != self.size():
+            self._pixmap = self._render_pixmap()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        if self._duration_ms > 0:
+            x = int(self.width() * min(1.0, self._position_ms / self._duration_ms))
+            painter.fillRect(0, 0, x, self.height(), self.played_color)
+            painter.drawLine(x, 0, x, self.height())
+        painter.end()
+
+    def _seek_to(self, x):
+        if self._waveform is None or self._duration_ms <= 0 or self.width() <= 0:
+            return
+        fraction = min(1.0, max(0.0, x / self.width()))
+        self.seekRequested.emit(int(fraction * self._duration_ms))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._seek_to(event.position().x())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self._seek_to(event.position().x())